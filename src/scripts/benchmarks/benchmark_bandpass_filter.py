@@ -0,0 +1,81 @@
+"""benchmark the filter stage of making spectrograms in ``vak prep``,
+i.e. ``vak.spect.butter_bandpass_filter``, on a synthetic corpus of many audio files
+with the same sampling frequency.
+
+Compares the implementation that designed the filter with ``scipy.signal.butter``
+for every file and applied it with ``scipy.signal.lfilter`` in (b, a) form,
+with the current implementation, that designs the filter once as second-order sections
+(cached by ``vak.spect.butter_bandpass_sos``) and applies it with ``scipy.signal.sosfilt``.
+Also reports the largest difference between filtered signals,
+relative to the largest absolute value of the filtered signal.
+
+To avoid holding the whole corpus in memory, "files" are drawn in turn
+from a small pool of synthetic signals; the time to filter does not depend on their content.
+
+usage:
+    $ python src/scripts/benchmarks/benchmark_bandpass_filter.py
+    $ python src/scripts/benchmarks/benchmark_bandpass_filter.py --n-files 1000 --order 8
+"""
+import argparse
+import time
+
+import numpy as np
+from scipy.signal import lfilter
+
+from vak.spect import butter_bandpass, butter_bandpass_filter
+
+
+def filter_before(data, lowcut, highcut, fs, order=5):
+    """implementation of ``vak.spect.butter_bandpass_filter``
+    before ``vak.spect.butter_bandpass_sos`` was added"""
+    b, a = butter_bandpass(lowcut, highcut, fs, order=order)
+    return lfilter(b, a, data)
+
+
+def run(filter_func, signals, n_files, lowcut, highcut, samp_freq, order):
+    tic = time.perf_counter()
+    for file_num in range(n_files):
+        filter_func(signals[file_num % len(signals)], lowcut, highcut, samp_freq, order=order)
+    return time.perf_counter() - tic
+
+
+def main(n_files, dur, samp_freq, lowcut, highcut, order, pool_size=16, seed=42):
+    rng = np.random.default_rng(seed)
+    signals = [(rng.standard_normal(int(dur * samp_freq)) * 1000).astype(np.int16) for _ in range(pool_size)]
+
+    max_rel_diff = max(
+        np.abs(filter_before(signal, lowcut, highcut, samp_freq, order)
+               - butter_bandpass_filter(signal, lowcut, highcut, samp_freq, order)).max()
+        / np.abs(butter_bandpass_filter(signal, lowcut, highcut, samp_freq, order)).max()
+        for signal in signals
+    )
+    print(f'max. relative difference between filtered signals: {max_rel_diff:.2e}')
+
+    before = run(filter_before, signals, n_files, lowcut, highcut, samp_freq, order)
+    after = run(butter_bandpass_filter, signals, n_files, lowcut, highcut, samp_freq, order)
+    print(f'{n_files} files: before {before:.2f} s ({before / n_files * 1e3:.3f} ms per file), '
+          f'after {after:.2f} s ({after / n_files * 1e3:.3f} ms per file), '
+          f'speedup {before / after:.2f}x')
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--n-files', type=int, default=10000,
+                        help='number of synthetic audio files')
+    parser.add_argument('--dur', type=float, default=1.0,
+                        help='duration of each file, in seconds')
+    parser.add_argument('--samp-freq', type=int, default=32000,
+                        help='sampling frequency, in Hz')
+    parser.add_argument('--lowcut', type=float, default=500.,
+                        help='lower cutoff frequency of bandpass filter, in Hz')
+    parser.add_argument('--highcut', type=float, default=10000.,
+                        help='higher cutoff frequency of bandpass filter, in Hz')
+    parser.add_argument('--order', type=int, default=5,
+                        help='order of Butterworth filter')
+    return parser
+
+
+if __name__ == '__main__':
+    args = get_parser().parse_args()
+    main(args.n_files, args.dur, args.samp_freq, args.lowcut, args.highcut, args.order)
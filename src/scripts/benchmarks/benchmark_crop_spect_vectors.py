@@ -0,0 +1,202 @@
+"""benchmark ``vak.datasets.WindowDataset.crop_spect_vectors_keep_classes``
+when it has to crop silences, i.e. when cropping from the start
+or end of the dataset would remove a class.
+
+Compares against the previous implementation of the silence-cropping branch,
+that built the array of bins to ignore by concatenating in a loop over segments,
+and checked classes with ``np.setdiff1d``. That implementation is copied below
+as ``crop_silences_reference``. Both implementations are run with the same seed
+for ``random``, and the script checks they return the same ``x_inds``.
+
+The previous implementation scales with (number of silent segments * number of time bins),
+so by default it is only run for the smaller sizes.
+
+usage:
+    $ python src/scripts/benchmarks/benchmark_crop_spect_vectors.py
+    $ python src/scripts/benchmarks/benchmark_crop_spect_vectors.py --n-timebins 1000000 10000000 --max-reference 10000000
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+
+from vak.datasets import WindowDataset
+
+
+WINDOW_SIZE = 88
+TIMEBINS_PER_FILE = 20000
+N_CLASSES = 10
+# classes that occur only at the start and only at the end of the dataset,
+# so that cropping from either end fails, and silences must be cropped
+RARE_START_CLASS = N_CLASSES + 1
+RARE_END_CLASS = N_CLASSES + 2
+
+
+def make_vectors(n_timebins, seed=42):
+    """make synthetic labeled timebins and vectors that represent windows,
+    like those made by ``WindowDataset.spect_vectors_from_df``"""
+    rng = np.random.default_rng(seed)
+    n_segments = n_timebins // 400
+    # alternate silence (label 0) and syllables
+    silence_durs = rng.integers(50, 800, size=n_segments)
+    syl_durs = rng.integers(20, 100, size=n_segments)
+    syl_labels = rng.integers(1, N_CLASSES + 1, size=n_segments)
+    durs = np.stack((silence_durs, syl_durs), axis=1).ravel()
+    labels = np.stack((np.zeros(n_segments, dtype=int), syl_labels), axis=1).ravel()
+    lbl_tb = np.repeat(labels, durs).astype(np.int8)[:n_timebins]
+    lbl_tb[100:150] = RARE_START_CLASS
+    lbl_tb[-200:-150] = RARE_END_CLASS
+
+    n_timebins = lbl_tb.shape[-1]
+    spect_id_vector = (np.arange(n_timebins) // TIMEBINS_PER_FILE).astype(np.int32)
+    spect_inds_vector = (np.arange(n_timebins) % TIMEBINS_PER_FILE).astype(np.int32)
+    x_inds = np.arange(n_timebins, dtype=np.int32)
+    file_stops = np.append(np.arange(TIMEBINS_PER_FILE, n_timebins, TIMEBINS_PER_FILE), n_timebins)
+    for stop in file_stops:
+        x_inds[stop - WINDOW_SIZE:stop] = WindowDataset.INVALID_WINDOW_VAL
+
+    labelmap = {'unlabeled': 0}
+    labelmap.update({str(lbl): lbl for lbl in range(1, RARE_END_CLASS + 1)})
+    return lbl_tb, spect_id_vector, spect_inds_vector, x_inds, labelmap
+
+
+def crop_silences_reference(lbl_tb, x_inds, cropped_length, labelmap, window_size):
+    """previous implementation of silence-cropping branch
+    of WindowDataset.crop_spect_vectors_keep_classes"""
+    classes = np.asarray(
+        sorted(list(labelmap.values()))
+    )
+    unlabeled = labelmap['unlabeled']
+    valid_unlabeled = np.logical_and(lbl_tb == unlabeled, x_inds != WindowDataset.INVALID_WINDOW_VAL)
+    unlabeled_diff = np.diff(np.concatenate([[0], valid_unlabeled, [0]]))
+    unlabeled_onsets = np.where(unlabeled_diff == 1)[0]
+    unlabeled_offsets = np.where(unlabeled_diff == -1)[0]
+    unlabeled_durations = unlabeled_offsets - unlabeled_onsets
+    N_PAD_BINS = 2
+    unlabeled_onsets = unlabeled_onsets[unlabeled_durations >= window_size + N_PAD_BINS]
+    unlabeled_offsets = unlabeled_offsets[unlabeled_durations >= window_size + N_PAD_BINS]
+    unlabeled_durations = unlabeled_durations[unlabeled_durations >= window_size + N_PAD_BINS]
+    border_onsets = np.concatenate([[WindowDataset.INVALID_WINDOW_VAL],
+                                    x_inds])[unlabeled_onsets] == WindowDataset.INVALID_WINDOW_VAL
+    border_offsets = np.concatenate([x_inds, [WindowDataset.INVALID_WINDOW_VAL]]
+                                    )[unlabeled_offsets + 1] == WindowDataset.INVALID_WINDOW_VAL
+    num_potential_ignored_data_bins = unlabeled_durations - (window_size + N_PAD_BINS) + \
+                                      window_size * border_onsets
+
+    num_bins_to_crop = len(lbl_tb) - cropped_length
+    if sum(num_potential_ignored_data_bins) < num_bins_to_crop:
+        num_potential_ignored_data_bins = unlabeled_durations - (window_size - N_PAD_BINS) + \
+                                          window_size * (border_onsets + border_offsets)
+    else:
+        border_offsets[:] = False
+
+    crop_more = 0
+    if sum(num_potential_ignored_data_bins) < num_bins_to_crop:
+        crop_more = num_bins_to_crop - sum(num_potential_ignored_data_bins) + 1
+        num_bins_to_crop = sum(num_potential_ignored_data_bins) - 1
+
+    segment_ind = np.arange(len(num_potential_ignored_data_bins))
+    random.shuffle(segment_ind)
+    last_ind = np.where(np.cumsum(num_potential_ignored_data_bins[segment_ind]) >= num_bins_to_crop)[0][0]
+    bins_to_ignore = np.array([], dtype=int)
+    for cnt in range(last_ind):
+        if border_onsets[segment_ind[cnt]]:
+            bins_to_ignore = np.concatenate([bins_to_ignore,
+                                             np.arange(unlabeled_onsets[segment_ind[cnt]],
+                                                       unlabeled_offsets[segment_ind[cnt]] - 1)])
+        elif border_offsets[segment_ind[cnt]]:
+            bins_to_ignore = np.concatenate([bins_to_ignore,
+                                             np.arange(unlabeled_onsets[segment_ind[cnt]] + 1,
+                                                       unlabeled_offsets[segment_ind[cnt]])])
+        else:
+            bins_to_ignore = np.concatenate([bins_to_ignore,
+                                             np.arange(unlabeled_onsets[segment_ind[cnt]] + 1,
+                                                       unlabeled_offsets[segment_ind[cnt]] - 1)])
+    left_to_crop = (num_bins_to_crop - sum(num_potential_ignored_data_bins[segment_ind[:last_ind]])
+                    - border_onsets[segment_ind[last_ind]] * window_size)
+    if border_onsets[segment_ind[last_ind]]:
+        bins_to_ignore = np.concatenate([bins_to_ignore,
+                                         np.arange(unlabeled_onsets[segment_ind[last_ind]],
+                                                   unlabeled_onsets[segment_ind[last_ind]] + left_to_crop)])
+    elif border_offsets[segment_ind[last_ind]]:
+        if left_to_crop < num_potential_ignored_data_bins[segment_ind[last_ind]] - window_size:
+            bins_to_ignore = np.concatenate([bins_to_ignore,
+                                             np.arange(unlabeled_onsets[segment_ind[last_ind]] + 1,
+                                                       unlabeled_onsets[segment_ind[last_ind]] + left_to_crop)])
+        else:
+            bins_to_ignore = np.concatenate([bins_to_ignore,
+                                             np.arange(unlabeled_onsets[segment_ind[last_ind]] + 1,
+                                                       unlabeled_onsets[segment_ind[last_ind]] + left_to_crop
+                                                       - window_size)])
+    else:
+        bins_to_ignore = np.concatenate([bins_to_ignore,
+                                         np.arange(unlabeled_onsets[segment_ind[last_ind]] + 1,
+                                                   unlabeled_onsets[segment_ind[last_ind]] + left_to_crop)])
+
+    x_inds[bins_to_ignore] = WindowDataset.INVALID_WINDOW_VAL
+
+    if crop_more > 0:
+        if crop_more > sum(x_inds != WindowDataset.INVALID_WINDOW_VAL):
+            raise ValueError(
+                "was not able to crop spect vectors to specified duration "
+                "in a way that maintained all classes in dataset"
+            )
+        extra_bins = x_inds[x_inds != WindowDataset.INVALID_WINDOW_VAL][:crop_more]
+        bins_to_ignore = np.concatenate([bins_to_ignore, extra_bins])
+        x_inds[bins_to_ignore] = WindowDataset.INVALID_WINDOW_VAL
+
+    if np.array_equal(np.unique(lbl_tb[np.setdiff1d(np.arange(len(lbl_tb)), bins_to_ignore)]), classes):
+        return x_inds
+
+    raise ValueError(
+        "was not able to crop spect vectors to specified duration "
+        "in a way that maintained all classes in dataset"
+    )
+
+
+def main(n_timebins_list, max_reference, crop_fraction, timebin_dur=0.002, seed=42):
+    for n_timebins in n_timebins_list:
+        lbl_tb, spect_id_vector, spect_inds_vector, x_inds, labelmap = make_vectors(n_timebins, seed)
+        crop_dur = lbl_tb.shape[-1] * crop_fraction * timebin_dur
+        cropped_length = np.round(crop_dur / timebin_dur).astype(int)
+
+        random.seed(seed)
+        tic = time.perf_counter()
+        _, _, x_inds_cropped = WindowDataset.crop_spect_vectors_keep_classes(
+            lbl_tb, spect_id_vector, spect_inds_vector, x_inds.copy(),
+            crop_dur, timebin_dur, labelmap, WINDOW_SIZE
+        )
+        elapsed = time.perf_counter() - tic
+        print(f'n_timebins={lbl_tb.shape[-1]:.0e}: crop_spect_vectors_keep_classes took {elapsed:.3f} s')
+
+        if lbl_tb.shape[-1] <= max_reference:
+            random.seed(seed)
+            tic = time.perf_counter()
+            x_inds_reference = crop_silences_reference(lbl_tb, x_inds.copy(), cropped_length,
+                                                       labelmap, WINDOW_SIZE)
+            elapsed_reference = time.perf_counter() - tic
+            print(f'n_timebins={lbl_tb.shape[-1]:.0e}: previous implementation took {elapsed_reference:.3f} s '
+                  f'(speed-up: {elapsed_reference / elapsed:.1f}x)')
+            if not np.array_equal(x_inds_cropped, x_inds_reference):
+                raise ValueError(
+                    f'x_inds from crop_spect_vectors_keep_classes did not match previous implementation '
+                    f'for n_timebins={lbl_tb.shape[-1]}'
+                )
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--n-timebins', type=int, nargs='+', default=[10 ** 6, 10 ** 7, 10 ** 8],
+                        help='total number of time bins in synthetic datasets')
+    parser.add_argument('--max-reference', type=int, default=10 ** 6,
+                        help='largest number of time bins for which previous implementation is run')
+    parser.add_argument('--crop-fraction', type=float, default=0.5,
+                        help='fraction of dataset duration to crop to')
+    return parser
+
+
+if __name__ == '__main__':
+    args = get_parser().parse_args()
+    main(args.n_timebins, args.max_reference, args.crop_fraction)
@@ -0,0 +1,134 @@
+"""benchmark time per epoch of loading training and validation data,
+with DataLoaders created as they were before the options in the ``[DATALOADER]`` section
+of config were added, and with ``vak.datasets.get_dataloader`` and those options.
+
+Makes synthetic spectrogram files, saved in .npz files,
+and datasets that load them: a training dataset that returns windows from random files,
+like ``vak.datasets.WindowDataset``, and a validation dataset that returns
+all windows from a file, like ``vak.datasets.VocalDataset``.
+Each "epoch" iterates once through the training data, with a pass through
+the validation data every ``--val-step`` batches, as ``vak.engine.model.Model.fit`` does.
+Without persistent workers, worker processes are started again for every epoch
+and every validation pass. No network is trained, so that
+the time measured is the time spent loading data.
+
+usage:
+    $ python src/scripts/benchmarks/benchmark_dataloader.py
+    $ python src/scripts/benchmarks/benchmark_dataloader.py --num-workers 4 --prefetch-factor 4
+"""
+import argparse
+from pathlib import Path
+import tempfile
+import time
+
+import numpy as np
+import torch
+
+from vak.datasets import get_dataloader
+
+
+N_FREQBINS = 257
+
+
+class TrainDataset(torch.utils.data.Dataset):
+    """returns a window from a spectrogram file, loading the file for each window"""
+    def __init__(self, spect_paths, window_size, n_windows):
+        self.spect_paths = spect_paths
+        self.window_size = window_size
+        self.n_windows = n_windows
+
+    def __len__(self):
+        return self.n_windows
+
+    def __getitem__(self, idx):
+        spect = np.load(self.spect_paths[idx % len(self.spect_paths)])['s']
+        start = np.random.randint(0, spect.shape[1] - self.window_size)
+        return torch.from_numpy(spect[np.newaxis, :, start:start + self.window_size])
+
+
+class ValDataset(torch.utils.data.Dataset):
+    """returns all windows from a spectrogram file"""
+    def __init__(self, spect_paths, window_size):
+        self.spect_paths = spect_paths
+        self.window_size = window_size
+
+    def __len__(self):
+        return len(self.spect_paths)
+
+    def __getitem__(self, idx):
+        spect = np.load(self.spect_paths[idx])['s']
+        n_windows = spect.shape[1] // self.window_size
+        windows = spect[:, :n_windows * self.window_size].reshape(N_FREQBINS, n_windows, self.window_size)
+        return torch.from_numpy(windows.transpose(1, 0, 2)[:, np.newaxis])
+
+
+def run_epochs(train_data, val_data, num_epochs, val_step):
+    epoch_times = []
+    for _ in range(num_epochs):
+        tic = time.perf_counter()
+        for ind, _ in enumerate(train_data):
+            if (ind + 1) % val_step == 0:
+                for _ in val_data:
+                    pass
+        epoch_times.append(time.perf_counter() - tic)
+    return epoch_times
+
+
+def main(n_files, n_timebins, window_size, batch_size, num_workers, num_epochs, val_step,
+         prefetch_factor, seed=42):
+    rng = np.random.default_rng(seed)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        spect_paths = []
+        for file_num in range(n_files):
+            spect_path = Path(tmp_dir).joinpath(f'{file_num}.spect.npz')
+            np.savez(spect_path, s=rng.random((N_FREQBINS, n_timebins), dtype=np.float32))
+            spect_paths.append(spect_path)
+        train_dataset = TrainDataset(spect_paths, window_size, n_windows=batch_size * val_step * 4)
+        val_dataset = ValDataset(spect_paths[:max(n_files // 10, 1)], window_size)
+
+        # as DataLoaders were created before
+        train_data = torch.utils.data.DataLoader(train_dataset, shuffle=True, batch_size=batch_size,
+                                                 num_workers=num_workers)
+        val_data = torch.utils.data.DataLoader(val_dataset, shuffle=False, batch_size=1,
+                                               num_workers=num_workers)
+        before = run_epochs(train_data, val_data, num_epochs, val_step)
+
+        dataloader_kwargs = dict(persistent_workers=True, prefetch_factor=prefetch_factor, worker_num_threads=1)
+        train_data = get_dataloader(train_dataset, shuffle=True, batch_size=batch_size,
+                                    num_workers=num_workers, **dataloader_kwargs)
+        val_data = get_dataloader(val_dataset, shuffle=False, batch_size=1,
+                                  num_workers=num_workers, **dataloader_kwargs)
+        after = run_epochs(train_data, val_data, num_epochs, val_step)
+
+    for epoch, (before_time, after_time) in enumerate(zip(before, after), start=1):
+        print(f'epoch {epoch}: before {before_time:.2f} s, after {after_time:.2f} s')
+    print(f'mean time per epoch: before {np.mean(before):.2f} s, after {np.mean(after):.2f} s, '
+          f'speedup {np.mean(before) / np.mean(after):.2f}x')
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--n-files', type=int, default=50,
+                        help='number of synthetic spectrogram files')
+    parser.add_argument('--n-timebins', type=int, default=2000,
+                        help='number of time bins in each spectrogram')
+    parser.add_argument('--window-size', type=int, default=176,
+                        help='number of time bins in windows')
+    parser.add_argument('--batch-size', type=int, default=32,
+                        help='number of windows in each training batch')
+    parser.add_argument('--num-workers', type=int, default=2,
+                        help='number of processes that load data')
+    parser.add_argument('--num-epochs', type=int, default=3,
+                        help='number of epochs')
+    parser.add_argument('--val-step', type=int, default=5,
+                        help='number of training batches between validation passes')
+    parser.add_argument('--prefetch-factor', type=int, default=4,
+                        help='number of batches each worker loads in advance')
+    return parser
+
+
+if __name__ == '__main__':
+    args = get_parser().parse_args()
+    main(args.n_files, args.n_timebins, args.window_size, args.batch_size, args.num_workers,
+         args.num_epochs, args.val_step, args.prefetch_factor)
@@ -0,0 +1,136 @@
+"""benchmark startup time and per-window latency of predictions
+with a network exported by ``vak export``, compared with the eager network.
+
+Startup is the time from nothing loaded to a model that is ready to make predictions.
+For the eager path that is finding installed models through entry points
+(as ``vak.models.from_model_config_map`` does), building the network, and loading
+a checkpoint with ``Model.load``. For the exported path it is
+``vak.engine.export.ExportedModel.from_file``.
+Per-window latency is the time to predict one batch, divided by the number of windows in it,
+with ``Model.predict_batch``, that runs the network with ``torch.no_grad``.
+
+The network is a small convolutional + recurrent network with the same
+structure as TweetyNet, so that the script does not require a model package to be installed.
+
+usage:
+    $ python src/scripts/benchmarks/benchmark_export.py
+    $ python src/scripts/benchmarks/benchmark_export.py --batch-sizes 1 8 32 --device cuda
+"""
+import argparse
+from pathlib import Path
+import statistics
+import tempfile
+import time
+
+import torch
+
+import vak.models
+from vak.engine.export import ExportedModel, export
+from vak.engine.model import Model
+
+
+N_FREQBINS = 257
+N_CLASSES = 10
+LABELMAP = {str(class_num): class_num for class_num in range(N_CLASSES)}
+
+
+class ConvRecurrentNet(torch.nn.Module):
+    """network with convolutional layers followed by a bidirectional LSTM,
+    with the same structure as TweetyNet"""
+    def __init__(self, n_freqbins, n_classes, hidden_size=64):
+        super().__init__()
+        self.cnn = torch.nn.Sequential(
+            torch.nn.Conv2d(1, 32, kernel_size=5, padding=2),
+            torch.nn.ReLU(),
+            torch.nn.MaxPool2d(kernel_size=(8, 1), stride=(8, 1)),
+            torch.nn.Conv2d(32, 64, kernel_size=5, padding=2),
+            torch.nn.ReLU(),
+            torch.nn.MaxPool2d(kernel_size=(8, 1), stride=(8, 1)),
+        )
+        n_features = 64 * (n_freqbins // 8 // 8)
+        self.rnn = torch.nn.LSTM(n_features, hidden_size, bidirectional=True, batch_first=True)
+        self.fc = torch.nn.Linear(hidden_size * 2, n_classes)
+
+    def forward(self, x):
+        features = self.cnn(x)
+        batch, channels, freqbins, timebins = features.shape
+        features = features.reshape(batch, channels * freqbins, timebins).permute(0, 2, 1)
+        rnn_output, _ = self.rnn(features)
+        return self.fc(rnn_output).permute(0, 2, 1)  # (batch, classes, time bins)
+
+
+def build_eager_model():
+    network = ConvRecurrentNet(N_FREQBINS, N_CLASSES)
+    optimizer = torch.optim.Adam(network.parameters())
+    return Model(network, loss=torch.nn.CrossEntropyLoss(), optimizer=optimizer, metrics={})
+
+
+def time_startup(ckpt_path, export_path, device, repeats):
+    eager_times, exported_times = [], []
+    for _ in range(repeats):
+        tic = time.perf_counter()
+        list(vak.models.find())  # entry point discovery, as done by vak.models.from_model_config_map
+        model = build_eager_model()
+        model.load(ckpt_path)
+        model.network.to(device)
+        eager_times.append(time.perf_counter() - tic)
+
+        tic = time.perf_counter()
+        ExportedModel.from_file(export_path, device=device)
+        exported_times.append(time.perf_counter() - tic)
+    return statistics.median(eager_times), statistics.median(exported_times)
+
+
+def time_per_window(model, batch_size, window_size, device, repeats):
+    x = torch.rand(batch_size, 1, N_FREQBINS, window_size)
+    model.predict_batch(x, device=device)  # warm up
+    times = []
+    for _ in range(repeats):
+        tic = time.perf_counter()
+        model.predict_batch(x, device=device)
+        if device.startswith('cuda'):
+            torch.cuda.synchronize()
+        times.append(time.perf_counter() - tic)
+    return statistics.median(times) / batch_size
+
+
+def main(batch_sizes, window_size, device, repeats, seed=42):
+    torch.manual_seed(seed)
+    input_shape = (1, N_FREQBINS, window_size)
+    eager_model = build_eager_model()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        ckpt_path = Path(tmp_dir).joinpath('checkpoint.pt')
+        eager_model.save(ckpt_path)
+        export_path = Path(tmp_dir).joinpath('ConvRecurrentNet.export.pt')
+        export(eager_model, export_path, input_shape, LABELMAP, window_size, model_name='ConvRecurrentNet')
+
+        eager_startup, exported_startup = time_startup(ckpt_path, export_path, device, repeats)
+        print(f'startup: eager {eager_startup * 1e3:.1f} ms, exported {exported_startup * 1e3:.1f} ms')
+
+        exported_model = ExportedModel.from_file(export_path, device=device)
+        for batch_size in batch_sizes:
+            eager_latency = time_per_window(eager_model, batch_size, window_size, device, repeats)
+            exported_latency = time_per_window(exported_model, batch_size, window_size, device, repeats)
+            print(f'batch_size={batch_size:3d}: eager {eager_latency * 1e3:.2f} ms per window, '
+                  f'exported {exported_latency * 1e3:.2f} ms per window, '
+                  f'speedup {eager_latency / exported_latency:.2f}x')
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 8, 32],
+                        help='number of windows in each batch')
+    parser.add_argument('--window-size', type=int, default=176,
+                        help='number of time bins in windows')
+    parser.add_argument('--device', default='cpu',
+                        help="device to run network on, e.g. 'cpu' or 'cuda'")
+    parser.add_argument('--repeats', type=int, default=10,
+                        help='number of times each measurement is repeated; the median is reported')
+    return parser
+
+
+if __name__ == '__main__':
+    args = get_parser().parse_args()
+    main(args.batch_sizes, args.window_size, args.device, args.repeats)
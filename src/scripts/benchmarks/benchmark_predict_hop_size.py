@@ -0,0 +1,104 @@
+"""benchmark throughput of predictions with overlapping windows,
+for a range of hop sizes, i.e. the ``hop_size`` option in the ``[PREDICT]`` section of config.
+
+Makes a synthetic spectrogram, saves it in an uncompressed .npz file,
+and times making predictions on it with ``vak.datasets.WindowStream``
+and ``Model.predict_iter``, then combining outputs for overlapping windows
+with ``vak.core.predict._stitch_predictions``.
+The network is a small convolutional + recurrent network with the same
+structure as TweetyNet, so that the script does not require a model package to be installed.
+
+Throughput is reported as seconds of audio predicted per second.
+Compute grows roughly as ``window_size / hop_size``, since each time bin
+is in that many windows.
+
+usage:
+    $ python src/scripts/benchmarks/benchmark_predict_hop_size.py
+    $ python src/scripts/benchmarks/benchmark_predict_hop_size.py --hop-sizes 176 88 44 --device cuda
+"""
+import argparse
+from pathlib import Path
+import tempfile
+import time
+
+import numpy as np
+import torch
+
+from vak.core.predict import _stitch_predictions
+from vak.datasets import WindowStream
+from vak.engine.model import Model
+
+
+N_FREQBINS = 257
+N_CLASSES = 10
+TIMEBIN_DUR = 0.002
+
+
+class ConvRecurrentNet(torch.nn.Module):
+    """network with convolutional layers followed by a bidirectional LSTM,
+    with the same structure as TweetyNet"""
+    def __init__(self, n_freqbins, n_classes, hidden_size=64):
+        super().__init__()
+        self.cnn = torch.nn.Sequential(
+            torch.nn.Conv2d(1, 32, kernel_size=5, padding=2),
+            torch.nn.ReLU(),
+            torch.nn.MaxPool2d(kernel_size=(8, 1), stride=(8, 1)),
+            torch.nn.Conv2d(32, 64, kernel_size=5, padding=2),
+            torch.nn.ReLU(),
+            torch.nn.MaxPool2d(kernel_size=(8, 1), stride=(8, 1)),
+        )
+        n_features = 64 * (n_freqbins // 8 // 8)
+        self.rnn = torch.nn.LSTM(n_features, hidden_size, bidirectional=True, batch_first=True)
+        self.fc = torch.nn.Linear(hidden_size * 2, n_classes)
+
+    def forward(self, x):
+        features = self.cnn(x)
+        batch, channels, freqbins, timebins = features.shape
+        features = features.reshape(batch, channels * freqbins, timebins).permute(0, 2, 1)
+        rnn_output, _ = self.rnn(features)
+        return self.fc(rnn_output).permute(0, 2, 1)  # (batch, classes, time bins)
+
+
+def main(hop_sizes, window_size, batch_size, duration, device, seed=42):
+    rng = np.random.default_rng(seed)
+    n_timebins = int(duration / TIMEBIN_DUR)
+    torch.manual_seed(seed)
+    network = ConvRecurrentNet(N_FREQBINS, N_CLASSES)
+    model = Model(network, loss=None, optimizer=None, metrics={})
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        spect_path = Path(tmp_dir).joinpath('spect.npz')
+        np.savez(spect_path, s=rng.random((N_FREQBINS, n_timebins), dtype=np.float32))
+
+        for hop_size in hop_sizes:
+            window_stream = WindowStream(spect_path, window_size, batch_size, hop_size=hop_size)
+            tic = time.perf_counter()
+            _stitch_predictions(model.predict_iter(window_stream, device=device),
+                                n_timebins=n_timebins,
+                                n_classes=N_CLASSES,
+                                window_size=window_size,
+                                hop_size=hop_size)
+            elapsed = time.perf_counter() - tic
+            print(f'hop_size={hop_size:4d} ({window_stream.n_windows} windows): {elapsed:.2f} s, '
+                  f'{duration / elapsed:.1f} s of audio per second')
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--hop-sizes', type=int, nargs='+', default=[176, 88, 44, 22],
+                        help='hop sizes to benchmark, in number of time bins')
+    parser.add_argument('--window-size', type=int, default=176,
+                        help='number of time bins in windows')
+    parser.add_argument('--batch-size', type=int, default=32,
+                        help='number of windows in each batch')
+    parser.add_argument('--duration', type=float, default=60.,
+                        help='duration of synthetic recording, in seconds')
+    parser.add_argument('--device', default='cpu',
+                        help="device to run network on, e.g. 'cpu' or 'cuda'")
+    return parser
+
+
+if __name__ == '__main__':
+    args = get_parser().parse_args()
+    main(args.hop_sizes, args.window_size, args.batch_size, args.duration, args.device)
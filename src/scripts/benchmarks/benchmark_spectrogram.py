@@ -0,0 +1,119 @@
+"""benchmark time to make spectrograms from many audio signals,
+with the implementation of ``vak.spect.spectrogram`` that called ``matplotlib.mlab.specgram``
+for each signal, and with ``vak.spect.SpectrogramMaker``, one signal at a time
+(as ``vak.spect.spectrogram`` now does) and in batches.
+
+Signals are synthetic, with lengths drawn at random, and the same sampling frequency.
+Before timing, checks that all implementations give the same spectrograms.
+
+usage:
+    $ python src/scripts/benchmarks/benchmark_spectrogram.py
+    $ python src/scripts/benchmarks/benchmark_spectrogram.py --n-signals 500 --batch-size 32
+"""
+import argparse
+import statistics
+import time
+
+from matplotlib.mlab import specgram
+import numpy as np
+
+from vak.spect import SpectrogramMaker, butter_bandpass_filter, spectrogram
+
+
+def spectrogram_mlab(dat, samp_freq, fft_size=512, step_size=64, thresh=None, transform_type=None,
+                     freq_cutoffs=None):
+    """implementation of ``vak.spect.spectrogram`` before ``SpectrogramMaker`` was added"""
+    noverlap = fft_size - step_size
+
+    if freq_cutoffs:
+        dat = butter_bandpass_filter(dat,
+                                     freq_cutoffs[0],
+                                     freq_cutoffs[1],
+                                     samp_freq)
+
+    spect, freqbins, timebins = specgram(dat, fft_size, samp_freq, noverlap=noverlap)[:3]
+
+    if transform_type:
+        if transform_type == 'log_spect':
+            spect /= spect.max()
+            spect = np.log10(spect)
+            if thresh:
+                spect[spect < -thresh] = -thresh
+        elif transform_type == 'log_spect_plus_one':
+            spect = np.log10(spect + 1)
+            if thresh:
+                spect[spect < thresh] = thresh
+    else:
+        if thresh:
+            spect[spect < thresh] = thresh
+
+    if freq_cutoffs:
+        f_inds = np.nonzero((freqbins >= freq_cutoffs[0]) &
+                            (freqbins < freq_cutoffs[1]))[0]
+        spect = spect[f_inds, :]
+        freqbins = freqbins[f_inds]
+
+    return spect, freqbins, timebins
+
+
+def time_func(func, repeats):
+    times = []
+    for _ in range(repeats):
+        tic = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - tic)
+    return statistics.median(times)
+
+
+def main(n_signals, min_dur, max_dur, samp_freq, batch_size, repeats, seed=42):
+    rng = np.random.default_rng(seed)
+    durs = rng.uniform(min_dur, max_dur, n_signals)
+    dats = [(rng.standard_normal(int(dur * samp_freq)) * 1000).astype(np.int16) for dur in durs]
+    spect_params = dict(fft_size=512, step_size=64, thresh=6.25, transform_type='log_spect',
+                        freq_cutoffs=(500, 10000))
+    maker = SpectrogramMaker(samp_freq, **spect_params)
+
+    def before():
+        return [spectrogram_mlab(dat, samp_freq, **spect_params) for dat in dats]
+
+    def per_signal():
+        return [spectrogram(dat, samp_freq, **spect_params) for dat in dats]
+
+    def batched():
+        out = []
+        for start in range(0, n_signals, batch_size):
+            out.extend(maker.batch(dats[start:start + batch_size]))
+        return out
+
+    for (spect_before, _, _), (spect_per, _, _), (spect_batch, _, _) in zip(before(), per_signal(), batched()):
+        assert np.allclose(spect_before, spect_per) and np.allclose(spect_before, spect_batch)
+
+    before_time = time_func(before, repeats)
+    print(f'mlab.specgram: {before_time:.3f} s')
+    for name, func in (('SpectrogramMaker, one signal at a time', per_signal),
+                       (f'SpectrogramMaker, batches of {batch_size}', batched)):
+        after_time = time_func(func, repeats)
+        print(f'{name}: {after_time:.3f} s, speedup {before_time / after_time:.2f}x')
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--n-signals', type=int, default=200,
+                        help='number of synthetic audio signals')
+    parser.add_argument('--min-dur', type=float, default=0.5,
+                        help='minimum duration of signals, in seconds')
+    parser.add_argument('--max-dur', type=float, default=5.0,
+                        help='maximum duration of signals, in seconds')
+    parser.add_argument('--samp-freq', type=int, default=32000,
+                        help='sampling frequency of signals, in Hz')
+    parser.add_argument('--batch-size', type=int, default=16,
+                        help='number of signals in each batch')
+    parser.add_argument('--repeats', type=int, default=3,
+                        help='number of times each measurement is repeated; the median is reported')
+    return parser
+
+
+if __name__ == '__main__':
+    args = get_parser().parse_args()
+    main(args.n_signals, args.min_dur, args.max_dur, args.samp_freq, args.batch_size, args.repeats)
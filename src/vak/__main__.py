@@ -15,6 +15,7 @@ def get_parser():
         'train',
         'eval',
         'predict',
+        'export',
         'finetune',
         'learncurve',
     ]
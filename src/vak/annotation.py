@@ -232,3 +232,97 @@ def source_annot_map(source_files, annot_list):
         )
 
     return source_annot_map
+
+
+class AnnotationTable:
+    """Segments from a list of annotations, stored as contiguous arrays.
+
+    Created by ``vak.annotation.to_table``. Instead of a list of
+    ``crowsetta.Annotation`` instances, where labels of segments must be mapped
+    to integers every time they are used, the labels, onsets, and offsets
+    of the segments from all annotations are concatenated into arrays,
+    with labels already mapped to integers. The segments for the annotation
+    at index ``ind`` are the elements from ``file_offsets[ind]`` up to
+    ``file_offsets[ind + 1]``; use ``AnnotationTable.segments`` to get them.
+
+    Attributes
+    ----------
+    labels_int : numpy.ndarray
+        labels of all segments, mapped to integers.
+    onsets_s : numpy.ndarray
+        onsets of all segments, in seconds.
+    offsets_s : numpy.ndarray
+        offsets of all segments, in seconds.
+    file_offsets : numpy.ndarray
+        index of first segment from each annotation,
+        with total number of segments appended.
+    """
+    def __init__(self, labels_int, onsets_s, offsets_s, file_offsets):
+        self.labels_int = labels_int
+        self.onsets_s = onsets_s
+        self.offsets_s = offsets_s
+        self.file_offsets = file_offsets
+
+    def __len__(self):
+        """number of annotations"""
+        return self.file_offsets.shape[-1] - 1
+
+    def segments(self, ind):
+        """get segments from one annotation
+
+        Parameters
+        ----------
+        ind : int
+            index of annotation, in the list of annotations used to make the table
+
+        Returns
+        -------
+        labels_int : numpy.ndarray
+            labels of segments, mapped to integers
+        onsets_s : numpy.ndarray
+            onsets of segments, in seconds
+        offsets_s : numpy.ndarray
+            offsets of segments, in seconds
+        """
+        start, stop = self.file_offsets[ind], self.file_offsets[ind + 1]
+        return self.labels_int[start:stop], self.onsets_s[start:stop], self.offsets_s[start:stop]
+
+
+def to_table(annots, labelmap):
+    """convert a list of annotations to an ``AnnotationTable``,
+    with labels, onsets, and offsets of segments in contiguous arrays
+
+    Parameters
+    ----------
+    annots : list
+        of crowsetta.Annotation instances, e.g. returned by ``vak.annotation.from_df``.
+    labelmap : dict
+        that maps labels to consecutive integers.
+        To create a label map, pass a set of labels to the ``vak.labels.to_map`` function.
+
+    Returns
+    -------
+    annot_table : vak.annotation.AnnotationTable
+    """
+    n_segments = np.array([len(annot.seq.labels) for annot in annots], dtype=np.int64)
+    file_offsets = np.concatenate(([0], np.cumsum(n_segments))).astype(np.int64)
+
+    if file_offsets[-1] > 0:
+        labels = np.concatenate([np.asarray(annot.seq.labels).astype(str) for annot in annots])
+        onsets_s = np.concatenate([np.asarray(annot.seq.onsets_s, dtype=np.float64) for annot in annots])
+        offsets_s = np.concatenate([np.asarray(annot.seq.offsets_s, dtype=np.float64) for annot in annots])
+        # map each unique label once, instead of looking up every segment in labelmap
+        uniq_labels, inverse = np.unique(labels, return_inverse=True)
+        not_in_labelmap = [lbl for lbl in uniq_labels if lbl not in labelmap]
+        if not_in_labelmap:
+            raise ValueError(
+                f'annotations have labels that are not in labelmap: {not_in_labelmap}'
+            )
+        uniq_labels_int = np.array([labelmap[lbl] for lbl in uniq_labels], dtype=np.int64)
+        labels_int = uniq_labels_int[inverse.reshape(-1)]
+    else:
+        labels_int = np.array([], dtype=np.int64)
+        onsets_s = np.array([], dtype=np.float64)
+        offsets_s = np.array([], dtype=np.float64)
+
+    return AnnotationTable(labels_int, onsets_s, offsets_s, file_offsets)
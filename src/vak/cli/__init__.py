@@ -3,6 +3,7 @@ creating learning curves, etc."""
 
 from .cli import cli
 from .eval import eval
+from .export import export
 from .learncurve import learning_curve
 from .predict import predict
 from .prep import prep
@@ -11,6 +12,7 @@ from .train import train
 __all__ = [
     'cli',
     'eval',
+    'export',
     'learncurve',
     'predict',
     'prep',
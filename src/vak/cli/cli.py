@@ -1,4 +1,5 @@
 from .eval import eval
+from .export import export
 from .train import train
 from .learncurve import learning_curve
 from .predict import predict
@@ -11,7 +12,7 @@ def cli(command, config_file):
     Parameters
     ----------
     command : string
-        One of {'prep', 'train', 'eval', 'predict', 'finetune', 'learncurve'}
+        One of {'prep', 'train', 'eval', 'predict', 'export', 'finetune', 'learncurve'}
     config_file : str, Path
         path to a config.toml file
     """
@@ -27,6 +28,9 @@ def cli(command, config_file):
     elif command == 'predict':
         predict(toml_path=config_file)
 
+    elif command == 'export':
+        export(toml_path=config_file)
+
     elif command == 'learncurve':
         learning_curve(toml_path=config_file)
 
@@ -48,4 +48,7 @@ def eval(toml_path):
               spect_key=cfg.spect_params.spect_key,
               timebins_key=cfg.spect_params.timebins_key,
               device=cfg.eval.device,
+              quantize=cfg.eval.quantize,
+              batch_size=cfg.eval.batch_size,
+              dataloader_kwargs=config.dataloader.get_dataloader_kwargs(cfg.dataloader),
               logger=logger)
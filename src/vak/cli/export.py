@@ -0,0 +1,54 @@
+from datetime import datetime
+from pathlib import Path
+
+from .. import config
+from .. import core
+from .. import logging
+
+
+def export(toml_path):
+    """export trained models specified in the [PREDICT] section of a config.toml file,
+    to files that can be used to make predictions.
+    Function called by command-line interface.
+
+    Parameters
+    ----------
+    toml_path : str, Path
+        path to a configuration file in TOML format.
+
+    Returns
+    -------
+    None
+    """
+    toml_path = Path(toml_path)
+    cfg = config.parse.from_toml(toml_path)
+
+    if cfg.predict is None:
+        raise ValueError(
+            f'export called with a config.toml file that does not have a PREDICT section: {toml_path}'
+        )
+    for option in ('checkpoint_path', 'labelmap_path', 'models'):
+        if getattr(cfg.predict, option) is None:
+            raise ValueError(
+                f"the '{option}' option in the PREDICT section is required to export models: {toml_path}"
+            )
+
+    # ---- set up logging ----------------------------------------------------------------------------------------------
+    timenow = datetime.now().strftime('%y%m%d_%H%M%S')
+    logger = logging.get_logger(log_dst=cfg.predict.output_dir,
+                                caller='export',
+                                timestamp=timenow,
+                                logger_name=__name__)
+    logger.info('Logging results to {}'.format(cfg.predict.output_dir))
+
+    model_config_map = config.models.map_from_path(toml_path, cfg.predict.models)
+
+    core.export(csv_path=cfg.predict.csv_path,
+                checkpoint_path=cfg.predict.checkpoint_path,
+                labelmap_path=cfg.predict.labelmap_path,
+                model_config_map=model_config_map,
+                window_size=cfg.dataloader.window_size,
+                spect_key=cfg.spect_params.spect_key,
+                spect_scaler_path=cfg.predict.spect_scaler_path,
+                output_dir=cfg.predict.output_dir,
+                logger=logger)
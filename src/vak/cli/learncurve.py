@@ -72,5 +72,9 @@ def learning_curve(toml_path):
                         ckpt_step=cfg.learncurve.ckpt_step,
                         patience=cfg.learncurve.patience,
                         device=cfg.learncurve.device,
+                        cache_max_bytes=cfg.dataloader.cache_max_bytes,
+                        file_chunk_size=cfg.dataloader.file_chunk_size,
+                        mixed_precision=cfg.learncurve.mixed_precision,
+                        dataloader_kwargs=config.dataloader.get_dataloader_kwargs(cfg.dataloader),
                         logger=logger,
                         )
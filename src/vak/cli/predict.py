@@ -35,7 +35,11 @@ def predict(toml_path):
                                 logger_name=__name__)
     logger.info('Logging results to {}'.format(cfg.prep.output_dir))
 
-    model_config_map = config.models.map_from_path(toml_path, cfg.predict.models)
+    if cfg.predict.exported_model_path is None:
+        model_config_map = config.models.map_from_path(toml_path, cfg.predict.models)
+    else:
+        # exported network is used instead of models
+        model_config_map = None
 
     core.predict(csv_path=cfg.predict.csv_path,
                  checkpoint_path=cfg.predict.checkpoint_path,
@@ -51,4 +55,13 @@ def predict(toml_path):
                  output_dir=cfg.predict.output_dir,
                  min_segment_dur=cfg.predict.min_segment_dur,
                  majority_vote=cfg.predict.majority_vote,
+                 streaming=cfg.predict.streaming,
+                 batch_size=cfg.predict.batch_size,
+                 save_net_outputs=cfg.predict.save_net_outputs,
+                 hop_size=cfg.predict.hop_size,
+                 resume=cfg.predict.resume,
+                 jobs=cfg.predict.jobs,
+                 exported_model_path=cfg.predict.exported_model_path,
+                 quantize=cfg.predict.quantize,
+                 dataloader_kwargs=config.dataloader.get_dataloader_kwargs(cfg.dataloader),
                  logger=logger)
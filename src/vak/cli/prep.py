@@ -106,6 +106,12 @@ def prep(toml_path):
                                  train_dur=cfg.prep.train_dur,
                                  val_dur=cfg.prep.val_dur,
                                  test_dur=cfg.prep.test_dur,
+                                 consolidate_spects=cfg.prep.consolidate_spects,
+                                 parallel_backend=cfg.prep.parallel_backend,
+                                 parallel_workers=cfg.prep.parallel_workers,
+                                 parallel_chunksize=cfg.prep.parallel_chunksize,
+                                 parallel_max_in_flight=cfg.prep.parallel_max_in_flight,
+                                 reuse_spects=cfg.prep.reuse_spects,
                                  logger=logger,
                                  )
 
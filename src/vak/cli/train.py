@@ -68,5 +68,9 @@ def train(toml_path):
                ckpt_step=cfg.train.ckpt_step,
                patience=cfg.train.patience,
                device=cfg.train.device,
+               cache_max_bytes=cfg.dataloader.cache_max_bytes,
+               file_chunk_size=cfg.dataloader.file_chunk_size,
+               mixed_precision=cfg.train.mixed_precision,
+               dataloader_kwargs=config.dataloader.get_dataloader_kwargs(cfg.dataloader),
                logger=logger,
                )
@@ -1,6 +1,9 @@
 import attr
+from attr import converters, validators
 from attr.validators import instance_of
 
+from ..converters import bool_from_str
+
 
 @attr.s
 class DataLoaderConfig:
@@ -11,10 +14,70 @@ class DataLoaderConfig:
     window_size : int
         size of windows taken from spectrograms, in number of time bins,
         shonw to neural networks
+    cache_max_bytes : int
+        maximum number of bytes that each process loading data can use
+        to cache spectrograms and labeled timebins, so that
+        windows from the same file do not require re-loading the file.
+        Default is None, in which case no cache is used.
+    file_chunk_size : int
+        number of windows from the same spectrogram file that are
+        drawn together when shuffling training data. If specified,
+        batches are sampled with ``vak.datasets.FileChunkSampler``,
+        so that each batch only requires loading a few files.
+        Default is None, in which case windows are shuffled individually.
+    persistent_workers : bool
+        if True, processes that load data are kept running between passes
+        through a dataset, instead of being started again for each epoch
+        and for each validation pass. Default is False.
+    prefetch_factor : int
+        number of batches each process that loads data loads in advance.
+        Default is None, in which case the torch default is used.
+    pin_memory : bool
+        if True, load batches into pinned memory, to copy them to a GPU faster.
+        Default is False.
+    worker_num_threads : int
+        number of threads torch uses in each process that loads data.
+        Default is 1.
     """
     window_size = attr.ib(converter=int,
                           validator=instance_of(int),
                           default=88)
+    cache_max_bytes = attr.ib(converter=converters.optional(int),
+                              validator=validators.optional(instance_of(int)),
+                              default=None)
+    file_chunk_size = attr.ib(converter=converters.optional(int),
+                              validator=validators.optional(instance_of(int)),
+                              default=None)
+    persistent_workers = attr.ib(converter=bool_from_str,
+                                 validator=instance_of(bool),
+                                 default=False)
+    prefetch_factor = attr.ib(converter=converters.optional(int),
+                              validator=validators.optional(instance_of(int)),
+                              default=None)
+    pin_memory = attr.ib(converter=bool_from_str,
+                         validator=instance_of(bool),
+                         default=False)
+    worker_num_threads = attr.ib(converter=int, validator=instance_of(int), default=1)
+
+
+def get_dataloader_kwargs(dataloader_config):
+    """get options in [DATALOADER] section of config that are
+    keyword arguments to ``vak.datasets.get_dataloader``
+
+    Parameters
+    ----------
+    dataloader_config : vak.config.dataloader.DataLoaderConfig
+
+    Returns
+    -------
+    dataloader_kwargs : dict
+    """
+    return dict(
+        persistent_workers=dataloader_config.persistent_workers,
+        prefetch_factor=dataloader_config.prefetch_factor,
+        pin_memory=dataloader_config.pin_memory,
+        worker_num_threads=dataloader_config.worker_num_threads,
+    )
 
 
 def parse_dataloader_config(config_toml, toml_path):
@@ -25,7 +25,8 @@ class EvalConfig:
     models : list
         of model names. e.g., 'models = TweetyNet, GRUNet, ConvNet'
     batch_size : int
-        number of samples per batch presented to models during training.
+        number of windows in each batch presented to models during evaluation.
+        Windows from several files are packed into each batch.
     num_workers : int
         Number of processes to use for parallel loading of data.
         Argument to torch.DataLoader. Default is 2.
@@ -36,6 +37,10 @@ class EvalConfig:
         path to a saved SpectScaler object used to normalize spectrograms.
         If spectrograms were normalized and this is not provided, will give
         incorrect results.
+    quantize : bool
+        if True, evaluate models before and after applying dynamic int8 quantization,
+        and save metrics and throughput for both. Requires device to be 'cpu'.
+        Default is False.
     """
     # required, external files
     checkpoint_path = attr.ib(converter=expanded_user_path,
@@ -64,6 +69,7 @@ class EvalConfig:
     # optional, data loader
     num_workers = attr.ib(validator=instance_of(int), default=2)
     device = attr.ib(validator=instance_of(str), default=device.get_default())
+    quantize = attr.ib(validator=instance_of(bool), default=False)
 
 
 REQUIRED_EVAL_OPTIONS = [
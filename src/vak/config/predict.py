@@ -57,18 +57,55 @@ class PredictConfig:
         applied if the labelmap contains an 'unlabeled' label,
         because unlabeled segments makes it possible to identify
         the labeled segments. Default is False.
+    streaming : bool
+        if True, make predictions on each spectrogram in batches of
+        ``batch_size`` windows, read from the spectrogram file in chunks,
+        so that memory used does not grow with the length of recordings.
+        Default is False.
+    save_net_outputs : bool
+        if True, save outputs of networks, before taking the argmax to get
+        predicted labels, in an array file for each spectrogram in ``output_dir``.
+        Default is False.
+    hop_size : int
+        number of time bins between the start of consecutive windows.
+        If less than ``window_size``, windows overlap and outputs of networks
+        are averaged across windows. Default is None, in which case
+        windows do not overlap.
+    resume : bool
+        if True, keep annotations already in the .csv of predicted annotations,
+        e.g. from a run that was interrupted, and skip files that have annotations.
+        Default is False.
+    jobs : int
+        number of processes that make predictions in parallel, each on a shard
+        of the dataset. Default is 1.
+    exported_model_path : str
+        path to a file with a network exported by ``vak export``.
+        If specified, predictions are made with the exported network,
+        and the labelmap, spectrogram scaler, and window size saved with it.
+        In this case ``checkpoint_path``, ``labelmap_path``, and ``models``
+        are not required, and ``spect_scaler_path`` is ignored.
+        Default is None.
+    quantize : bool
+        if True, apply dynamic int8 quantization to networks after loading checkpoints,
+        to make predictions faster on CPU. Requires device to be 'cpu'.
+        Default is False.
     """
-    # required, external files
-    checkpoint_path = attr.ib(converter=expanded_user_path,
-                              validator=is_a_file)
-    labelmap_path = attr.ib(converter=expanded_user_path,
-                            validator=is_a_file)
-
-    # required, model / dataloader
-    models = attr.ib(converter=comma_separated_list,
-                     validator=[instance_of(list), is_valid_model_name])
+    # required, dataloader
     batch_size = attr.ib(converter=int, validator=instance_of(int))
 
+    # required, external files, unless exported_model_path is specified
+    checkpoint_path = attr.ib(converter=converters.optional(expanded_user_path),
+                              validator=validators.optional(is_a_file),
+                              default=None)
+    labelmap_path = attr.ib(converter=converters.optional(expanded_user_path),
+                            validator=validators.optional(is_a_file),
+                            default=None)
+
+    # required, model, unless exported_model_path is specified
+    models = attr.ib(converter=converters.optional(comma_separated_list),
+                     validator=validators.optional([instance_of(list), is_valid_model_name]),
+                     default=None)
+
     # csv_path is actually 'required' but we can't enforce that here because cli.prep looks at
     # what sections are defined to figure out where to add csv_path after it creates the csv
     csv_path = attr.ib(converter=converters.optional(expanded_user_path),
@@ -89,6 +126,17 @@ class PredictConfig:
     output_dir = attr.ib(converter=expanded_user_path, validator=is_a_directory, default=Path(os.getcwd()))
     min_segment_dur = attr.ib(validator=validators.optional(instance_of(float)), default=None)
     majority_vote = attr.ib(validator=instance_of(bool), default=True)
+    streaming = attr.ib(validator=instance_of(bool), default=False)
+    save_net_outputs = attr.ib(validator=instance_of(bool), default=False)
+    hop_size = attr.ib(converter=converters.optional(int),
+                       validator=validators.optional(instance_of(int)),
+                       default=None)
+    resume = attr.ib(validator=instance_of(bool), default=False)
+    jobs = attr.ib(converter=int, validator=instance_of(int), default=1)
+    exported_model_path = attr.ib(converter=converters.optional(expanded_user_path),
+                                  validator=validators.optional(is_a_file),
+                                  default=None)
+    quantize = attr.ib(validator=instance_of(bool), default=False)
 
 
 REQUIRED_PREDICT_OPTIONS = [
@@ -118,7 +166,12 @@ def parse_predict_config(config_toml, toml_path):
         config_toml['PREDICT'].items()
     )
 
-    for required_option in REQUIRED_PREDICT_OPTIONS:
+    if 'exported_model_path' in predict_section:
+        # exported file has network, labelmap, and spect scaler
+        required_options = []
+    else:
+        required_options = REQUIRED_PREDICT_OPTIONS
+    for required_option in required_options:
         if required_option not in predict_section:
             raise KeyError(
                 f"the '{required_option}' option is required but was not found in the "
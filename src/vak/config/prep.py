@@ -4,7 +4,7 @@ from attr import converters, validators
 from attr.validators import instance_of
 
 from .validators import is_a_directory, is_a_file, is_audio_format, is_annot_format, is_spect_format
-from ..converters import expanded_user_path, labelset_to_set
+from ..converters import bool_from_str, expanded_user_path, labelset_to_set
 
 
 def duration_from_toml_value(value):
@@ -78,6 +78,30 @@ class PrepConfig:
         total duration of validation set, in seconds.
     test_dur : float
         total duration of test set, in seconds.
+    consolidate_spects : bool
+        if True, concatenate all spectrograms in the training split into a single
+        array file that can be memory-mapped, and do the same for the vectors
+        of labeled timebins. Default is False.
+    parallel_backend : str
+        used to make spectrograms from audio files, and load spectrogram files,
+        in parallel. One of {'dask', 'process'}. Default is 'dask'.
+        If 'process', files are processed by a pool of worker processes,
+        in bounded memory, and results are kept in the same order as files.
+        See ``vak.io.process_pool``.
+    parallel_workers : int
+        number of worker processes, for the 'process' backend.
+        Default is None, in which case the number of CPUs is used.
+    parallel_chunksize : int
+        number of files sent to a worker at a time, for the 'process' backend.
+        Default is 1.
+    parallel_max_in_flight : int
+        maximum number of files being processed at a time, for the 'process' backend.
+        Default is None, in which case it is twice the number of workers times the chunksize.
+    reuse_spects : bool
+        if True, keep a manifest of spectrogram files made from audio files in ``spect_output_dir``,
+        and only make spectrograms for audio files that are new or changed
+        since ``vak prep`` was last run with the same ``spect_output_dir``
+        and spectrogram parameters. Default is False.
     """
     data_dir = attr.ib(converter=expanded_user_path, validator=is_a_directory)
     output_dir = attr.ib(converter=expanded_user_path, validator=is_a_directory)
@@ -104,6 +128,20 @@ class PrepConfig:
     test_dur = attr.ib(converter=converters.optional(duration_from_toml_value),
                        validator=validators.optional(is_valid_duration),
                        default=None)
+    consolidate_spects = attr.ib(converter=bool_from_str,
+                                 validator=instance_of(bool),
+                                 default=False)
+    parallel_backend = attr.ib(validator=validators.in_(('dask', 'process')), default='dask')
+    parallel_workers = attr.ib(converter=converters.optional(int),
+                               validator=validators.optional(instance_of(int)),
+                               default=None)
+    parallel_chunksize = attr.ib(converter=int, validator=instance_of(int), default=1)
+    parallel_max_in_flight = attr.ib(converter=converters.optional(int),
+                                     validator=validators.optional(instance_of(int)),
+                                     default=None)
+    reuse_spects = attr.ib(converter=bool_from_str,
+                           validator=instance_of(bool),
+                           default=False)
 
 
 REQUIRED_PREP_OPTIONS = [
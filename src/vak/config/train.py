@@ -24,6 +24,7 @@ class TrainConfig:
         training set.
     batch_size : int
         number of samples per batch presented to models during training.
+        Also the number of windows in each batch during validation.
     root_results_dir : str
         directory in which results will be created.
         The vak.cli.train function will create
@@ -55,6 +56,9 @@ class TrainConfig:
         number of validation steps to wait without performance on the
         validation set improving before stopping the training.
         Default is None, in which case training only stops after the specified number of epochs.
+    mixed_precision : bool
+        if True, train in mixed precision: bfloat16 on CPU, or float16 with
+        gradient scaling on GPU. Default is False.
     """
     # required
     models = attr.ib(converter=comma_separated_list,
@@ -87,6 +91,7 @@ class TrainConfig:
                               validator=validators.optional(instance_of(int)), default=None)
     patience = attr.ib(converter=converters.optional(int),
                        validator=validators.optional(instance_of(int)), default=None)
+    mixed_precision = attr.ib(converter=bool_from_str, validator=instance_of(bool), default=False)
 
 
 REQUIRED_TRAIN_OPTIONS = [
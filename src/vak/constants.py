@@ -24,6 +24,10 @@ SPECT_FORMAT_LOAD_FUNCTION_MAP = {
 }
 VALID_SPECT_FORMATS = list(SPECT_FORMAT_LOAD_FUNCTION_MAP.keys())
 
+# ---- network outputs ----
+# extension of files with outputs of networks saved by vak.core.predict
+NET_OUTPUT_EXT = '.output.npy'
+
 # ---- annotation files ----
 VALID_ANNOT_FORMATS = crowsetta.formats._INSTALLED
 NO_ANNOTATION_FORMAT = 'none'
@@ -1,4 +1,5 @@
 from .eval import eval
+from .export import export
 from .learncurve import learning_curve
 from .predict import predict
 from .prep import prep
@@ -1,6 +1,7 @@
 from collections import OrderedDict
 from datetime import datetime
 import json
+import time
 
 import joblib
 import pandas as pd
@@ -8,7 +9,9 @@ import torch.utils.data
 
 from .. import models
 from .. import transforms
+from ..datasets.dataloader import get_dataloader
 from ..datasets.vocal_dataset import VocalDataset
+from ..device import get_default as get_default_device
 from ..logging import log_or_print
 
 
@@ -24,6 +27,9 @@ def eval(csv_path,
          spect_key='s',
          timebins_key='t',
          device=None,
+         quantize=False,
+         batch_size=None,
+         dataloader_kwargs=None,
          logger=None):
     """evaluate a trained model
 
@@ -64,6 +70,24 @@ def eval(csv_path,
     device : str
         Device on which to work with model + data.
         Defaults to 'cuda' if torch.cuda.is_available is True.
+    quantize : bool
+        if True, evaluate each model twice: first as loaded from the checkpoint,
+        and then after applying dynamic int8 quantization with
+        ``vak.engine.model.Model.quantize``. The .csv of metrics has one row
+        for each, with columns 'quantized' and 'throughput', the seconds of audio
+        evaluated per second, and the change in each metric is logged,
+        to decide whether quantizing is worth it for a model.
+        Requires ``device`` to be 'cpu'. Default is False.
+    batch_size : int
+        number of windows in each batch. Windows from several files
+        are packed into each batch, so that short files do not each need
+        a separate forward pass through the network, and metrics are still
+        computed for each file. Default is None, in which case
+        each batch contains the windows from one file.
+    dataloader_kwargs : dict
+        keyword arguments passed to ``vak.datasets.get_dataloader``
+        when creating DataLoaders, e.g. ``persistent_workers`` and ``prefetch_factor``.
+        Default is None.
 
     Other Parameters
     ----------------
@@ -77,6 +101,14 @@ def eval(csv_path,
     # ---- get time for .csv file --------------------------------------------------------------------------
     timenow = datetime.now().strftime('%y%m%d_%H%M%S')
 
+    if device is None:
+        device = get_default_device()
+    if quantize:
+        if device != 'cpu':
+            raise ValueError(
+                f"quantized networks only run on CPU, but device was '{device}'. Set device to 'cpu'"
+            )
+
     # ---------------- load data for evaluation ------------------------------------------------------------------------
     if spect_scaler_path:
         log_or_print(
@@ -113,11 +145,18 @@ def eval(csv_path,
                                         timebins_key=timebins_key,
                                         item_transform=item_transform,
                                         )
-    val_data = torch.utils.data.DataLoader(dataset=val_dataset,
-                                           shuffle=False,
-                                           # batch size 1 because each spectrogram reshaped into a batch of windows
-                                           batch_size=1,
-                                           num_workers=num_workers)
+    if dataloader_kwargs is None:
+        dataloader_kwargs = {}
+    val_data = get_dataloader(val_dataset,
+                              shuffle=False,
+                              # batch size 1 because each spectrogram reshaped into a batch of windows
+                              batch_size=1,
+                              num_workers=num_workers,
+                              **dataloader_kwargs)
+
+    if quantize:
+        dataset_df = pd.read_csv(csv_path)
+        split_dur = dataset_df[dataset_df['split'] == split]['duration'].sum()
 
     # ---------------- do the actual evaluating ------------------------------------------------------------------------
     input_shape = val_dataset.shape
@@ -136,28 +175,47 @@ def eval(csv_path,
         logger.info(
             f'running evaluation for model: {model_name}'
         )
-        model.load(checkpoint_path)
-        metric_vals = model.evaluate(eval_data=val_data,
-                                     device=device)
-        # create a "DataFrame" with just one row which we will save as a csv;
-        # the idea is to be able to concatenate csvs from multiple runs of eval
-        row = OrderedDict(
-            [
-                ('model_name', model_name),
-                ('checkpoint_path', checkpoint_path),
-                ('labelmap_path', labelmap_path),
-                ('spect_scaler_path', spect_scaler_path),
-                ('csv_path', csv_path),
+        model.load(checkpoint_path, device=device, inference=True, mmap=True)
+        if quantize:
+            # evaluate as loaded, then quantized, to measure the change in metrics and throughput
+            float_row = _evaluate(model, val_data, device, batch_size, split_dur)
+            model.quantize()
+            quantized_row = _evaluate(model, val_data, device, batch_size, split_dur)
+            for metric_name, quantized_val in quantized_row.items():
+                logger.info(
+                    f'{metric_name}: {float_row[metric_name]:.4f} -> {quantized_val:.4f} after quantizing, '
+                    f'change of {quantized_val - float_row[metric_name]:+.4f}'
+                )
+            metric_rows = [
+                OrderedDict([('quantized', False)], **float_row),
+                OrderedDict([('quantized', True)], **quantized_row),
             ]
-        )
-        # order metrics by name to be extra sure they will be consistent across runs
-        row.update(
-            sorted([(k, v) for k, v in metric_vals.items() if k.startswith('avg_')])
-        )
+        else:
+            metric_vals = model.evaluate(eval_data=val_data,
+                                         device=device,
+                                         batch_size=batch_size)
+            # order metrics by name to be extra sure they will be consistent across runs
+            metric_rows = [
+                OrderedDict(sorted([(k, v) for k, v in metric_vals.items() if k.startswith('avg_')]))
+            ]
+
+        rows = []
+        for metric_row in metric_rows:
+            # create a "DataFrame" with one row for each evaluation which we will save as a csv;
+            # the idea is to be able to concatenate csvs from multiple runs of eval
+            row = OrderedDict(
+                [
+                    ('model_name', model_name),
+                    ('checkpoint_path', checkpoint_path),
+                    ('labelmap_path', labelmap_path),
+                    ('spect_scaler_path', spect_scaler_path),
+                    ('csv_path', csv_path),
+                ]
+            )
+            row.update(metric_row)
+            rows.append(row)
 
-        # pass index into dataframe, needed when using all scalar values (a single row)
-        # throw away index below when saving to avoid extra column
-        eval_df = pd.DataFrame(row, index=[0])
+        eval_df = pd.DataFrame(rows)
         eval_csv_path = output_dir.joinpath(
             f'eval_{model_name}_{timenow}.csv'
         )
@@ -165,3 +223,23 @@ def eval(csv_path,
             f'saving csv with evaluation metrics at: {eval_csv_path}'
         )
         eval_df.to_csv(eval_csv_path, index=False)  # index is False to avoid having "Unnamed: 0" column when loading
+
+
+def _evaluate(model, val_data, device, batch_size, split_dur):
+    """evaluate a model, and measure throughput, in seconds of audio evaluated per second
+
+    Returns
+    -------
+    row : collections.OrderedDict
+        with metrics, ordered by name, and 'throughput'.
+    """
+    tic = time.perf_counter()
+    metric_vals = model.evaluate(eval_data=val_data,
+                                 device=device,
+                                 batch_size=batch_size)
+    elapsed = time.perf_counter() - tic
+    row = OrderedDict(
+        sorted([(k, v) for k, v in metric_vals.items() if k.startswith('avg_')])
+    )
+    row['throughput'] = split_dur / elapsed
+    return row
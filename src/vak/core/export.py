@@ -0,0 +1,113 @@
+import json
+import os
+from pathlib import Path
+
+import joblib
+import pandas as pd
+
+from .. import models
+from ..datasets import WindowStream
+from ..engine.export import EXPORT_EXT, export as export_network
+from ..logging import log_or_print
+
+
+def export(csv_path,
+           checkpoint_path,
+           labelmap_path,
+           model_config_map,
+           window_size,
+           spect_key='s',
+           spect_scaler_path=None,
+           output_dir=None,
+           logger=None):
+    """export trained models to files that can be used to make predictions,
+    without building the models from their configuration, or loading checkpoints.
+
+    For each model, the network is traced with ``torch.jit.trace`` and saved,
+    along with the labelmap, the parameters of the spectrogram scaler,
+    and the window size, in a file named ``{model name}.export.pt``.
+    See ``vak.engine.export``.
+
+    Parameters
+    ----------
+    csv_path : str
+        path to where dataset was saved as a csv.
+        The first spectrogram in the dataset is used to determine the shape of input to networks.
+    checkpoint_path : str
+        path to directory with checkpoint files saved by Torch, to reload model
+    labelmap_path : str
+        path to 'labelmap.json' file.
+    model_config_map : dict
+        where each key-value pair is model name : dict of config parameters
+    window_size : int
+        size of windows taken from spectrograms, in number of time bins,
+        shown to neural networks
+    spect_key : str
+        key for accessing spectrogram in files. Default is 's'.
+    spect_scaler_path : str
+        path to a saved SpectScaler object used to normalize spectrograms.
+        If specified, it is saved in the exported file.
+    output_dir : str, Path
+        path to location where exported files should be saved.
+        Defaults to current working directory.
+
+    Other Parameters
+    ----------------
+    logger : logging.Logger
+        instance created by vak.logging.get_logger. Default is None.
+
+    Returns
+    -------
+    export_paths : list
+        of pathlib.Path, paths to exported files.
+    """
+    if output_dir is None:
+        output_dir = Path(os.getcwd())
+    else:
+        output_dir = Path(output_dir)
+
+    if not output_dir.is_dir():
+        raise NotADirectoryError(
+            f'value specified for output_dir is not recognized as a directory: {output_dir}'
+        )
+
+    if spect_scaler_path:
+        log_or_print(f'loading SpectScaler from path: {spect_scaler_path}', logger=logger, level='info')
+        spect_standardizer = joblib.load(spect_scaler_path)
+    else:
+        log_or_print(f'Not loading SpectScaler, no path was specified', logger=logger, level='info')
+        spect_standardizer = None
+
+    log_or_print(f'loading labelmap from path: {labelmap_path}',
+                 logger=logger, level='info')
+    with Path(labelmap_path).open('r') as f:
+        labelmap = json.load(f)
+
+    dataset_df = pd.read_csv(csv_path)
+    input_shape = WindowStream(dataset_df['spect_path'].values[0], window_size, 1, spect_key).shape
+    log_or_print(f'shape of input to networks: {input_shape}',
+                 logger=logger, level='info')
+
+    models_map = models.from_model_config_map(
+        model_config_map,
+        num_classes=len(labelmap),
+        input_shape=input_shape
+    )
+    export_paths = []
+    for model_name, model in models_map.items():
+        log_or_print(f'loading checkpoint for {model_name} from path: {checkpoint_path}',
+                     logger=logger, level='info')
+        # networks are traced on CPU
+        model.load(checkpoint_path, device='cpu', inference=True, mmap=True)
+        export_path = output_dir.joinpath(f'{model_name}{EXPORT_EXT}')
+        log_or_print(f'exporting {model_name} to: {export_path}',
+                     logger=logger, level='info')
+        export_network(model,
+                       export_path,
+                       input_shape=input_shape,
+                       labelmap=labelmap,
+                       window_size=window_size,
+                       spect_standardizer=spect_standardizer,
+                       model_name=model_name)
+        export_paths.append(export_path)
+    return export_paths
@@ -273,6 +273,10 @@ def learning_curve(model_config_map,
                    ckpt_step=None,
                    patience=None,
                    device=None,
+                   cache_max_bytes=None,
+                   file_chunk_size=None,
+                   mixed_precision=False,
+                   dataloader_kwargs=None,
                    logger=None,
                    ):
     """generate learning curve, by training models on training sets across a
@@ -349,6 +353,25 @@ def learning_curve(model_config_map,
         number of validation steps to wait without performance on the
         validation set improving before stopping the training.
         Default is None, in which case training only stops after the specified number of epochs.
+    cache_max_bytes : int
+        Parameter for WindowDataset. Maximum number of bytes that each process
+        loading training data can use to cache spectrograms and labeled timebins.
+        Default is None, in which case no cache is used.
+    file_chunk_size : int
+        number of windows from the same spectrogram file that are drawn together
+        when shuffling training data, using ``vak.datasets.FileChunkSampler``.
+        Default is None, in which case windows are shuffled individually.
+    mixed_precision : bool
+        if True, train in mixed precision, with operations that support it run
+        with autocast in bfloat16 on CPU or in float16 on GPU, where losses are scaled
+        with ``torch.cuda.amp.GradScaler``. Validation also uses autocast.
+        Autocast on CPU requires torch 1.10 or later; with earlier versions,
+        training on CPU runs in float32.
+        Default is False.
+    dataloader_kwargs : dict
+        keyword arguments passed to ``vak.datasets.get_dataloader``
+        when creating DataLoaders, e.g. ``persistent_workers`` and ``prefetch_factor``.
+        Default is None.
 
     Other Parameters
     ----------------
@@ -498,6 +521,10 @@ def learning_curve(model_config_map,
                   ckpt_step=ckpt_step,
                   patience=patience,
                   device=device,
+                  cache_max_bytes=cache_max_bytes,
+                  file_chunk_size=file_chunk_size,
+                  mixed_precision=mixed_precision,
+                  dataloader_kwargs=dataloader_kwargs,
                   logger=logger,
                   **window_dataset_kwargs
                   )
@@ -558,6 +585,8 @@ def learning_curve(model_config_map,
                      spect_key=spect_key,
                      timebins_key=timebins_key,
                      device=device,
+                     batch_size=batch_size,
+                     dataloader_kwargs=dataloader_kwargs,
                      logger=logger)
 
     # ---- make a csv for analysis -------------------------------------------------------------------------------------
@@ -1,6 +1,8 @@
 import json
+import multiprocessing
 import os
 from pathlib import Path
+import tempfile
 
 import crowsetta
 import joblib
@@ -9,14 +11,17 @@ import pandas as pd
 from tqdm import tqdm
 import torch.utils.data
 
+from .. import constants
 from .. import files
 from .. import io
 from .. import labeled_timebins
 from ..logging import log_or_print
 from .. import models
 from .. import transforms
-from ..datasets import VocalDataset
+from ..datasets import VocalDataset, WindowStream, get_dataloader
+from ..datasets.window_stream import OverlapAdd
 from ..device import get_default as get_default_device
+from ..engine.export import EXPORT_EXT, ExportedModel
 
 
 def predict(csv_path,
@@ -33,6 +38,15 @@ def predict(csv_path,
             output_dir=None,
             min_segment_dur=None,
             majority_vote=False,
+            streaming=False,
+            batch_size=None,
+            save_net_outputs=False,
+            hop_size=None,
+            resume=False,
+            jobs=1,
+            exported_model_path=None,
+            quantize=False,
+            dataloader_kwargs=None,
             logger=None,
             ):
     """make predictions on dataset with trained model specified in config.toml file.
@@ -85,6 +99,64 @@ def predict(csv_path,
         applied if the labelmap contains an 'unlabeled' label,
         because unlabeled segments makes it possible to identify
         the labeled segments. Default is False.
+    streaming : bool
+        if True, make predictions on each spectrogram in fixed-size batches
+        of ``batch_size`` windows, read from the spectrogram file in chunks
+        (memory-mapped when possible), and stitch together the predictions
+        for each batch. Peak memory then does not grow with the length of recordings.
+        If False, each spectrogram is loaded and reshaped into a single batch of windows.
+        Default is False.
+    batch_size : int
+        number of windows in each batch when ``streaming`` is True or ``hop_size``
+        is specified. Required if ``streaming`` is True, ignored otherwise.
+        If ``hop_size`` is specified and ``batch_size`` is None, all windows
+        from a spectrogram are in a single batch. Default is None.
+    save_net_outputs : bool
+        if True, save the outputs of networks, before taking the argmax
+        to get predicted labels, in an array file for each spectrogram,
+        with shape (classes, time bins). Files are saved in ``output_dir``
+        with the name ``{spectrogram file stem}.{model name}.output.npy``.
+        Default is False.
+    hop_size : int
+        number of time bins between the start of consecutive windows.
+        If less than ``window_size``, windows overlap, and the outputs of networks
+        for each time bin are averaged across windows, weighted by a Hann window,
+        before taking the argmax. Windows are taken from spectrograms
+        with ``vak.datasets.WindowStream``, in batches of ``batch_size`` windows.
+        Default is None, in which case windows do not overlap.
+    resume : bool
+        if True, and the .csv of annotations already exists, e.g. because a
+        previous run was interrupted, keep the annotations in it and skip
+        files that already have annotations. If ``jobs`` is greater than 1,
+        annotations in .csv files for shards left by an interrupted run are also kept,
+        and only files without annotations are split into shards.
+        Default is False, in which case any existing .csv is overwritten.
+    jobs : int
+        number of processes that make predictions in parallel. If greater than 1,
+        the files in the dataset are split into ``jobs`` shards with about the same
+        total duration, each shard is predicted by a separate process that loads
+        the checkpoint once and uses ``torch.get_num_threads() // jobs`` threads,
+        and the .csv files of annotations for each shard are merged, in the order
+        of files in the dataset. Intended for machines with many CPU cores.
+        Default is 1.
+    exported_model_path : str, Path
+        path to a file with a network exported by ``vak.core.export``.
+        If specified, predictions are made with the exported network,
+        loaded with ``torch.jit.load``, instead of building models from
+        ``model_config_map`` and loading ``checkpoint_path``, and the labelmap,
+        spectrogram scaler, and window size saved with the network are used.
+        ``checkpoint_path``, ``labelmap_path``, ``model_config_map``, and ``spect_scaler_path``
+        are ignored and can be None. Default is None.
+    quantize : bool
+        if True, apply dynamic int8 quantization to networks after loading checkpoints,
+        with ``vak.engine.model.Model.quantize``, to make predictions faster on CPU.
+        Requires ``device`` to be 'cpu'. Cannot be used with ``exported_model_path``.
+        Use ``vak.core.eval`` with ``quantize=True`` to measure how quantizing affects
+        accuracy and throughput. Default is False.
+    dataloader_kwargs : dict
+        keyword arguments passed to ``vak.datasets.get_dataloader``
+        when creating DataLoaders, e.g. ``persistent_workers`` and ``prefetch_factor``.
+        Default is None.
 
     Other Parameters
     ----------------
@@ -105,47 +177,130 @@ def predict(csv_path,
             f'value specified for output_dir is not recognized as a directory: {output_dir}'
         )
 
+    if quantize:
+        if exported_model_path is not None:
+            raise ValueError(
+                'quantize cannot be used with exported_model_path'
+            )
+        if device is None:
+            device = get_default_device()
+        if device != 'cpu':
+            raise ValueError(
+                f"quantized networks only run on CPU, but device was '{device}'. Set device to 'cpu'"
+            )
+
+    if exported_model_path is not None:
+        if device is None:
+            device = get_default_device()
+        log_or_print(f'loading exported network from path: {exported_model_path}',
+                     logger=logger, level='info')
+        exported_model = ExportedModel.from_file(exported_model_path, device=device, logger=logger)
+        if window_size != exported_model.window_size:
+            log_or_print(f'using window size saved with exported network, {exported_model.window_size}, '
+                         f'instead of window_size, {window_size}',
+                         logger=logger, level='info')
+            window_size = exported_model.window_size
+
+    if streaming and batch_size is None:
+        raise ValueError(
+            'streaming is True but batch_size is None; batch_size is required for streaming predictions'
+        )
+
+    if hop_size is not None:
+        if hop_size > window_size:
+            raise ValueError(
+                f'hop_size, {hop_size}, must be less than or equal to window_size, {window_size}'
+            )
+        use_window_stream = True
+    else:
+        hop_size = window_size
+        use_window_stream = streaming
+
+    if not isinstance(jobs, int) or isinstance(jobs, bool) or jobs < 1:
+        raise ValueError(
+            f'jobs must be a positive integer but was: {jobs}'
+        )
+
+    if dataloader_kwargs is None:
+        dataloader_kwargs = {}
+
+    if annot_csv_filename is None:
+        annot_csv_filename = Path(csv_path).stem + '.annot.csv'
+    annot_csv_path = Path(output_dir).joinpath(annot_csv_filename)
+
+    if jobs > 1:
+        shard_kwargs = dict(
+            checkpoint_path=checkpoint_path,
+            labelmap_path=labelmap_path,
+            model_config_map=model_config_map,
+            window_size=window_size,
+            # workers load data in the same process, instead of starting more processes
+            num_workers=0,
+            spect_key=spect_key,
+            timebins_key=timebins_key,
+            spect_scaler_path=spect_scaler_path,
+            device=device,
+            output_dir=output_dir,
+            min_segment_dur=min_segment_dur,
+            majority_vote=majority_vote,
+            streaming=streaming,
+            batch_size=batch_size,
+            save_net_outputs=save_net_outputs,
+            hop_size=None if hop_size == window_size else hop_size,
+            resume=resume,
+            exported_model_path=exported_model_path,
+            quantize=quantize,
+            dataloader_kwargs=dataloader_kwargs,
+        )
+        _predict_sharded(csv_path, annot_csv_path, jobs, shard_kwargs, logger)
+        return
+
     if device is None:
         device = get_default_device()
 
     # ---------------- load data for prediction ------------------------------------------------------------------------
-    if spect_scaler_path:
+    if exported_model_path is not None:
+        spect_standardizer = exported_model.spect_standardizer
+        labelmap = exported_model.labelmap
+    elif spect_scaler_path:
         log_or_print(f'loading SpectScaler from path: {spect_scaler_path}', logger=logger, level='info')
         spect_standardizer = joblib.load(spect_scaler_path)
     else:
         log_or_print(f'Not loading SpectScaler, no path was specified', logger=logger, level='info')
         spect_standardizer = None
 
-    item_transform = transforms.get_defaults('predict',
-                                             spect_standardizer,
-                                             window_size=window_size,
-                                             return_padding_mask=True,
-                                             )
-
-    log_or_print(f'loading labelmap from path: {labelmap_path}',
-                 logger=logger, level='info')
-    with labelmap_path.open('r') as f:
-        labelmap = json.load(f)
+    if exported_model_path is None:
+        log_or_print(f'loading labelmap from path: {labelmap_path}',
+                     logger=logger, level='info')
+        with labelmap_path.open('r') as f:
+            labelmap = json.load(f)
 
     log_or_print(f'loading dataset to predict from csv path: {csv_path}', logger=logger, level='info')
-    pred_dataset = VocalDataset.from_csv(csv_path=csv_path,
-                                         split='predict',
-                                         labelmap=labelmap,
-                                         spect_key=spect_key,
-                                         timebins_key=timebins_key,
-                                         item_transform=item_transform,
-                                         )
-
-    pred_data = torch.utils.data.DataLoader(dataset=pred_dataset,
-                                            shuffle=False,
-                                            # batch size 1 because each spectrogram reshaped into a batch of windows
-                                            batch_size=1,
-                                            num_workers=num_workers)
+    if use_window_stream:
+        pred_df = pd.read_csv(csv_path)
+        pred_df = pred_df[pred_df['split'] == 'predict']
+        if len(pred_df) == 0:
+            raise ValueError(
+                f'split predict not found in dataset in csv: {csv_path}'
+            )
+        spect_paths = pred_df['spect_path'].values
+    else:
+        item_transform = transforms.get_defaults('predict',
+                                                 spect_standardizer,
+                                                 window_size=window_size,
+                                                 return_padding_mask=True,
+                                                 )
+
+        pred_dataset = VocalDataset.from_csv(csv_path=csv_path,
+                                             split='predict',
+                                             labelmap=labelmap,
+                                             spect_key=spect_key,
+                                             timebins_key=timebins_key,
+                                             item_transform=item_transform,
+                                             )
+        spect_paths = pred_dataset.spect_paths
 
     # ---------------- set up to convert predictions to annotation files -----------------------------------------------
-    if annot_csv_filename is None:
-        annot_csv_filename = Path(csv_path).stem + '.annot.csv'
-    annot_csv_path = Path(output_dir).joinpath(annot_csv_filename)
     log_or_print(f'will save annotations in .csv file: {annot_csv_path}',
                  logger=logger, level='info')
 
@@ -155,60 +310,301 @@ def predict(csv_path,
                  logger=logger, level='info')
 
     # ---------------- do the actual predicting + converting to annotations --------------------------------------------
-    input_shape = pred_dataset.shape
-    # if dataset returns spectrogram reshaped into windows,
-    # throw out the window dimension; just want to tell network (channels, height, width) shape
-    if len(input_shape) == 4:
-        input_shape = input_shape[1:]
+    if use_window_stream:
+        input_shape = WindowStream(spect_paths[0], window_size, batch_size, spect_key).shape
+    else:
+        input_shape = pred_dataset.shape
+        # if dataset returns spectrogram reshaped into windows,
+        # throw out the window dimension; just want to tell network (channels, height, width) shape
+        if len(input_shape) == 4:
+            input_shape = input_shape[1:]
     log_or_print(f'shape of input to networks used for predictions: {input_shape}',
                  logger=logger, level='info')
 
-    log_or_print(f'instantiating models from model-config map:/n{model_config_map}',
-                 logger=logger, level='info')
-    models_map = models.from_model_config_map(
-        model_config_map,
-        num_classes=len(labelmap),
-        input_shape=input_shape
-    )
+    if exported_model_path is not None:
+        if tuple(input_shape) != tuple(exported_model.input_shape):
+            raise ValueError(
+                f'shape of input, {input_shape}, does not match shape of input to '
+                f'exported network, {exported_model.input_shape}'
+            )
+        model_name = exported_model.model_name or Path(exported_model_path).name.replace(EXPORT_EXT, '')
+        models_map = {model_name: exported_model}
+    else:
+        log_or_print(f'instantiating models from model-config map:/n{model_config_map}',
+                     logger=logger, level='info')
+        models_map = models.from_model_config_map(
+            model_config_map,
+            num_classes=len(labelmap),
+            input_shape=input_shape
+        )
     for model_name, model in models_map.items():
         # ---------------- do the actual predicting --------------------------------------------------------------------
-        log_or_print(f'loading checkpoint for {model_name} from path: {checkpoint_path}',
-                     logger=logger, level='info')
-        model.load(checkpoint_path)
+        if exported_model_path is None:
+            log_or_print(f'loading checkpoint for {model_name} from path: {checkpoint_path}',
+                         logger=logger, level='info')
+            model.load(checkpoint_path, device=device, inference=True, mmap=True)
+            if quantize:
+                model.quantize()
         log_or_print(f'running predict method of {model_name}',
                      logger=logger, level='info')
-        pred_dict = model.predict(pred_data=pred_data,
-                                  device=device)
 
-        # ----------------  converting to annotations ------------------------------------------------------------------
-        progress_bar = tqdm(pred_data)
+        # annotations are written to the .csv on a background thread as each file is predicted.
+        # Exiting the context waits for annotations in the queue to be written, even if an error occurs
+        with io.annot.AnnotCsvWriter(annot_csv_path, resume=resume) as annot_writer:
+            pred_inds = [ind for ind, spect_path in enumerate(spect_paths)
+                         if str(files.spect.find_audio_fname(spect_path)) not in annot_writer.done_audio_paths]
+            if len(pred_inds) < len(spect_paths):
+                log_or_print(f'resuming, skipping {len(spect_paths) - len(pred_inds)} files '
+                             f'that already have annotations in: {annot_csv_path}',
+                             logger=logger, level='info')
+
+            if use_window_stream:
+                log_or_print('making predictions in batches and converting to annotations',
+                             logger=logger, level='info')
+                for spect_path in tqdm(spect_paths[pred_inds]):
+                    window_stream = WindowStream(spect_path,
+                                                 window_size,
+                                                 batch_size,
+                                                 spect_key=spect_key,
+                                                 spect_standardizer=spect_standardizer,
+                                                 hop_size=hop_size)
+                    if save_net_outputs:
+                        net_output = np.lib.format.open_memmap(
+                            _net_output_path(output_dir, spect_path, model_name), mode='w+', dtype=np.float32,
+                            shape=(len(labelmap), window_stream.n_timebins)
+                        )
+                    else:
+                        net_output = None
+                    y_pred = _stitch_predictions(model.predict_iter(window_stream, device=device),
+                                                 n_timebins=window_stream.n_timebins,
+                                                 n_classes=len(labelmap),
+                                                 window_size=window_size,
+                                                 hop_size=hop_size,
+                                                 net_output=net_output)
+                    if net_output is not None:
+                        net_output.flush()
+                        del net_output
+                    t = files.spect.memmap(spect_path, timebins_key)
+                    annot_writer.write(
+                        _to_annot(y_pred, t, spect_path, labelmap, annot_csv_path, min_segment_dur, majority_vote)
+                    )
+            else:
+                # each file is predicted, converted to an annotation, and its output discarded,
+                # in a single pass through the data
+                log_or_print('making predictions and converting to annotations',
+                             logger=logger, level='info')
+                pred_data = get_dataloader(torch.utils.data.Subset(pred_dataset, pred_inds),
+                                           shuffle=False,
+                                           # batch size 1 because each spectrogram
+                                           # reshaped into a batch of windows
+                                           batch_size=1,
+                                           num_workers=num_workers,
+                                           **dataloader_kwargs)
+                for batch in tqdm(pred_data):
+                    padding_mask, spect_path = batch['padding_mask'], batch['spect_path']
+                    padding_mask = np.squeeze(padding_mask)
+                    if isinstance(spect_path, list) and len(spect_path) == 1:
+                        spect_path = spect_path[0]
+                    y_pred = model.predict_batch(batch['source'], device=device)
+                    if save_net_outputs:
+                        # (windows, classes, time bins) -> (classes, time bins), without padding
+                        net_output = y_pred.permute(1, 0, 2).flatten(start_dim=1).cpu().numpy()[:, padding_mask]
+                        np.save(_net_output_path(output_dir, spect_path, model_name), net_output)
+                    y_pred = torch.argmax(y_pred, dim=1)  # assumes class dimension is 1
+                    y_pred = torch.flatten(y_pred).cpu().numpy()[padding_mask]
+
+                    t = files.spect.memmap(spect_path, timebins_key)
+                    annot_writer.write(
+                        _to_annot(y_pred, t, spect_path, labelmap, annot_csv_path, min_segment_dur, majority_vote)
+                    )
+
+
+def _init_shard_worker(num_threads):
+    """initialize a process that predicts a shard of a dataset"""
+    torch.set_num_threads(num_threads)
+
+
+def _predict_shard(kwargs):
+    """predict one shard of a dataset, in a worker process"""
+    predict(**kwargs)
+
+
+def _shard_inds(durations, jobs):
+    """split files into at most ``jobs`` contiguous shards with about the same total duration.
 
-        annots = []
-        log_or_print('converting predictions to annotations',
+    Shards are contiguous so that concatenating the results for each shard
+    gives results in the same order as the files.
+
+    Parameters
+    ----------
+    durations : numpy.ndarray
+        duration of each file.
+    jobs : int
+        number of shards.
+
+    Returns
+    -------
+    shard_inds : list
+        of numpy.ndarray, indices of files in each non-empty shard.
+    """
+    durations = np.asarray(durations, dtype=np.float64)
+    cumulative = np.cumsum(durations)
+    # file goes in shard where the midpoint of its duration falls
+    midpoints = cumulative - durations / 2
+    shard_ids = np.minimum((midpoints / cumulative[-1] * jobs).astype(int), jobs - 1)
+    return [np.flatnonzero(shard_ids == shard_id) for shard_id in np.unique(shard_ids)]
+
+
+def _predict_sharded(csv_path, annot_csv_path, jobs, shard_kwargs, logger=None):
+    """make predictions with ``jobs`` processes, each predicting one shard of the dataset,
+    then merge the .csv files of annotations for each shard into ``annot_csv_path``.
+
+    If ``resume`` is True in ``shard_kwargs``, annotations already in ``annot_csv_path``,
+    and in .csv files for shards left by an interrupted run (with any number of jobs),
+    are first merged into ``annot_csv_path``, and files that already have annotations
+    are not predicted again."""
+    dataset_df = pd.read_csv(csv_path)
+    pred_df = dataset_df[dataset_df['split'] == 'predict']
+    if len(pred_df) == 0:
+        raise ValueError(
+            f'split predict not found in dataset in csv: {csv_path}'
+        )
+
+    previous_annot_csv_paths = []
+    if shard_kwargs.get('resume'):
+        previous_annot_csv_paths = sorted(annot_csv_path.parent.glob(f'{annot_csv_path.stem}.shard-*-of-*.csv'))
+        if annot_csv_path.exists():
+            previous_annot_csv_paths.insert(0, annot_csv_path)
+    if previous_annot_csv_paths:
+        io.annot.merge(previous_annot_csv_paths, annot_csv_path, drop_last=True)
+        for previous_annot_csv_path in previous_annot_csv_paths:
+            if previous_annot_csv_path != annot_csv_path:
+                previous_annot_csv_path.unlink()
+        done_audio_paths = io.annot.audio_paths(annot_csv_path)
+        is_done = np.array([str(files.spect.find_audio_fname(spect_path)) in done_audio_paths
+                            for spect_path in pred_df['spect_path'].values], dtype=bool)
+        log_or_print(f'resuming, skipping {is_done.sum()} files '
+                     f'that already have annotations in: {annot_csv_path}',
                      logger=logger, level='info')
-        for ind, batch in enumerate(progress_bar):
-            padding_mask, spect_path = batch['padding_mask'], batch['spect_path']
-            padding_mask = np.squeeze(padding_mask)
-            if isinstance(spect_path, list) and len(spect_path) == 1:
-                spect_path = spect_path[0]
-            y_pred = pred_dict[spect_path]
-            y_pred = torch.argmax(y_pred, dim=1)  # assumes class dimension is 1
-            y_pred = torch.flatten(y_pred).cpu().numpy()[padding_mask]
-
-            spect_dict = files.spect.load(spect_path)
-            t = spect_dict[timebins_key]
-            labels, onsets_s, offsets_s = labeled_timebins.lbl_tb2segments(y_pred,
-                                                                           labelmap=labelmap,
-                                                                           t=t,
-                                                                           min_segment_dur=min_segment_dur,
-                                                                           majority_vote=majority_vote)
-            seq = crowsetta.Sequence.from_keyword(labels=labels,
-                                                  onsets_s=onsets_s,
-                                                  offsets_s=offsets_s)
-
-            audio_fname = files.spect.find_audio_fname(spect_path)
-            annot = crowsetta.Annotation(seq=seq, audio_path=audio_fname, annot_path=annot_csv_path.name)
-            annots.append(annot)
-
-        crowsetta.csv.annot2csv(annot=annots,
-                                csv_filename=annot_csv_path)
+        pred_df = pred_df[~is_done]
+        if len(pred_df) == 0:
+            return
+        previous_annot_csv_paths = [annot_csv_path]
+
+    if 'duration' in pred_df.columns:
+        durations = pred_df['duration'].values
+    else:
+        durations = np.ones(len(pred_df))
+    shard_inds = _shard_inds(durations, jobs)
+    num_threads = max(torch.get_num_threads() // len(shard_inds), 1)
+    log_or_print(f'predicting {len(pred_df)} files with {len(shard_inds)} processes, '
+                 f'{num_threads} threads each', logger=logger, level='info')
+
+    shard_annot_csv_paths = [
+        annot_csv_path.with_name(f'{annot_csv_path.stem}.shard-{shard_num}-of-{len(shard_inds)}.csv')
+        for shard_num in range(len(shard_inds))
+    ]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        kwargs_list = []
+        for shard_num, (inds, shard_annot_csv_path) in enumerate(zip(shard_inds, shard_annot_csv_paths)):
+            shard_csv_path = Path(tmp_dir).joinpath(f'{Path(csv_path).stem}.shard-{shard_num}.csv')
+            pred_df.iloc[inds].to_csv(shard_csv_path, index=False)
+            kwargs_list.append(
+                dict(shard_kwargs, csv_path=shard_csv_path, annot_csv_filename=shard_annot_csv_path.name)
+            )
+
+        # multiprocessing.Pool instead of ProcessPoolExecutor, that only accepts
+        # a context and initializer with Python 3.7 and later
+        with multiprocessing.get_context('spawn').Pool(processes=len(shard_inds),
+                                                       initializer=_init_shard_worker,
+                                                       initargs=(num_threads,)) as pool:
+            # any exception raised in a worker is raised here
+            pool.map(_predict_shard, kwargs_list, chunksize=1)
+
+    log_or_print(f'merging annotations for each shard into: {annot_csv_path}',
+                 logger=logger, level='info')
+    io.annot.merge(previous_annot_csv_paths + shard_annot_csv_paths, annot_csv_path)
+    for shard_annot_csv_path in shard_annot_csv_paths:
+        shard_annot_csv_path.unlink()
+
+
+def _net_output_path(output_dir, spect_path, model_name):
+    """get path to file where output of network for a spectrogram is saved"""
+    return Path(output_dir).joinpath(f'{Path(spect_path).stem}.{model_name}{constants.NET_OUTPUT_EXT}')
+
+
+def _stitch_predictions(y_pred_batches, n_timebins, n_classes, window_size, hop_size, net_output=None):
+    """stitch together the frame predictions for consecutive batches of windows
+    from one spectrogram, i.e. network outputs yielded by ``Model.predict_iter``
+    for batches from a ``vak.datasets.WindowStream``.
+
+    Takes the argmax of each batch as it is yielded so that only one batch
+    of network outputs is held in memory, and writes labels for time bins
+    into a vector with the smallest integer dtype that can hold ``n_classes``.
+    If windows overlap, outputs for each time bin are first averaged
+    with ``vak.datasets.window_stream.OverlapAdd``.
+    Predictions for padding at the end of the last batch are discarded.
+
+    Parameters
+    ----------
+    y_pred_batches : iterable
+        of torch.Tensor, network outputs with shape (windows, classes, time bins).
+    n_timebins : int
+        number of time bins in spectrogram.
+    n_classes : int
+        number of classes, i.e. number of labels in labelmap.
+    window_size : int
+        number of time bins in each window.
+    hop_size : int
+        number of time bins between the start of consecutive windows.
+    net_output : numpy.ndarray
+        array with shape (n_classes, n_timebins), e.g. a memory-mapped .npy file,
+        where network outputs are written before taking the argmax.
+        Default is None, in which case outputs are not kept.
+
+    Returns
+    -------
+    y_pred : numpy.ndarray
+        vector of predicted labels, one for each time bin in spectrogram.
+    """
+    y_pred = np.empty(n_timebins, dtype=np.min_scalar_type(-n_classes))
+    start = 0
+
+    def _write(output):
+        # output has shape (classes, time bins), for time bins starting at ``start``
+        stop = min(start + output.shape[-1], n_timebins)
+        if net_output is not None:
+            net_output[:, start:stop] = output[:, :stop - start]
+        y_pred[start:stop] = output[:, :stop - start].argmax(axis=0)
+        return stop
+
+    if hop_size == window_size:
+        for y_pred_batch in y_pred_batches:
+            # (windows, classes, time bins) -> (classes, time bins)
+            start = _write(y_pred_batch.permute(1, 0, 2).flatten(start_dim=1).cpu().numpy())
+    else:
+        overlap_add = OverlapAdd(n_timebins, n_classes, window_size, hop_size)
+        for y_pred_batch in y_pred_batches:
+            start = _write(overlap_add.add(y_pred_batch.cpu().numpy()))
+        start = _write(overlap_add.finish())
+
+    if start != n_timebins:
+        raise ValueError(
+            f'predictions were made for {start} time bins, but spectrogram has {n_timebins} time bins'
+        )
+    return y_pred
+
+
+def _to_annot(y_pred, t, spect_path, labelmap, annot_csv_path, min_segment_dur, majority_vote):
+    """convert vector of predicted labels for time bins into a crowsetta.Annotation"""
+    labels, onsets_s, offsets_s = labeled_timebins.lbl_tb2segments(y_pred,
+                                                                   labelmap=labelmap,
+                                                                   t=t,
+                                                                   min_segment_dur=min_segment_dur,
+                                                                   majority_vote=majority_vote)
+    seq = crowsetta.Sequence.from_keyword(labels=labels,
+                                          onsets_s=onsets_s,
+                                          offsets_s=offsets_s)
+
+    audio_fname = files.spect.find_audio_fname(spect_path)
+    return crowsetta.Annotation(seq=seq, audio_path=audio_fname, annot_path=annot_csv_path.name)
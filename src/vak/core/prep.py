@@ -2,6 +2,7 @@ from datetime import datetime
 from pathlib import Path
 import warnings
 
+from .. import io
 from .. import split
 from ..converters import expanded_user_path, labelset_to_set
 from ..io import dataframe
@@ -28,6 +29,12 @@ def prep(data_dir,
          train_dur=None,
          val_dur=None,
          test_dur=None,
+         consolidate_spects=False,
+         parallel_backend='dask',
+         parallel_workers=None,
+         parallel_chunksize=1,
+         parallel_max_in_flight=None,
+         reuse_spects=False,
          logger=None,
          ):
     """prepare datasets from vocalizations.
@@ -75,6 +82,28 @@ def prep(data_dir,
         total duration of validation set, in seconds. Default is None.
     test_dur : float
         total duration of test set, in seconds. Default is None.
+    consolidate_spects : bool
+        if True, concatenate all spectrograms in the training split into a single
+        array file that can be memory-mapped, and do the same for the vectors
+        of labeled timebins. Requires annotations and ``labelset``.
+        See ``vak.io.spect_store.to_store`` for details. Default is False.
+    parallel_backend : str
+        used to process files in parallel. One of {'dask', 'process'}.
+        Default is 'dask'. See ``vak.io.dataframe.from_files``.
+    parallel_workers : int
+        number of worker processes, for the 'process' backend.
+        Default is None, in which case the number of CPUs is used.
+    parallel_chunksize : int
+        number of files sent to a worker at a time, for the 'process' backend.
+        Default is 1.
+    parallel_max_in_flight : int
+        maximum number of files being processed at a time, for the 'process' backend.
+        Default is None, in which case it is twice the number of workers times the chunksize.
+    reuse_spects : bool
+        if True, only make spectrograms for audio files that are new or changed
+        since the last time a dataset was prepared with the same ``spect_output_dir``
+        and ``spect_params``, and re-use the rest. See ``vak.io.dataframe.from_files``.
+        Default is False.
 
     Other Parameters
     ----------------
@@ -113,6 +142,12 @@ def prep(data_dir,
     then the function assumes all the vocalizations constitute a single
     dataset, and for all rows the 'split' columns for that dataset
     will be 'predict' or 'test' (respectively).
+
+    If the dataset has annotations and a ``labelset`` is specified,
+    a vector of labeled timebins is saved for each spectrogram file,
+    in the same directory as that file, and the path is added
+    to the 'lbl_tb_path' column of the .csv.
+    See ``vak.io.labeled_timebins.to_files`` for details.
     """
     # pre-conditions ---------------------------------------------------------------------------------------------------
     if purpose not in VALID_PURPOSES:
@@ -154,6 +189,13 @@ def prep(data_dir,
                 f'spect_output_dir not found: {spect_output_dir}'
             )
 
+    if consolidate_spects and (annot_format is None or labelset is None):
+        raise ValueError(
+            'consolidate_spects is True, but annot_format or labelset was not specified. '
+            'Consolidating spectrograms requires annotations and a labelset, '
+            'to make vectors of labeled timebins.'
+        )
+
     if purpose == 'predict':
         if labelset is not None:
             warnings.warn(
@@ -208,8 +250,27 @@ def prep(data_dir,
                                   spect_format=spect_format,
                                   spect_output_dir=spect_output_dir,
                                   spect_params=spect_params,
+                                  backend=parallel_backend,
+                                  workers=parallel_workers,
+                                  chunksize=parallel_chunksize,
+                                  max_in_flight=parallel_max_in_flight,
+                                  reuse_spects=reuse_spects,
                                   logger=logger)
 
+    if spect_params is None:
+        spect_key, timebins_key = 's', 't'
+    elif type(spect_params) is dict:
+        spect_key, timebins_key = spect_params.get('spect_key', 's'), spect_params.get('timebins_key', 't')
+    else:
+        spect_key, timebins_key = spect_params.spect_key, spect_params.timebins_key
+
+    # ---- save labeled timebins, so they are not made from annotations every time they're used ------------------------
+    if annot_format is not None and labelset is not None:
+        vak_df = io.labeled_timebins.to_files(vak_df,
+                                              labelset=labelset,
+                                              timebins_key=timebins_key,
+                                              logger=logger)
+
     if do_split:
         # save before splitting, jic duration args are not valid (we can't know until we make dataset)
         vak_df.to_csv(csv_path)
@@ -230,6 +291,19 @@ def prep(data_dir,
 
         vak_df = dataframe.add_split_col(vak_df, split=split_name)
 
+    if consolidate_spects:
+        if vak_df['split'].str.contains('train').any():
+            vak_df = io.spect_store.to_store(vak_df,
+                                             split='train',
+                                             output_dir=output_dir,
+                                             fname_stem=csv_fname_stem,
+                                             spect_key=spect_key,
+                                             logger=logger)
+        else:
+            log_or_print(msg='consolidate_spects is True but dataset has no training split, '
+                             'will not consolidate spectrograms',
+                         logger=logger, level='warning')
+
     log_or_print(msg=f'saving dataset as a .csv file: {csv_path}', logger=logger, level='info')
     vak_df.to_csv(csv_path, index=False)  # index is False to avoid having "Unnamed: 0" column when loading
 
@@ -11,6 +11,8 @@ from .. import labels
 from .. import models
 from .. import summary_writer
 from .. import transforms
+from ..datasets.dataloader import get_dataloader
+from ..datasets.sampler import FileChunkSampler
 from ..datasets.window_dataset import WindowDataset
 from ..datasets.vocal_dataset import VocalDataset
 from ..device import get_default as get_default_device
@@ -38,6 +40,10 @@ def train(model_config_map,
           ckpt_step=None,
           patience=None,
           device=None,
+          cache_max_bytes=None,
+          file_chunk_size=None,
+          mixed_precision=False,
+          dataloader_kwargs=None,
           logger=None,
           ):
     """train models using training set specified in config.toml file.
@@ -59,6 +65,8 @@ def train(model_config_map,
         shonw to neural networks
     batch_size : int
         number of samples per batch presented to models during training.
+        Also the number of windows in each batch during validation,
+        where windows from several files are packed into each batch.
     num_epochs : int
         number of training epochs. One epoch = one iteration through the entire
         training set.
@@ -115,6 +123,25 @@ def train(model_config_map,
         number of validation steps to wait without performance on the
         validation set improving before stopping the training.
         Default is None, in which case training only stops after the specified number of epochs.
+    cache_max_bytes : int
+        Parameter for WindowDataset. Maximum number of bytes that each process
+        loading training data can use to cache spectrograms and labeled timebins.
+        Default is None, in which case no cache is used.
+    file_chunk_size : int
+        number of windows from the same spectrogram file that are drawn together
+        when shuffling training data, using ``vak.datasets.FileChunkSampler``.
+        Default is None, in which case windows are shuffled individually.
+    mixed_precision : bool
+        if True, train in mixed precision, with operations that support it run
+        with autocast in bfloat16 on CPU or in float16 on GPU, where losses are scaled
+        with ``torch.cuda.amp.GradScaler``. Validation also uses autocast.
+        Autocast on CPU requires torch 1.10 or later; with earlier versions,
+        training on CPU runs in float32.
+        Default is False.
+    dataloader_kwargs : dict
+        keyword arguments passed to ``vak.datasets.get_dataloader``
+        when creating DataLoaders, e.g. ``persistent_workers`` and ``prefetch_factor``.
+        Default is None.
 
     Other Parameters
     ----------------
@@ -218,16 +245,34 @@ def train(model_config_map,
                                            spect_key=spect_key,
                                            timebins_key=timebins_key,
                                            transform=transform,
-                                           target_transform=target_transform
+                                           target_transform=target_transform,
+                                           cache_max_bytes=cache_max_bytes,
                                            )
     log_or_print(
         f'Duration of WindowDataset used for training, in seconds: {train_dataset.duration()}',
         logger=logger, level='info'
     )
-    train_data = torch.utils.data.DataLoader(dataset=train_dataset,
-                                             shuffle=shuffle,
-                                             batch_size=batch_size,
-                                             num_workers=num_workers)
+    if dataloader_kwargs is None:
+        dataloader_kwargs = {}
+    if num_workers > 0:
+        # so each worker process does not receive its own copy of dataset arrays
+        train_dataset.share_memory()
+    if file_chunk_size is not None:
+        # shuffle chunks of windows from the same file, and fetch each batch with
+        # WindowDataset.__getitems__, so each batch loads only a few files, once each
+        sampler = FileChunkSampler(train_dataset, chunk_size=file_chunk_size, shuffle=shuffle)
+        train_data = get_dataloader(train_dataset,
+                                    batch_sampler=torch.utils.data.BatchSampler(sampler,
+                                                                                batch_size=batch_size,
+                                                                                drop_last=False),
+                                    num_workers=num_workers,
+                                    **dataloader_kwargs)
+    else:
+        train_data = get_dataloader(train_dataset,
+                                    shuffle=shuffle,
+                                    batch_size=batch_size,
+                                    num_workers=num_workers,
+                                    **dataloader_kwargs)
 
     # ---------------- load validation set (if there is one) -----------------------------------------------------------
     if val_step:
@@ -243,11 +288,12 @@ def train(model_config_map,
                                             timebins_key=timebins_key,
                                             item_transform=item_transform,
                                             )
-        val_data = torch.utils.data.DataLoader(dataset=val_dataset,
-                                               shuffle=False,
-                                               # batch size 1 because each spectrogram reshaped into a batch of windows
-                                               batch_size=1,
-                                               num_workers=num_workers)
+        val_data = get_dataloader(val_dataset,
+                                  shuffle=False,
+                                  # batch size 1 because each spectrogram reshaped into a batch of windows
+                                  batch_size=1,
+                                  num_workers=num_workers,
+                                  **dataloader_kwargs)
         val_dur = dataframe.split_dur(dataset_df, 'val')
         log_or_print(
             f'Total duration of validation split from dataset (in s): {val_dur}',
@@ -286,4 +332,6 @@ def train(model_config_map,
                   val_step=val_step,
                   ckpt_step=ckpt_step,
                   patience=patience,
-                  device=device)
+                  device=device,
+                  val_batch_size=batch_size,
+                  mixed_precision=mixed_precision)
@@ -1,6 +1,8 @@
+import numpy as np
 import pandas as pd
 
 from . import annotation, files, labels, labeled_timebins
+from .io.labeled_timebins import LBL_TB_PATH_COL
 
 
 def has_unlabeled(csv_path, labelset, timebins_key='t'):
@@ -24,20 +26,31 @@ def has_unlabeled(csv_path, labelset, timebins_key='t'):
     -------
     has_unlabeled : bool
         if True, dataset has unlabeled segments.
-    """
-    tmp_labelmap = labels.to_map(labelset, map_unlabeled=False)
 
+    Notes
+    -----
+    If the dataset has vectors of labeled timebins saved by ``vak prep``
+    (in the 'lbl_tb_path' column), those are used, instead of
+    making the vectors from annotations.
+    """
     vak_df = pd.read_csv(csv_path)
-    annots = annotation.from_df(vak_df)
+    if LBL_TB_PATH_COL in vak_df.columns:
+        # vectors saved by prep always map unlabeled time bins to 0, see vak.io.labeled_timebins.to_files
+        return any(
+            [np.any(np.load(lbl_tb_path) == 0) for lbl_tb_path in vak_df[LBL_TB_PATH_COL].values]
+        )
+
+    tmp_labelmap = labels.to_map(labelset, map_unlabeled=False)
+    annot_table = annotation.to_table(annotation.from_df(vak_df), tmp_labelmap)
 
     has_unlabeled_list = []
-    for annot, spect_path in zip(annots, vak_df['spect_path'].values):
+    for ind, spect_path in enumerate(vak_df['spect_path'].values):
         time_bins = files.spect.load(spect_path)[timebins_key]
-        lbls_int = [tmp_labelmap[lbl] for lbl in annot.seq.labels]
+        lbls_int, onsets_s, offsets_s = annot_table.segments(ind)
         has_unlabeled_list.append(
             labeled_timebins.has_unlabeled(lbls_int,
-                                           annot.seq.onsets_s,
-                                           annot.seq.offsets_s,
+                                           onsets_s,
+                                           offsets_s,
                                            time_bins)
         )
 
@@ -1,7 +1,17 @@
+from .dataloader import get_dataloader
+from .sampler import FileChunkSampler
+from .spect_cache import SpectCache
 from .vocal_dataset import VocalDataset
 from .window_dataset import WindowDataset
+from .window_index import WindowIndex
+from .window_stream import WindowStream
 
 __all__ = [
+    'FileChunkSampler',
+    'SpectCache',
     'VocalDataset',
-    'WindowDataset'
+    'WindowDataset',
+    'WindowIndex',
+    'WindowStream',
+    'get_dataloader',
 ]
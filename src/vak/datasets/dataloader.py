@@ -0,0 +1,139 @@
+import random
+
+import numpy as np
+import torch
+
+
+class WorkerInit:
+    """Function called by each DataLoader worker process when it starts,
+    i.e. ``worker_init_fn`` for ``torch.utils.data.DataLoader``.
+
+    Seeds the ``random`` and ``numpy`` random number generators in the worker
+    from the seed torch assigns to it, which is different for each worker.
+    Without this, workers started by forking all have copies of the same
+    numpy random state, and make the same "random" draws.
+    Also sets the number of threads torch uses in the worker, so that
+    workers do not each start as many threads as there are CPU cores,
+    and compete with the main process for them.
+
+    A class instead of a function so that it can be pickled
+    when workers are started with the 'spawn' method.
+
+    Parameters
+    ----------
+    num_threads : int
+        number of threads torch uses in each worker. Default is 1.
+        If None, the number of threads is not changed.
+    """
+    def __init__(self, num_threads=1):
+        self.num_threads = num_threads
+
+    def __call__(self, worker_id):
+        seed = torch.initial_seed() % 2 ** 32
+        random.seed(seed)
+        np.random.seed(seed)
+        if self.num_threads is not None:
+            torch.set_num_threads(self.num_threads)
+
+
+class BatchFetcher(torch.utils.data.Dataset):
+    """Wraps a dataset so that indexing with a list of indices
+    returns the items for a whole batch, from ``dataset.__getitems__``.
+
+    ``torch.utils.data.DataLoader`` only calls ``__getitems__`` in torch 2.0 and later.
+    Used by ``get_dataloader`` with ``batch_sampler``, so that a DataLoader
+    with ``batch_size=None`` passes each list of indices yielded by the
+    sampler to ``__getitems__``, with any version of torch.
+
+    Parameters
+    ----------
+    dataset : torch.utils.data.Dataset
+        with a ``__getitems__`` method, e.g. ``vak.datasets.WindowDataset``.
+    """
+    def __init__(self, dataset):
+        self.dataset = dataset
+
+    def __len__(self):
+        return len(self.dataset)
+
+    def __getitem__(self, indices):
+        return self.dataset.__getitems__(list(indices))
+
+
+def get_dataloader(dataset,
+                   batch_size=1,
+                   shuffle=False,
+                   sampler=None,
+                   batch_sampler=None,
+                   num_workers=0,
+                   persistent_workers=False,
+                   prefetch_factor=None,
+                   pin_memory=False,
+                   worker_num_threads=1):
+    """get a ``torch.utils.data.DataLoader``, with options used
+    for all DataLoaders in vak, that are set in the ``[DATALOADER]`` section of config.
+
+    Used to load training, validation, and test data, and data to predict.
+
+    Parameters
+    ----------
+    dataset : torch.utils.data.Dataset
+        dataset to load from.
+    batch_size : int
+        number of samples in each batch. Default is 1.
+    shuffle : bool
+        if True, shuffle samples before each epoch. Default is False.
+    sampler : torch.utils.data.Sampler
+        sampler that yields indices of samples. Cannot be used with ``shuffle``.
+        Default is None.
+    batch_sampler : torch.utils.data.Sampler
+        sampler that yields lists of indices of samples in each batch,
+        e.g. a ``torch.utils.data.BatchSampler``. If specified, each batch is fetched
+        with a single call to ``dataset.__getitems__``, using ``BatchFetcher``,
+        and ``batch_size``, ``shuffle`` and ``sampler`` are ignored. Default is None.
+    num_workers : int
+        number of processes that load data. Default is 0,
+        in which case data is loaded in the main process.
+    persistent_workers : bool
+        if True, worker processes are kept running after each pass through the dataset,
+        instead of being shut down and started again for the next epoch,
+        or for each validation pass during training. Default is False.
+        Ignored if ``num_workers`` is 0.
+    prefetch_factor : int
+        number of batches that each worker loads in advance. Default is None,
+        in which case the default of ``torch.utils.data.DataLoader`` is used.
+        Ignored if ``num_workers`` is 0.
+    pin_memory : bool
+        if True, copy batches into pinned memory, which makes copying them to a GPU faster.
+        Default is False.
+    worker_num_threads : int
+        number of threads torch uses in each worker, set by ``WorkerInit``.
+        Default is 1.
+
+    Returns
+    -------
+    dataloader : torch.utils.data.DataLoader
+    """
+    kwargs = dict(
+        batch_size=batch_size,
+        num_workers=num_workers,
+        pin_memory=pin_memory,
+    )
+    if batch_sampler is not None:
+        # with batch_size None, each list of indices from the sampler is passed to the dataset
+        # as one index, and the items it returns are collated into a batch
+        dataset = BatchFetcher(dataset)
+        kwargs['batch_size'] = None
+        kwargs['sampler'] = batch_sampler
+        kwargs['collate_fn'] = torch.utils.data.dataloader.default_collate
+    elif sampler is not None:
+        kwargs['sampler'] = sampler
+    else:
+        kwargs['shuffle'] = shuffle
+    # options for workers raise errors when there are no workers
+    if num_workers > 0:
+        kwargs['worker_init_fn'] = WorkerInit(worker_num_threads)
+        kwargs['persistent_workers'] = persistent_workers
+        if prefetch_factor is not None:
+            kwargs['prefetch_factor'] = prefetch_factor
+    return torch.utils.data.DataLoader(dataset=dataset, **kwargs)
@@ -0,0 +1,95 @@
+import numpy as np
+import torch
+
+
+class FileChunkSampler(torch.utils.data.Sampler):
+    """Sampler that yields indices of windows in a WindowDataset,
+    grouped into "chunks" of windows that all come from the same spectrogram file.
+
+    Randomly drawing windows from the whole dataset means that almost
+    every window in a batch comes from a different file, so every window
+    requires loading a file. This sampler instead shuffles at the granularity
+    of chunks: the windows from each file are shuffled and split into chunks
+    of ``chunk_size`` windows, then the order of all chunks in the dataset is shuffled.
+    A batch of size ``batch_size`` then contains windows from about
+    ``batch_size / chunk_size`` files, and ``WindowDataset.__getitems__`` loads
+    each of those files once per batch.
+
+    Parameters
+    ----------
+    data_source : vak.datasets.WindowDataset
+        dataset to sample windows from.
+    chunk_size : int
+        number of windows from the same file in each chunk. Larger values mean fewer
+        files are loaded per batch, but less randomness in each batch.
+    shuffle : bool
+        if True, shuffle windows within files and the order of chunks before each epoch.
+        If False, yield indices in order, which already groups windows by file.
+        Default is True.
+    generator : torch.Generator
+        generator used to shuffle. Default is None, in which case a seed is drawn
+        from the default torch generator, so that results depend on ``torch.manual_seed``,
+        as with ``torch.utils.data.RandomSampler``.
+
+    Examples
+    --------
+    >>> sampler = vak.datasets.FileChunkSampler(train_dataset, chunk_size=8)
+    >>> batch_sampler = torch.utils.data.BatchSampler(sampler, batch_size=64, drop_last=False)
+    >>> train_data = vak.datasets.get_dataloader(train_dataset, batch_sampler=batch_sampler)
+    """
+    def __init__(self, data_source, chunk_size, shuffle=True, generator=None):
+        if not isinstance(chunk_size, int) or isinstance(chunk_size, bool):
+            raise TypeError(
+                f'chunk_size must be an int but type was: {type(chunk_size)}'
+            )
+        if chunk_size < 1:
+            raise ValueError(
+                f'chunk_size must be a positive integer but was: {chunk_size}'
+            )
+        self.data_source = data_source
+        self.chunk_size = chunk_size
+        self.shuffle = shuffle
+        self.generator = generator
+        # 'id' of the spectrogram file each window in dataset comes from, i.e. index into spect_paths
+        self.spect_ids = data_source.window_index.window_spect_ids()
+
+    def _rng(self):
+        """get numpy random generator, seeded from the torch generator"""
+        seed = int(torch.empty((), dtype=torch.int64).random_(generator=self.generator).item())
+        return np.random.default_rng(seed)
+
+    def chunk_order(self):
+        """get the order in which indices are yielded for one epoch
+
+        Returns
+        -------
+        inds : numpy.ndarray
+            of indices into data_source, with length equal to the length of data_source.
+        """
+        n_windows = len(self.spect_ids)
+        if not self.shuffle:
+            return np.arange(n_windows)
+
+        rng = self._rng()
+        # shuffle all windows, then sort by file; stable sort keeps windows within a file shuffled
+        perm = rng.permutation(n_windows)
+        perm = perm[np.argsort(self.spect_ids[perm], kind='stable')]
+        ids_sorted = self.spect_ids[perm]
+
+        # assign each window to a chunk, numbered consecutively across files
+        file_starts = np.concatenate(([0], np.flatnonzero(np.diff(ids_sorted)) + 1))
+        file_sizes = np.diff(np.concatenate((file_starts, [n_windows])))
+        rank_in_file = np.arange(n_windows) - np.repeat(file_starts, file_sizes)
+        chunks_per_file = -(-file_sizes // self.chunk_size)  # ceiling division
+        chunk_offsets = np.concatenate(([0], np.cumsum(chunks_per_file)[:-1]))
+        chunk_ids = np.repeat(chunk_offsets, file_sizes) + rank_in_file // self.chunk_size
+
+        # shuffle order of chunks; stable sort keeps windows of a chunk together
+        chunk_rank = rng.permutation(chunks_per_file.sum())
+        return perm[np.argsort(chunk_rank[chunk_ids], kind='stable')]
+
+    def __iter__(self):
+        return iter(self.chunk_order().tolist())
+
+    def __len__(self):
+        return len(self.spect_ids)
@@ -0,0 +1,60 @@
+"""helper that moves numpy arrays held by datasets into shared memory,
+so DataLoader worker processes do not each receive a copy"""
+import numpy as np
+import torch
+
+
+class SharedArraysMixin:
+    """Mixin for classes that hold numpy arrays as attributes,
+    that lets those arrays be moved into shared memory.
+
+    Classes that use this mixin list the names of array attributes
+    in the class attribute ``_shared_array_attrs``.
+    Calling ``share_memory`` copies each array into a torch tensor in shared memory,
+    and replaces the attribute with a numpy view of the tensor.
+    When the instance is pickled, e.g. to send it to a DataLoader worker
+    with the 'spawn' or 'forkserver' start methods, the tensors are pickled
+    instead of the arrays. ``torch.multiprocessing`` pickles a tensor in shared memory
+    as a handle to the memory, so the worker receives a view of the same memory, not a copy.
+
+    Arrays with dtypes that torch does not support, e.g. fixed-width strings,
+    are shared as bytes and viewed with their original dtype.
+    """
+    _shared_array_attrs = ()
+
+    def share_memory(self):
+        """move arrays into shared memory. Returns the instance."""
+        shared_tensors = {}
+        for name in self._shared_array_attrs:
+            arr = getattr(self, name, None)
+            if arr is None:
+                continue
+            arr = np.ascontiguousarray(arr)
+            if arr.dtype == object:
+                # e.g. column of paths from DataFrame; convert to fixed-width strings
+                arr = arr.astype(str)
+            tensor = torch.from_numpy(arr.reshape(-1).view(np.uint8)).clone().share_memory_()
+            shared_tensors[name] = (tensor, arr.dtype, arr.shape)
+        self._shared_tensors = shared_tensors
+        self._view_shared_tensors()
+        return self
+
+    def is_shared(self):
+        """True if arrays were moved into shared memory with ``share_memory``"""
+        return bool(getattr(self, '_shared_tensors', None))
+
+    def _view_shared_tensors(self):
+        for name, (tensor, dtype, shape) in self._shared_tensors.items():
+            setattr(self, name, tensor.numpy().view(dtype).reshape(shape))
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # arrays are views of shared tensors, pickle tensors instead so data is not copied
+        for name in getattr(self, '_shared_tensors', {}):
+            state[name] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if getattr(self, '_shared_tensors', None):
+            self._view_shared_tensors()
@@ -0,0 +1,119 @@
+"""least-recently-used cache for arrays loaded from spectrogram files.
+
+Used by datasets that take many items from the same file,
+e.g. ``vak.datasets.WindowDataset``, so that each file
+is loaded (and labeled) once instead of once per item.
+"""
+from collections import OrderedDict, namedtuple
+import os
+
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'max_bytes', 'curr_bytes', 'curr_size'])
+
+
+class SpectCache:
+    """bounded least-recently-used cache, with a budget in bytes.
+
+    Each value is a tuple of numpy arrays; the number of bytes
+    a value uses is the sum of the ``nbytes`` attribute of those arrays.
+    When adding a value would exceed ``max_bytes``, the least-recently-used
+    values are evicted until the new value fits.
+    Values that are larger than ``max_bytes`` by themselves are never cached.
+
+    Attributes
+    ----------
+    max_bytes : int
+        maximum number of bytes that values in the cache can use.
+    hits : int
+        number of times a value was found in the cache.
+    misses : int
+        number of times a value was not found in the cache and had to be loaded.
+    curr_bytes : int
+        number of bytes used by values currently in the cache.
+
+    Notes
+    -----
+    There is one cache per process. When a dataset is copied into a
+    ``torch.utils.data.DataLoader`` worker, either by pickling or by forking,
+    the worker starts with an empty cache and its own hit / miss counters.
+    This avoids sharing (and copying) arrays loaded by the main process,
+    and means that ``max_bytes`` is a budget for each worker.
+    """
+    def __init__(self, max_bytes):
+        if not (type(max_bytes) is int and max_bytes > 0):
+            raise ValueError(
+                f'max_bytes must be a positive integer but was: {max_bytes}'
+            )
+        self.max_bytes = max_bytes
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._values = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.curr_bytes = 0
+
+    def __getstate__(self):
+        # do not pickle cached arrays, e.g. when dataset is sent to DataLoader worker processes
+        return {'max_bytes': self.max_bytes}
+
+    def __setstate__(self, state):
+        self.max_bytes = state['max_bytes']
+        self._reset()
+
+    def __len__(self):
+        return len(self._values)
+
+    def __contains__(self, key):
+        return key in self._values
+
+    @staticmethod
+    def _nbytes(value):
+        return sum(arr.nbytes for arr in value)
+
+    def get(self, key, load_func):
+        """get value from cache, calling ``load_func`` to load it
+        if it is not already in the cache.
+
+        Parameters
+        ----------
+        key : hashable
+            key for value, e.g. the index of a spectrogram file in a dataset.
+        load_func : callable
+            that accepts ``key`` as its only argument, and returns
+            a tuple of numpy arrays. Called when ``key`` is not in the cache.
+
+        Returns
+        -------
+        value : tuple
+            of numpy arrays
+        """
+        if os.getpid() != self._pid:
+            # we were forked into a new process, e.g. a DataLoader worker; start with empty cache
+            self._reset()
+
+        if key in self._values:
+            self.hits += 1
+            self._values.move_to_end(key)
+            return self._values[key]
+
+        self.misses += 1
+        value = load_func(key)
+        value_bytes = self._nbytes(value)
+        if value_bytes <= self.max_bytes:
+            while self.curr_bytes + value_bytes > self.max_bytes:
+                _, evicted = self._values.popitem(last=False)
+                self.curr_bytes -= self._nbytes(evicted)
+            self._values[key] = value
+            self.curr_bytes += value_bytes
+        return value
+
+    def clear(self):
+        """remove all values from cache and reset counters"""
+        self._reset()
+
+    def info(self):
+        """return a named tuple with hits, misses, max_bytes, curr_bytes, and curr_size,
+        the number of values currently in the cache"""
+        return CacheInfo(self.hits, self.misses, self.max_bytes, self.curr_bytes, len(self._values))
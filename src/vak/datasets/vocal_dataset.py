@@ -3,6 +3,7 @@ import pandas as pd
 from .. import annotation
 from .. import files
 from .. import labeled_timebins
+from ..io.labeled_timebins import LBL_TB_PATH_COL, labelmap_from_df
 
 
 class VocalDataset:
@@ -19,6 +20,8 @@ class VocalDataset:
                  spect_key='s',
                  timebins_key='t',
                  item_transform=None,
+                 lbl_tb_paths=None,
+                 lbl_tb_labelmap=None,
                  ):
         """initialize a VocalDataset instance
 
@@ -46,6 +49,15 @@ class VocalDataset:
             and optionally a target array or Tensor, and returns a dictionary.
             This dictionary is the item returned when indexing into the dataset.
             Default is None.
+        lbl_tb_paths : numpy.ndarray
+            column from DataFrame that represents dataset,
+            consisting of paths to files containing vectors of labeled timebins
+            saved by ``vak prep``. Default is None, in which case vectors are made
+            from annots.
+        lbl_tb_labelmap : dict
+            labelmap used to encode vectors of labeled timebins saved by ``vak prep``,
+            see ``vak.io.labeled_timebins.labelmap_from_df``. Default is None,
+            in which case it is assumed to be the same as ``labelmap``.
         """
         self.csv_path = csv_path
         self.spect_paths = spect_paths
@@ -60,6 +72,15 @@ class VocalDataset:
             # just assign dummy value that will end up getting replaced by actual labels by label_timebins()
             self.unlabeled_label = 0
         self.item_transform = item_transform
+        self.lbl_tb_paths = lbl_tb_paths
+        if lbl_tb_paths is not None:
+            self.lbl_tb_table = labeled_timebins.lookup_table(self.labelmap, self.unlabeled_label, lbl_tb_labelmap)
+            self.annot_table = None
+        elif annots is not None:
+            # map labels to integers once, so items are made by slicing arrays
+            self.annot_table = annotation.to_table(annots, self.labelmap)
+        else:
+            self.annot_table = None
 
         tmp_x_ind = 0
         tmp_item = self.__getitem__(tmp_x_ind)
@@ -73,16 +94,17 @@ class VocalDataset:
         spect = spect_dict[self.spect_key]
 
         if self.annots is not None:
-            timebins = spect_dict[self.timebins_key]
-
-            annot = self.annots[idx]
-            lbls_int = [self.labelmap[lbl] for lbl in annot.seq.labels]
             # "lbl_tb": labeled timebins. Target for output of network
-            lbl_tb = labeled_timebins.label_timebins(lbls_int,
-                                                     annot.seq.onsets_s,
-                                                     annot.seq.offsets_s,
-                                                     timebins,
-                                                     unlabeled_label=self.unlabeled_label)
+            if self.lbl_tb_paths is not None:
+                lbl_tb = labeled_timebins.from_file(self.lbl_tb_paths[idx], self.lbl_tb_table)
+            else:
+                timebins = spect_dict[self.timebins_key]
+                lbls_int, onsets_s, offsets_s = self.annot_table.segments(idx)
+                lbl_tb = labeled_timebins.label_timebins(lbls_int,
+                                                         onsets_s,
+                                                         offsets_s,
+                                                         timebins,
+                                                         unlabeled_label=self.unlabeled_label)
             item = self.item_transform(spect, lbl_tb, spect_path)
         else:
             item = self.item_transform(spect, spect_path)
@@ -141,6 +163,12 @@ class VocalDataset:
         # below, annots will be None if no format is specified in the `annot_format` column of the dataframe.
         # this is intended behavior; makes it possible to use same dataset class for prediction
         annots = annotation.from_df(df)
+        if annots is not None and LBL_TB_PATH_COL in df.columns:
+            lbl_tb_paths = df[LBL_TB_PATH_COL].values
+            lbl_tb_labelmap = labelmap_from_df(df)
+        else:
+            lbl_tb_paths = None
+            lbl_tb_labelmap = None
 
         return cls(csv_path,
                    spect_paths,
@@ -149,4 +177,6 @@ class VocalDataset:
                    spect_key,
                    timebins_key,
                    item_transform,
+                   lbl_tb_paths,
+                   lbl_tb_labelmap,
                    )
@@ -9,9 +9,26 @@ from .. import files
 from .. import io
 from .. import labeled_timebins
 from .. import validators
-
-
-class WindowDataset(VisionDataset):
+from ..io.labeled_timebins import LBL_TB_PATH_COL
+from ..io.spect_store import LBL_TB_STORE_PATH_COL, SPECT_STORE_PATH_COL, STORE_START_COL, STORE_STOP_COL
+from .shared_memory import SharedArraysMixin
+from .spect_cache import SpectCache
+from .window_index import WindowIndex
+
+
+def _has_classes(lbl_tb, classes):
+    """returns True if the set of labels in lbl_tb is exactly ``classes``,
+    a sorted array of integer labels. Equivalent to
+    ``np.array_equal(np.unique(lbl_tb), classes)`` but linear in the length of lbl_tb"""
+    if lbl_tb.shape[-1] == 0:
+        return classes.shape[-1] == 0
+    if lbl_tb.min() < 0:
+        return np.array_equal(np.unique(lbl_tb), classes)
+    counts = np.bincount(lbl_tb)
+    return np.array_equal(np.flatnonzero(counts), classes)
+
+
+class WindowDataset(SharedArraysMixin, VisionDataset):
     """Dataset class that represents all possible windows
      of a fixed width from a set of spectrograms.
      The underlying dataset consists of spectrograms
@@ -27,13 +44,20 @@ class WindowDataset(VisionDataset):
     root : str, Path
         path to a .csv file that represents the dataset.
         Name 'root' is used for consistency with torchvision.datasets
+    window_index : vak.datasets.window_index.WindowIndex
+        compact representation of all windows in the dataset,
+        that maps an index into the dataset to a spectrogram and
+        the start index of a window in that spectrogram.
     x_inds : numpy.ndarray
-        indices of each window in the dataset
+        indices of each window in the dataset.
+        Made from window_index when accessed.
     spect_id_vector : numpy.ndarray
-        represents the 'id' of any spectrogram,
-        i.e., the index into spect_paths that will let us load it
+        represents the 'id' of the spectrogram for each window,
+        i.e., the index into spect_paths that will let us load it.
+        Made from window_index when accessed.
     spect_inds_vector : numpy.ndarray
-        valid indices of windows we can grab from each spectrogram
+        start index of each window within its spectrogram.
+        Made from window_index when accessed.
     spect_paths : numpy.ndarray
         column from DataFrame that represents dataset,
         consisting of paths to files containing spectrograms as arrays
@@ -57,6 +81,29 @@ class WindowDataset(VisionDataset):
         Default is None.
     target_transform : callable
         A function/transform that takes in the target and transforms it.
+    cache : vak.datasets.spect_cache.SpectCache
+        least-recently-used cache of spectrograms and labeled timebins,
+        keyed by spect_id. None if dataset was created with cache_max_bytes=None.
+    lbl_tb_paths : numpy.ndarray
+        paths to files containing vectors of labeled timebins saved by ``vak prep``,
+        one for each spectrogram in spect_paths. If None, vectors are made from annots.
+    spect_store_path : str
+        path to a "store", a single .npy file containing all spectrograms
+        in the dataset, saved by ``vak prep``. If not None, windows are taken
+        from the store instead of loading spectrogram files.
+    lbl_tb_store_path : str
+        path to store of vectors of labeled timebins, saved by ``vak prep``
+        along with the store of spectrograms.
+    store_starts : numpy.ndarray
+        index where each spectrogram in spect_paths starts in the stores.
+    annot_labels_int, annot_onsets_s, annot_offsets_s : numpy.ndarray
+        labels mapped to integers, onsets, and offsets of all segments in annots,
+        used to make labeled timebins when dataset does not have lbl_tb_paths.
+        None if lbl_tb_paths or a store is used.
+    annot_file_offsets : numpy.ndarray
+        index of first segment of each annotation in annot_labels_int,
+        annot_onsets_s, and annot_offsets_s, with total number of segments appended.
+        See ``vak.annotation.to_table``.
 
     Notes
     -----
@@ -77,12 +124,50 @@ class WindowDataset(VisionDataset):
     When we want to grab a batch of size b of windows, we get b indices from x,
     and then index into vectors (1) and (2) so we know which spectrogram files to
     load, and which windows to grab from each spectrogram
+
+    These vectors have one element per time bin, so for long datasets
+    they would use a lot of memory, and each DataLoader worker would receive
+    a copy. When a WindowDataset is initialized, they are converted to
+    a ``vak.datasets.window_index.WindowIndex``, that stores
+    consecutive windows from the same spectrogram as a single "run".
+    The attributes ``x_inds``, ``spect_id_vector`` and ``spect_inds_vector``
+    are still available, made from the index when accessed, with one element
+    per window, so that ``spect_id_vector[x_inds[idx]]`` gives the same result.
+
+    If the dataset was prepared with the option ``consolidate_spects``,
+    the spectrograms are concatenated into a single "store" array file
+    (see ``vak.io.spect_store``). In that case, the value in spect_inds_vector
+    plus the index where the spectrogram starts in the store gives the
+    index of the window in the store. The store is memory-mapped,
+    and windows are views into it, so no copy is made until a window
+    is transformed or collated into a batch. Memory-mapped pages are
+    shared by all DataLoader worker processes.
+
+    When a DataLoader fetches a batch, ``__getitems__`` groups the windows
+    in the batch by file and loads each file once. To make batches contain
+    windows from only a few files, use ``vak.datasets.FileChunkSampler``.
+
+    Because many windows are taken from the same spectrogram file,
+    the dataset can keep a least-recently-used cache of loaded
+    spectrograms and their labeled timebins, so each file is loaded
+    and labeled once instead of once per window. Each DataLoader worker
+    has its own cache; see ``vak.datasets.spect_cache.SpectCache``.
+
+    DataLoader worker processes receive a copy of the dataset.
+    To keep that copy small, annotations are flattened into arrays
+    when the dataset is initialized, and ``annots`` is not sent to workers.
+    Calling ``share_memory`` moves the index of windows and the other arrays
+    into shared memory, so that workers receive handles to the same memory instead
+    of copies; see ``vak.datasets.shared_memory.SharedArraysMixin``.
     """
 
     # class attribute, constant used by several methods
     # with x_inds, to mark invalid starting indices for windows
     INVALID_WINDOW_VAL = -1
 
+    _shared_array_attrs = ('spect_paths', 'lbl_tb_paths', 'store_starts', 'lbl_tb_table',
+                           'annot_labels_int', 'annot_onsets_s', 'annot_offsets_s', 'annot_file_offsets')
+
     def __init__(self,
                  root,
                  x_inds,
@@ -97,6 +182,13 @@ class WindowDataset(VisionDataset):
                  timebins_key='t',
                  transform=None,
                  target_transform=None,
+                 cache_max_bytes=None,
+                 lbl_tb_paths=None,
+                 spect_store_path=None,
+                 lbl_tb_store_path=None,
+                 store_starts=None,
+                 window_index=None,
+                 lbl_tb_labelmap=None,
                  ):
         """initialize a WindowDataset instance
 
@@ -141,12 +233,49 @@ class WindowDataset(VisionDataset):
             Default is None.
         target_transform : callable
             A function/transform that takes in the target and transforms it.
+        cache_max_bytes : int
+            maximum number of bytes used by cache of spectrograms and labeled timebins,
+            in each process that loads data. Default is None, in which case
+            no cache is used, and spectrograms are loaded for every window.
+        lbl_tb_paths : numpy.ndarray
+            column from DataFrame that represents dataset,
+            consisting of paths to files containing vectors of labeled timebins
+            saved by ``vak prep``. Default is None, in which case vectors are made
+            from annots.
+        spect_store_path : str, Path
+            path to .npy file containing all spectrograms in dataset,
+            saved by ``vak prep`` when ``consolidate_spects`` is True.
+            Default is None, in which case spectrograms are loaded from spect_paths.
+        lbl_tb_store_path : str, Path
+            path to .npy file containing all vectors of labeled timebins in dataset,
+            saved by ``vak prep`` with the store of spectrograms.
+            Required if spect_store_path is specified.
+        store_starts : numpy.ndarray
+            indices where each spectrogram in spect_paths starts in the stores.
+            Required if spect_store_path is specified.
+        window_index : vak.datasets.window_index.WindowIndex
+            compact representation of windows in dataset. Default is None,
+            in which case it is made from x_inds, spect_id_vector and spect_inds_vector.
+            If specified, those vectors can be None.
+        lbl_tb_labelmap : dict
+            labelmap used to encode vectors of labeled timebins saved by ``vak prep``,
+            see ``vak.io.labeled_timebins.labelmap_from_df``. Default is None,
+            in which case it is assumed to be the same as ``labelmap``.
         """
+        if window_index is None:
+            if any([vec is None for vec in [x_inds, spect_id_vector, spect_inds_vector]]):
+                raise ValueError(
+                    'must specify either window_index, or all of: x_inds, spect_id_vector, spect_inds_vector'
+                )
+            window_index = WindowIndex.from_vectors(spect_id_vector, spect_inds_vector, x_inds,
+                                                    invalid_window_val=WindowDataset.INVALID_WINDOW_VAL)
+        if spect_store_path is not None and (lbl_tb_store_path is None or store_starts is None):
+            raise ValueError(
+                'if spect_store_path is specified, lbl_tb_store_path and store_starts must also be specified'
+            )
         super(WindowDataset, self).__init__(root, transform=transform,
                                             target_transform=target_transform)
-        self.x_inds = x_inds
-        self.spect_id_vector = spect_id_vector
-        self.spect_inds_vector = spect_inds_vector
+        self.window_index = window_index
         self.spect_paths = spect_paths
         self.spect_key = spect_key
         self.timebins_key = timebins_key
@@ -160,6 +289,30 @@ class WindowDataset(VisionDataset):
             # just assign dummy value that will end up getting replaced by actual labels by label_timebins()
             self.unlabeled_label = 0
         self.window_size = window_size
+        self.lbl_tb_paths = lbl_tb_paths
+        self.spect_store_path = spect_store_path
+        self.lbl_tb_store_path = lbl_tb_store_path
+        self.store_starts = store_starts
+        # stores are opened lazily, so that each DataLoader worker memory-maps them itself
+        self._spect_store = None
+        self._lbl_tb_store = None
+        if lbl_tb_paths is not None or spect_store_path is not None:
+            self.lbl_tb_table = labeled_timebins.lookup_table(self.labelmap, self.unlabeled_label, lbl_tb_labelmap)
+        else:
+            self.lbl_tb_table = None
+        if self.lbl_tb_table is None and annots is not None:
+            # arrays are attributes of dataset, instead of an AnnotationTable, so they can be moved to shared memory
+            annot_table = annotation.to_table(annots, self.labelmap)
+            (self.annot_labels_int, self.annot_onsets_s,
+             self.annot_offsets_s, self.annot_file_offsets) = (annot_table.labels_int, annot_table.onsets_s,
+                                                               annot_table.offsets_s, annot_table.file_offsets)
+        else:
+            (self.annot_labels_int, self.annot_onsets_s,
+             self.annot_offsets_s, self.annot_file_offsets) = None, None, None, None
+        if cache_max_bytes is not None:
+            self.cache = SpectCache(cache_max_bytes)
+        else:
+            self.cache = None
 
         tmp_x_ind = 0
         one_x, _ = self.__getitem__(tmp_x_ind)
@@ -167,6 +320,67 @@ class WindowDataset(VisionDataset):
         # e.g. when initializing a neural network model
         self.shape = one_x.shape
 
+    def __getstate__(self):
+        state = super(WindowDataset, self).__getstate__()
+        # don't pickle memory-mapped stores, e.g. when sending dataset to DataLoader worker processes.
+        # Pickling a memmap would copy the whole array; instead each process re-opens the file
+        state['_spect_store'] = None
+        state['_lbl_tb_store'] = None
+        # annotations are not needed after they are flattened into arrays,
+        # and pickling a list of objects is slow
+        state['annots'] = None
+        return state
+
+    def share_memory(self):
+        """move index of windows and other arrays into shared memory,
+        so that DataLoader worker processes do not each receive a copy.
+        Returns the dataset."""
+        self.window_index.share_memory()
+        return super(WindowDataset, self).share_memory()
+
+    @property
+    def spect_store(self):
+        """memory-mapped store of spectrograms, opened on first access"""
+        if self._spect_store is None and self.spect_store_path is not None:
+            # copy-on-write mode so that windows are writeable views, e.g. for torch.from_numpy,
+            # but the file itself is never modified
+            self._spect_store = np.load(self.spect_store_path, mmap_mode='c')
+        return self._spect_store
+
+    @property
+    def lbl_tb_store(self):
+        """memory-mapped store of labeled timebins, opened on first access"""
+        if self._lbl_tb_store is None and self.lbl_tb_store_path is not None:
+            self._lbl_tb_store = np.load(self.lbl_tb_store_path, mmap_mode='c')
+        return self._lbl_tb_store
+
+    def _load_spect_lbl_tb(self, spect_id):
+        """load spectrogram and compute labeled timebins for it,
+        given its 'id', i.e. index into spect_paths"""
+        spect_path = self.spect_paths[spect_id]
+        spect_dict = files.spect.load(spect_path)
+        spect = spect_dict[self.spect_key]
+
+        if self.lbl_tb_paths is not None:
+            lbl_tb = labeled_timebins.from_file(self.lbl_tb_paths[spect_id], self.lbl_tb_table)
+        else:
+            timebins = spect_dict[self.timebins_key]
+            # "annot id" == spect_id if both were taken from rows of DataFrame
+            start, stop = self.annot_file_offsets[spect_id], self.annot_file_offsets[spect_id + 1]
+            lbl_tb = labeled_timebins.label_timebins(self.annot_labels_int[start:stop],
+                                                     self.annot_onsets_s[start:stop],
+                                                     self.annot_offsets_s[start:stop],
+                                                     timebins,
+                                                     unlabeled_label=self.unlabeled_label)
+        return spect, lbl_tb
+
+    def _get_spect_lbl_tb(self, spect_id):
+        """get spectrogram and labeled timebins, from cache if there is one"""
+        if self.cache is not None:
+            return self.cache.get(spect_id, self._load_spect_lbl_tb)
+        else:
+            return self._load_spect_lbl_tb(spect_id)
+
     def __get_window_labelvec(self, idx):
         """helper function that gets batches of training pairs,
         given indices into dataset
@@ -183,23 +397,15 @@ class WindowDataset(VisionDataset):
         labelvec : numpy.ndarray
             vector of labels for each timebin in window from spectrogram
         """
-        x_ind = self.x_inds[idx]
-        spect_id = self.spect_id_vector[x_ind]
-        window_start_ind = self.spect_inds_vector[x_ind]
-
-        spect_path = self.spect_paths[spect_id]
-        spect_dict = files.spect.load(spect_path)
-        spect = spect_dict[self.spect_key]
-        timebins = spect_dict[self.timebins_key]
+        spect_id, window_start_ind = self.window_index.lookup(idx)
 
-        annot = self.annots[spect_id]  # "annot id" == spect_id if both were taken from rows of DataFrame
-        lbls_int = [self.labelmap[lbl] for lbl in annot.seq.labels]
-        lbl_tb = labeled_timebins.label_timebins(lbls_int,
-                                                 annot.seq.onsets_s,
-                                                 annot.seq.offsets_s,
-                                                 timebins,
-                                                 unlabeled_label=self.unlabeled_label)
+        if self.spect_store_path is not None:
+            store_ind = self.store_starts[spect_id] + window_start_ind
+            window = self.spect_store[:, store_ind:store_ind + self.window_size]
+            labelvec = self.lbl_tb_table[self.lbl_tb_store[store_ind:store_ind + self.window_size]]
+            return window, labelvec
 
+        spect, lbl_tb = self._get_spect_lbl_tb(spect_id)
         window = spect[:, window_start_ind:window_start_ind + self.window_size]
         labelvec = lbl_tb[window_start_ind:window_start_ind + self.window_size]
 
@@ -218,13 +424,69 @@ class WindowDataset(VisionDataset):
 
         return window, labelvec
 
+    def __getitems__(self, indices):
+        """get a batch of items, given a list of indices into dataset.
+
+        Windows are grouped by the spectrogram file they come from,
+        and each file is loaded once per batch, instead of once per window.
+        ``torch.utils.data.DataLoader`` only calls this method to fetch batches
+        in torch 2.0 and later; with any version of torch, use ``vak.datasets.get_dataloader``
+        with a ``batch_sampler``, e.g. a ``torch.utils.data.BatchSampler`` over a
+        ``vak.datasets.FileChunkSampler``, so that each batch contains windows
+        from only a few files and is fetched with one call to this method.
+
+        Parameters
+        ----------
+        indices : list
+            of int, indices into dataset
+
+        Returns
+        -------
+        items : list
+            of (window, labelvec) tuples, in the same order as indices
+        """
+        if self.spect_store_path is not None:
+            # windows are already views into memory-mapped store, nothing to group
+            return [self[idx] for idx in indices]
+
+        spect_ids, window_start_inds = self.window_index.lookup(np.asarray(indices))
+
+        items = [None] * len(spect_ids)
+        for spect_id in np.unique(spect_ids):
+            spect, lbl_tb = self._get_spect_lbl_tb(spect_id)
+            for item_ind in np.flatnonzero(spect_ids == spect_id):
+                window_start_ind = window_start_inds[item_ind]
+                window = spect[:, window_start_ind:window_start_ind + self.window_size]
+                labelvec = lbl_tb[window_start_ind:window_start_ind + self.window_size]
+                if self.transform is not None:
+                    window = self.transform(window)
+                if self.target_transform is not None:
+                    labelvec = self.target_transform(labelvec)
+                items[item_ind] = (window, labelvec)
+        return items
+
     def __len__(self):
         """number of batches"""
-        return len(self.x_inds)
+        return len(self.window_index)
+
+    @property
+    def x_inds(self):
+        """indices of each window in the dataset, made from window_index"""
+        return self.window_index.to_vectors()[2]
+
+    @property
+    def spect_id_vector(self):
+        """'id' of spectrogram for each window, made from window_index"""
+        return self.window_index.to_vectors()[0]
+
+    @property
+    def spect_inds_vector(self):
+        """start index of each window in its spectrogram, made from window_index"""
+        return self.window_index.to_vectors()[1]
 
     def duration(self):
         """duration of WindowDataset, in seconds"""
-        return self.spect_inds_vector.shape[-1] * self.timebin_dur
+        return self.window_index.n_timebins * self.timebin_dur
 
     @staticmethod
     def crop_spect_vectors_keep_classes(lbl_tb,
@@ -314,13 +576,13 @@ class WindowDataset(VisionDataset):
             # try cropping off the end first
             lbl_tb_cropped = lbl_tb[:cropped_length]
 
-            if np.array_equal(np.unique(lbl_tb_cropped), classes):
+            if _has_classes(lbl_tb_cropped, classes):
                 x_inds[cropped_length:] = WindowDataset.INVALID_WINDOW_VAL
                 return spect_id_vector[:cropped_length], spect_inds_vector[:cropped_length], x_inds
 
             # try truncating off the front instead
             lbl_tb_cropped = lbl_tb[-cropped_length:]
-            if np.array_equal(np.unique(lbl_tb_cropped), classes):
+            if _has_classes(lbl_tb_cropped, classes):
                 # set every index *up to but not including* the first valid window start to "invalid"
                 x_inds[:-cropped_length] = WindowDataset.INVALID_WINDOW_VAL
                 # also need to 'reset' the indexing so it starts at 0. First find current minimum index value
@@ -377,7 +639,7 @@ class WindowDataset(VisionDataset):
                                               window_size * border_onsets
 
             num_bins_to_crop = len(lbl_tb) - cropped_length
-            if sum(num_potential_ignored_data_bins) < num_bins_to_crop:
+            if num_potential_ignored_data_bins.sum() < num_bins_to_crop:
                 # This is how much data can be ignored from each silence segment including the end of file windows
                 num_potential_ignored_data_bins = unlabeled_durations - (window_size - N_PAD_BINS) + \
                                                   window_size * (border_onsets + border_offsets)
@@ -386,61 +648,63 @@ class WindowDataset(VisionDataset):
 
             # Second we find a ~random combination to remove
             crop_more = 0
-            if sum(num_potential_ignored_data_bins) < num_bins_to_crop:
+            if num_potential_ignored_data_bins.sum() < num_bins_to_crop:
                 # if we will still need to crop more we will do so from non-silence segments
-                crop_more = num_bins_to_crop - sum(num_potential_ignored_data_bins) + 1
-                num_bins_to_crop = sum(num_potential_ignored_data_bins) - 1
+                crop_more = num_bins_to_crop - num_potential_ignored_data_bins.sum() + 1
+                num_bins_to_crop = num_potential_ignored_data_bins.sum() - 1
 
             segment_ind = np.arange(len(num_potential_ignored_data_bins))
             random.shuffle(segment_ind)
             last_ind = np.where(np.cumsum(num_potential_ignored_data_bins[segment_ind]) >= num_bins_to_crop)[0][0]
-            bins_to_ignore = np.array([], dtype=int)
-            for cnt in range(last_ind):
-                if border_onsets[segment_ind[cnt]]:  # remove silences at file onsets
-                    bins_to_ignore = np.concatenate([bins_to_ignore,
-                                                     np.arange(unlabeled_onsets[segment_ind[cnt]],
-                                                               unlabeled_offsets[segment_ind[cnt]] - 1)])
-                elif border_offsets[segment_ind[cnt]]:  # remove silences at file offsets
-                    bins_to_ignore = np.concatenate([bins_to_ignore,
-                                                     np.arange(unlabeled_onsets[segment_ind[cnt]] + 1,
-                                                               unlabeled_offsets[segment_ind[cnt]])])
-                else:  # remove silences within the files
-                    bins_to_ignore = np.concatenate([bins_to_ignore,
-                                                     np.arange(unlabeled_onsets[segment_ind[cnt]] + 1,
-                                                               unlabeled_offsets[segment_ind[cnt]] - 1)])
-            left_to_crop = num_bins_to_crop - sum(num_potential_ignored_data_bins[segment_ind[:last_ind]])-border_onsets[segment_ind[last_ind]]*window_size
-            if border_onsets[segment_ind[last_ind]]:
-                bins_to_ignore = np.concatenate([bins_to_ignore,
-                                             np.arange(unlabeled_onsets[segment_ind[last_ind]],
-                                                       unlabeled_onsets[segment_ind[last_ind]] + left_to_crop)])
-            elif border_offsets[segment_ind[last_ind]]:
-                if left_to_crop < num_potential_ignored_data_bins[segment_ind[last_ind]] - window_size:
-                    bins_to_ignore = np.concatenate([bins_to_ignore,
-                                             np.arange(unlabeled_onsets[segment_ind[last_ind]] + 1,
-                                                       unlabeled_onsets[segment_ind[last_ind]] + left_to_crop)])
+
+            # find start and stop of range of bins to ignore in each segment.
+            # Whole segments are removed, except for one bin on each side that is not at a file border
+            whole_segments = segment_ind[:last_ind]
+            ignore_starts = unlabeled_onsets[whole_segments] + 1 - border_onsets[whole_segments]
+            ignore_stops = unlabeled_offsets[whole_segments] - 1 + np.logical_and(
+                border_offsets[whole_segments], ~border_onsets[whole_segments]
+            )
+            # then just enough of the last segment is removed to reach the target duration
+            last_segment = segment_ind[last_ind]
+            left_to_crop = (num_bins_to_crop - num_potential_ignored_data_bins[whole_segments].sum()
+                            - border_onsets[last_segment] * window_size)
+            last_onset = unlabeled_onsets[last_segment]
+            if border_onsets[last_segment]:
+                last_start, last_stop = last_onset, last_onset + left_to_crop
+            elif border_offsets[last_segment]:
+                if left_to_crop < num_potential_ignored_data_bins[last_segment] - window_size:
+                    last_start, last_stop = last_onset + 1, last_onset + left_to_crop
                 else:
-                    bins_to_ignore = np.concatenate([bins_to_ignore,
-                                             np.arange(unlabeled_onsets[segment_ind[last_ind]] + 1,
-                                                       unlabeled_onsets[segment_ind[last_ind]] + left_to_crop - window_size)])
+                    last_start, last_stop = last_onset + 1, last_onset + left_to_crop - window_size
             else:
-                bins_to_ignore = np.concatenate([bins_to_ignore,
-                                             np.arange(unlabeled_onsets[segment_ind[last_ind]] + 1,
-                                                       unlabeled_onsets[segment_ind[last_ind]] + left_to_crop)])
-            
-            x_inds[bins_to_ignore] = WindowDataset.INVALID_WINDOW_VAL
-        
+                last_start, last_stop = last_onset + 1, last_onset + left_to_crop
+            ignore_starts = np.append(ignore_starts, last_start)
+            ignore_stops = np.append(ignore_stops, last_stop)
+
+            # make boolean mask of bins to ignore from ranges, using a "difference array"
+            # so that cost is linear in number of time bins, not number of bins * number of segments
+            not_empty = ignore_stops > ignore_starts
+            ignore_starts, ignore_stops = ignore_starts[not_empty], ignore_stops[not_empty]
+            ignore_diff = np.zeros(lbl_tb.shape[-1] + 1, dtype=np.int32)
+            np.add.at(ignore_diff, ignore_starts, 1)
+            np.add.at(ignore_diff, np.minimum(ignore_stops, lbl_tb.shape[-1]), -1)
+            ignore = np.cumsum(ignore_diff[:-1]) > 0
+
+            x_inds[ignore] = WindowDataset.INVALID_WINDOW_VAL
+
             # we may still need to crop. Try doing it from the beginning of the dataset
             if crop_more > 0:  # This addition can lead to imprecision but only in cases where we ask for very small datasets
-                if crop_more > sum(x_inds != WindowDataset.INVALID_WINDOW_VAL):
-                     raise ValueError(
+                valid_x_inds = x_inds[x_inds != WindowDataset.INVALID_WINDOW_VAL]
+                if crop_more > valid_x_inds.shape[-1]:
+                    raise ValueError(
                         "was not able to crop spect vectors to specified duration "
                         "in a way that maintained all classes in dataset"
-                        )
-                extra_bins = x_inds[x_inds != WindowDataset.INVALID_WINDOW_VAL][:crop_more]
-                bins_to_ignore = np.concatenate([bins_to_ignore, extra_bins])
-                x_inds[bins_to_ignore] = WindowDataset.INVALID_WINDOW_VAL
+                    )
+                extra_bins = valid_x_inds[:crop_more]
+                ignore[extra_bins] = True
+                x_inds[extra_bins] = WindowDataset.INVALID_WINDOW_VAL
 
-            if np.array_equal(np.unique(lbl_tb[np.setdiff1d(np.arange(len(lbl_tb)), bins_to_ignore)]), classes):
+            if _has_classes(lbl_tb[~ignore], classes):
                 return spect_id_vector, spect_inds_vector, x_inds
 
         raise ValueError(
@@ -466,8 +730,74 @@ class WindowDataset(VisionDataset):
         Assumes spectrogram is a 2-d matrix where rows are frequency bins,
         and columns are time bins.
         """
-        spect = files.spect.load(spect_path)[spect_key]
-        return spect.shape[-1]
+        return files.spect.n_timebins(spect_path, spect_key)
+
+    @staticmethod
+    def n_time_bins_from_df(df, spect_key='s'):
+        """get number of time bins in each spectrogram
+        in a dataframe that represents a dataset of vocalizations.
+
+        Uses the 'n_timebins' column added by ``vak prep`` if present,
+        then the indices of spectrograms in a store, if the dataset was
+        prepared with ``consolidate_spects``. Otherwise reads
+        the number of time bins from the header of each spectrogram file.
+
+        Parameters
+        ----------
+        df : pandas.DataFrame
+            that represents a dataset of vocalizations.
+        spect_key : str
+            key to access spectograms in array files. Default is 's'.
+
+        Returns
+        -------
+        n_tb_spects : numpy.ndarray
+            number of time bins in each spectrogram, in the same order as rows of df.
+        """
+        if 'n_timebins' in df.columns and df['n_timebins'].notna().all():
+            return df['n_timebins'].values.astype(np.int64)
+        elif SPECT_STORE_PATH_COL in df.columns and df[SPECT_STORE_PATH_COL].notna().all():
+            # get number of time bins from store indices instead of reading every file
+            return (df[STORE_STOP_COL].values - df[STORE_START_COL].values).astype(np.int64)
+        else:
+            # e.g., for datasets prepared with older versions of vak
+            return np.array([WindowDataset.n_time_bins_spect(spect_path, spect_key)
+                             for spect_path in df['spect_path'].values], dtype=np.int64)
+
+    @staticmethod
+    def spect_vectors_from_n_time_bins(n_tb_spects, window_size):
+        """make spect_id_vector, spect_inds_vector, and x_inds
+        from the number of time bins in each spectrogram.
+        See WindowDataset class docstring for
+        detailed explanation of these vectors.
+
+        Parameters
+        ----------
+        n_tb_spects : numpy.ndarray
+            number of time bins in each spectrogram in dataset.
+        window_size : int
+            number of time bins in windows that will be taken from spectrograms
+
+        Returns
+        -------
+        spect_id_vector : numpy.ndarray
+            represents the 'id' of any spectrogram,
+            i.e., the index into spect_paths that will let us load it
+        spect_inds_vector : numpy.ndarray
+            valid indices of windows we can grab from each spectrogram
+        x_inds : numpy.ndarray
+            indices of each window in the dataset, with starting indices of windows
+            that would go past the end of a spectrogram set to WindowDataset.INVALID_WINDOW_VAL
+        """
+        n_tb_spects = np.asarray(n_tb_spects, dtype=np.int64)
+        total_tb = n_tb_spects.sum()
+        spect_id_vector = np.repeat(np.arange(n_tb_spects.shape[-1], dtype=np.int64), n_tb_spects)
+        spect_starts = np.cumsum(n_tb_spects) - n_tb_spects
+        spect_inds_vector = np.arange(total_tb, dtype=np.int64) - np.repeat(spect_starts, n_tb_spects)
+        x_inds = np.arange(total_tb, dtype=np.int64)
+        last_valid_window_ind = np.repeat(n_tb_spects - window_size, n_tb_spects)
+        x_inds[spect_inds_vector > last_valid_window_ind] = WindowDataset.INVALID_WINDOW_VAL
+        return spect_id_vector, spect_inds_vector, x_inds
 
     @staticmethod
     def spect_vectors_from_df(df,
@@ -517,6 +847,17 @@ class WindowDataset(VisionDataset):
             x_inds_vector with starting indices of windows that are invalid
             after the cropping now set to WindowDataset.INVALID_WINDOW_VAL
             so they will be removed
+
+        Notes
+        -----
+        The number of time bins in each spectrogram is taken from the
+        'n_timebins' column of ``df``, added by ``vak prep``. If there is no
+        such column, the number is read from the header of each spectrogram file,
+        without loading the spectrogram; see ``vak.files.spect.n_timebins``.
+
+        When cropping, if ``df`` has a 'lbl_tb_path' column,
+        the vectors of labeled timebins saved by ``vak prep`` are used,
+        instead of making them from annotations.
         """
         if crop_dur is not None and timebin_dur is None:
             raise ValueError(
@@ -543,41 +884,31 @@ class WindowDataset(VisionDataset):
             crop_to_dur = False
 
         spect_paths = df['spect_path'].values
-
-        spect_id_vector = []
-        spect_inds_vector = []
-        x_inds = []
-        total_tb = 0
+        n_tb_spects = WindowDataset.n_time_bins_from_df(df, spect_key)
+        spect_id_vector, spect_inds_vector, x_inds = WindowDataset.spect_vectors_from_n_time_bins(n_tb_spects,
+                                                                                                  window_size)
 
         if crop_to_dur:
-            lbl_tb = []
             spect_annot_map = annotation.source_annot_map(spect_paths, annots)
-            for ind, (spect_path, annot) in enumerate(spect_annot_map.items()):
-                spect_dict = files.spect.load(spect_path)
-                n_tb_spect = spect_dict[spect_key].shape[-1]
-
-                spect_id_vector.append(np.ones((n_tb_spect,), dtype=np.int64) * ind)
-                spect_inds_vector.append(np.arange(n_tb_spect))
-
-                valid_x_inds = np.arange(total_tb, total_tb + n_tb_spect)
-                last_valid_window_ind = total_tb + n_tb_spect - window_size
-                valid_x_inds[valid_x_inds > last_valid_window_ind] = WindowDataset.INVALID_WINDOW_VAL
-                x_inds.append(valid_x_inds)
-
-                total_tb += n_tb_spect
-
-                lbls_int = [labelmap[lbl] for lbl in annot.seq.labels]
-                timebins = spect_dict[timebins_key]
-                lbl_tb.append(labeled_timebins.label_timebins(lbls_int,
-                                                              annot.seq.onsets_s,
-                                                              annot.seq.offsets_s,
-                                                              timebins,
-                                                              unlabeled_label=unlabeled_label))
-
-            spect_id_vector = np.concatenate(spect_id_vector)
-            spect_inds_vector = np.concatenate(spect_inds_vector)
+            if LBL_TB_PATH_COL in df.columns:
+                lbl_tb_table = labeled_timebins.lookup_table(labelmap, unlabeled_label,
+                                                             io.labeled_timebins.labelmap_from_df(df))
+                lbl_tb = [labeled_timebins.from_file(lbl_tb_path, lbl_tb_table)
+                          for lbl_tb_path in df[LBL_TB_PATH_COL].values]
+            else:
+                # label time bins for all files at once
+                timebins_list = [files.spect.load(spect_path)[timebins_key]
+                                 for spect_path in spect_annot_map.keys()]
+                annot_table = annotation.to_table(list(spect_annot_map.values()), labelmap)
+                labels_int_list, onsets_s_list, offsets_s_list = zip(
+                    *[annot_table.segments(ind) for ind in range(len(annot_table))]
+                )
+                lbl_tb = labeled_timebins.label_timebins_batch(labels_int_list,
+                                                               onsets_s_list,
+                                                               offsets_s_list,
+                                                               timebins_list,
+                                                               unlabeled_label=unlabeled_label)
             lbl_tb = np.concatenate(lbl_tb)
-            x_inds = np.concatenate(x_inds)
 
             (spect_id_vector,
              spect_inds_vector,
@@ -590,24 +921,6 @@ class WindowDataset(VisionDataset):
                                                                      labelmap,
                                                                      window_size)
 
-        else:  # crop_to_dur is False
-            for ind, spect_path in enumerate(spect_paths):
-                n_tb_spect = WindowDataset.n_time_bins_spect(spect_path, spect_key)
-
-                spect_id_vector.append(np.ones((n_tb_spect,), dtype=np.int64) * ind)
-                spect_inds_vector.append(np.arange(n_tb_spect))
-
-                valid_x_inds = np.arange(total_tb, total_tb + n_tb_spect)
-                last_valid_window_ind = total_tb + n_tb_spect - window_size
-                valid_x_inds[valid_x_inds > last_valid_window_ind] = WindowDataset.INVALID_WINDOW_VAL
-                x_inds.append(valid_x_inds)
-
-                total_tb += n_tb_spect
-
-            spect_id_vector = np.concatenate(spect_id_vector)
-            spect_inds_vector = np.concatenate(spect_inds_vector)
-            x_inds = np.concatenate(x_inds)
-
         x_inds = x_inds[x_inds != WindowDataset.INVALID_WINDOW_VAL]
         return spect_id_vector, spect_inds_vector, x_inds
 
@@ -689,7 +1002,8 @@ class WindowDataset(VisionDataset):
                  spect_inds_vector=None,
                  x_inds=None,
                  transform=None,
-                 target_transform=None):
+                 target_transform=None,
+                 cache_max_bytes=None):
         """given a path to a csv representing a dataset,
         returns an initialized WindowDataset.
 
@@ -726,10 +1040,20 @@ class WindowDataset(VisionDataset):
             Default is None.
         target_transform : callable
             A function/transform that takes in the target and transforms it.
+        cache_max_bytes : int
+            maximum number of bytes used by cache of spectrograms and labeled timebins,
+            in each process that loads data. Default is None, in which case
+            no cache is used, and spectrograms are loaded for every window.
 
         Returns
         -------
         initialized instance of WindowDataset
+
+        Notes
+        -----
+        If the dataset was prepared with ``consolidate_spects``, so that
+        all rows in the split have a 'spect_store_path', the returned
+        dataset takes windows from the memory-mapped store.
         """
         if any([vec is not None for vec in [spect_id_vector, spect_inds_vector, x_inds]]):
             if not all([vec is not None for vec in [spect_id_vector, spect_inds_vector, x_inds]]):
@@ -768,11 +1092,30 @@ class WindowDataset(VisionDataset):
         spect_paths = df['spect_path'].values
 
         if all([vec is None for vec in [spect_id_vector, spect_inds_vector, x_inds]]):
-            # see Notes in class docstring to understand what these vectors do
-            spect_id_vector, spect_inds_vector, x_inds = cls.spect_vectors_from_df(df, window_size)
+            # see Notes in class docstring. Make index directly, without vectors that have one element per time bin
+            window_index = WindowIndex.from_n_time_bins(cls.n_time_bins_from_df(df, spect_key), window_size)
+        else:
+            window_index = None
 
         annots = annotation.from_df(df)
         timebin_dur = io.dataframe.validate_and_get_timebin_dur(df)
+        if LBL_TB_PATH_COL in df.columns:
+            lbl_tb_paths = df[LBL_TB_PATH_COL].values
+        else:
+            lbl_tb_paths = None
+        lbl_tb_labelmap = io.labeled_timebins.labelmap_from_df(df)
+
+        if SPECT_STORE_PATH_COL in df.columns and df[SPECT_STORE_PATH_COL].notna().all():
+            spect_store_path = df[SPECT_STORE_PATH_COL].unique()
+            if len(spect_store_path) > 1:
+                raise ValueError(
+                    f'found more than one spectrogram store for split {split}: {spect_store_path}'
+                )
+            spect_store_path = spect_store_path.item()
+            lbl_tb_store_path = df[LBL_TB_STORE_PATH_COL].unique().item()
+            store_starts = df[STORE_START_COL].values.astype(np.int64)
+        else:
+            spect_store_path, lbl_tb_store_path, store_starts = None, None, None
 
         # note that we set "root" to csv path
         return cls(csv_path,
@@ -787,5 +1130,12 @@ class WindowDataset(VisionDataset):
                    spect_key,
                    timebins_key,
                    transform,
-                   target_transform
+                   target_transform,
+                   cache_max_bytes,
+                   lbl_tb_paths,
+                   spect_store_path,
+                   lbl_tb_store_path,
+                   store_starts,
+                   window_index,
+                   lbl_tb_labelmap,
                    )
@@ -0,0 +1,204 @@
+import numpy as np
+
+from .shared_memory import SharedArraysMixin
+
+
+class WindowIndex(SharedArraysMixin):
+    """Compact representation of all windows in a WindowDataset.
+
+    Windows are represented as "runs": sequences of windows from the same
+    spectrogram whose start indices are consecutive. Each run is stored as the
+    'id' of the spectrogram (the index into spect_paths), the start index
+    of the first window in the run, and the number of windows in the run.
+    Without cropping, there is one run per spectrogram, so the index
+    takes a few bytes per file, instead of the 24 bytes per time bin used
+    by ``spect_id_vector``, ``spect_inds_vector``, and ``x_inds``.
+
+    A flat index into the dataset is mapped to (spectrogram id, window start index)
+    by finding its run with ``np.searchsorted``.
+
+    Parameters
+    ----------
+    spect_ids : numpy.ndarray
+        'id' of spectrogram for each run, i.e. index into spect_paths.
+    starts : numpy.ndarray
+        start index within spectrogram of first window in each run.
+    lengths : numpy.ndarray
+        number of windows in each run.
+    n_timebins : int
+        total number of time bins in the dataset that windows are taken from,
+        used to compute its duration. Default is None, in which case
+        it is the number of windows.
+
+    Attributes
+    ----------
+    offsets : numpy.ndarray
+        flat index of first window in each run, with total number of windows appended.
+
+    Notes
+    -----
+    Call ``share_memory`` to move arrays into shared memory,
+    so that DataLoader worker processes do not each receive a copy.
+    See ``vak.datasets.shared_memory.SharedArraysMixin``.
+    """
+    _shared_array_attrs = ('spect_ids', 'starts', 'lengths', 'offsets')
+
+    def __init__(self, spect_ids, starts, lengths, n_timebins=None):
+        spect_ids = np.asarray(spect_ids, dtype=np.int64)
+        starts = np.asarray(starts, dtype=np.int64)
+        lengths = np.asarray(lengths, dtype=np.int64)
+        if not spect_ids.shape == starts.shape == lengths.shape or spect_ids.ndim != 1:
+            raise ValueError(
+                'spect_ids, starts, and lengths must be 1-d arrays with the same shape, '
+                f'but shapes were: {spect_ids.shape}, {starts.shape}, {lengths.shape}'
+            )
+        if np.any(lengths < 1):
+            raise ValueError(
+                'all lengths must be positive integers'
+            )
+        self.spect_ids = spect_ids
+        self.starts = starts
+        self.lengths = lengths
+        self.offsets = np.concatenate(([0], np.cumsum(lengths))).astype(np.int64)
+        if n_timebins is None:
+            n_timebins = len(self)
+        self.n_timebins = int(n_timebins)
+
+    def __len__(self):
+        """number of windows"""
+        return int(self.offsets[-1])
+
+    def __repr__(self):
+        return (f'{self.__class__.__name__}(n_windows={len(self)}, n_runs={self.spect_ids.shape[-1]}, '
+                f'n_timebins={self.n_timebins})')
+
+    @property
+    def nbytes(self):
+        """number of bytes used by arrays in index"""
+        return self.spect_ids.nbytes + self.starts.nbytes + self.lengths.nbytes + self.offsets.nbytes
+
+    def lookup(self, idx):
+        """map flat indices into dataset to spectrogram ids and window start indices
+
+        Parameters
+        ----------
+        idx : int, numpy.ndarray
+            index or indices into dataset. Negative indices count from the end.
+
+        Returns
+        -------
+        spect_id : int, numpy.ndarray
+            'id' of spectrogram that each window comes from, i.e. index into spect_paths
+        window_start_ind : int, numpy.ndarray
+            start index of each window within its spectrogram
+        """
+        n_windows = len(self)
+        idx_arr = np.asarray(idx, dtype=np.int64)
+        idx_arr = np.where(idx_arr < 0, idx_arr + n_windows, idx_arr)
+        if np.any(idx_arr < 0) or np.any(idx_arr >= n_windows):
+            raise IndexError(
+                f'index out of range for WindowIndex with {n_windows} windows: {idx}'
+            )
+        run = np.searchsorted(self.offsets, idx_arr, side='right') - 1
+        spect_id = self.spect_ids[run]
+        window_start_ind = self.starts[run] + (idx_arr - self.offsets[run])
+        if idx_arr.ndim == 0:
+            return int(spect_id), int(window_start_ind)
+        return spect_id, window_start_ind
+
+    def window_spect_ids(self):
+        """get 'id' of spectrogram for every window, as an array with one element per window"""
+        return np.repeat(self.spect_ids, self.lengths)
+
+    @classmethod
+    def from_vectors(cls, spect_id_vector, spect_inds_vector, x_inds, invalid_window_val=-1):
+        """make a WindowIndex from spect_id_vector, spect_inds_vector, and x_inds,
+        e.g. as returned by ``WindowDataset.spect_vectors_from_df``.
+        See WindowDataset class docstring for
+        detailed explanation of these vectors.
+
+        Parameters
+        ----------
+        spect_id_vector : numpy.ndarray
+            represents the 'id' of any spectrogram,
+            i.e., the index into spect_paths that will let us load it
+        spect_inds_vector : numpy.ndarray
+            same length as spect_id_vector but values represent
+            indices within each spectrogram.
+        x_inds : numpy.ndarray
+            indices of each window in the dataset, into spect_id_vector and spect_inds_vector.
+            Any elements equal to ``invalid_window_val`` are removed.
+        invalid_window_val : int
+            value that marks invalid windows in x_inds. Default is -1,
+            the value of WindowDataset.INVALID_WINDOW_VAL.
+
+        Returns
+        -------
+        window_index : WindowIndex
+        """
+        spect_id_vector = np.asarray(spect_id_vector)
+        spect_inds_vector = np.asarray(spect_inds_vector)
+        x_inds = np.asarray(x_inds)
+        x_inds = x_inds[x_inds != invalid_window_val]
+
+        window_spect_ids = spect_id_vector[x_inds].astype(np.int64)
+        window_starts = spect_inds_vector[x_inds].astype(np.int64)
+        if window_spect_ids.shape[-1] == 0:
+            return cls([], [], [], n_timebins=spect_id_vector.shape[-1])
+
+        # a new run starts wherever the spectrogram changes or start indices are not consecutive
+        is_run_start = np.ones(window_spect_ids.shape[-1], dtype=bool)
+        is_run_start[1:] = np.logical_or(np.diff(window_spect_ids) != 0,
+                                         np.diff(window_starts) != 1)
+        run_start_inds = np.flatnonzero(is_run_start)
+        lengths = np.diff(np.append(run_start_inds, window_spect_ids.shape[-1]))
+        return cls(window_spect_ids[run_start_inds],
+                   window_starts[run_start_inds],
+                   lengths,
+                   n_timebins=spect_id_vector.shape[-1])
+
+    @classmethod
+    def from_n_time_bins(cls, n_tb_spects, window_size):
+        """make a WindowIndex with all valid windows from a set of spectrograms,
+        given the number of time bins in each spectrogram.
+
+        Equivalent to ``WindowIndex.from_vectors(*WindowDataset.spect_vectors_from_n_time_bins(...))``
+        but without making vectors with one element per time bin.
+
+        Parameters
+        ----------
+        n_tb_spects : numpy.ndarray
+            number of time bins in each spectrogram.
+        window_size : int
+            number of time bins in windows that will be taken from spectrograms
+
+        Returns
+        -------
+        window_index : WindowIndex
+        """
+        n_tb_spects = np.asarray(n_tb_spects, dtype=np.int64)
+        n_windows = n_tb_spects - window_size + 1
+        has_windows = n_windows > 0
+        return cls(np.flatnonzero(has_windows),
+                   np.zeros(has_windows.sum(), dtype=np.int64),
+                   n_windows[has_windows],
+                   n_timebins=n_tb_spects.sum())
+
+    def to_vectors(self):
+        """convert to spect_id_vector, spect_inds_vector, and x_inds,
+        with one element per window.
+
+        Returns
+        -------
+        spect_id_vector : numpy.ndarray
+            'id' of spectrogram that each window comes from.
+        spect_inds_vector : numpy.ndarray
+            start index of each window within its spectrogram.
+        x_inds : numpy.ndarray
+            indices into spect_id_vector and spect_inds_vector, i.e. ``np.arange(len(self))``.
+        """
+        spect_id_vector = self.window_spect_ids()
+        spect_inds_vector = (np.repeat(self.starts - self.offsets[:-1], self.lengths)
+                             + np.arange(len(self), dtype=np.int64))
+        x_inds = np.arange(len(self), dtype=np.int64)
+        return spect_id_vector, spect_inds_vector, x_inds
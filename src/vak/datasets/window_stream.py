@@ -0,0 +1,255 @@
+import numpy as np
+import scipy.signal
+import torch
+
+from .. import files
+
+
+class WindowStream:
+    """Iterable over fixed-size batches of consecutive windows
+    from a single spectrogram, used to make predictions on recordings of any length.
+
+    The spectrogram is memory-mapped when possible (see ``vak.files.spect.memmap``),
+    and each batch is made by reading only the time bins its windows contain,
+    so the memory used does not depend on the length of the recording.
+    The end of the spectrogram is padded with ``padval`` so that
+    the last window ends at or after the last time bin.
+
+    By default windows do not overlap, i.e. ``hop_size`` equals ``window_size``.
+    If ``hop_size`` is smaller than ``window_size``, consecutive windows overlap,
+    and each time bin is in ``window_size / hop_size`` windows (on average).
+    Windows are made as strided views of each chunk of the spectrogram,
+    with ``numpy.lib.stride_tricks.as_strided``.
+    The outputs of a network for each window can be combined into one
+    output per time bin with ``vak.datasets.window_stream.OverlapAdd``.
+
+    Parameters
+    ----------
+    spect_path : str, Path
+        path to array file with spectrogram.
+    window_size : int
+        number of time bins in each window.
+    batch_size : int
+        number of windows in each batch. If None, all windows are in a single batch.
+    spect_key : str
+        key for accessing spectrogram in files. Default is 's'.
+    spect_standardizer : vak.transforms.StandardizeSpect
+        instance that has already been fit to dataset.
+        Default is None, in which case spectrograms are not standardized.
+    padval : float
+        value used to pad the end of the spectrogram. Default is 0.
+    hop_size : int
+        number of time bins between the start of consecutive windows.
+        Must be less than or equal to ``window_size``.
+        Default is None, in which case it is ``window_size``, and windows do not overlap.
+
+    Attributes
+    ----------
+    n_timebins : int
+        number of time bins in spectrogram.
+    n_windows : int
+        number of windows taken from spectrogram.
+
+    Examples
+    --------
+    >>> stream = vak.datasets.WindowStream(spect_path, window_size=176, batch_size=32)
+    >>> for x in stream:
+    ...     y_pred = network(x)  # x has shape (batch, 1, frequency bins, window_size)
+    """
+    def __init__(self,
+                 spect_path,
+                 window_size,
+                 batch_size,
+                 spect_key='s',
+                 spect_standardizer=None,
+                 padval=0.,
+                 hop_size=None):
+        if hop_size is None:
+            hop_size = window_size
+        for name, val in (('window_size', window_size), ('batch_size', batch_size), ('hop_size', hop_size)):
+            if name == 'batch_size' and val is None:
+                continue
+            if not isinstance(val, int) or isinstance(val, bool):
+                raise TypeError(
+                    f'{name} must be an int but type was: {type(val)}'
+                )
+            if val < 1:
+                raise ValueError(
+                    f'{name} must be a positive integer but was: {val}'
+                )
+        if hop_size > window_size:
+            raise ValueError(
+                f'hop_size, {hop_size}, must be less than or equal to window_size, {window_size}'
+            )
+        self.spect_path = spect_path
+        self.window_size = window_size
+        self.hop_size = hop_size
+        self.spect_standardizer = spect_standardizer
+        self.padval = padval
+
+        self.spect = files.spect.memmap(spect_path, spect_key)
+        if self.spect.ndim != 2:
+            raise ValueError(
+                f'spectrogram must be 2-dimensional but number of dimensions was {self.spect.ndim}: {spect_path}'
+            )
+        self.n_timebins = self.spect.shape[-1]
+        # ceiling division, so last window ends at or after last time bin
+        self.n_windows = max(-(-(self.n_timebins - window_size) // hop_size), 0) + 1
+        if batch_size is None:
+            batch_size = self.n_windows
+        self.batch_size = batch_size
+
+    @property
+    def shape(self):
+        """shape of a single window, (channels, frequency bins, time bins),
+        i.e. the shape of input to networks"""
+        return 1, self.spect.shape[0], self.window_size
+
+    def __len__(self):
+        """number of batches"""
+        return -(-self.n_windows // self.batch_size)  # ceiling division
+
+    def __iter__(self):
+        n_freqbins = self.spect.shape[0]
+        for first_window in range(0, self.n_windows, self.batch_size):
+            n_windows = min(self.batch_size, self.n_windows - first_window)
+            start = first_window * self.hop_size
+            stop = start + (n_windows - 1) * self.hop_size + self.window_size
+            chunk = np.asarray(self.spect[:, start:stop])
+            if self.spect_standardizer is not None:
+                # standardizing is done per frequency bin, so can be applied to chunks
+                chunk = self.spect_standardizer(chunk)
+            if chunk.shape[-1] < stop - start:
+                padded = np.full((n_freqbins, stop - start), self.padval, dtype=np.float32)
+                padded[:, :chunk.shape[-1]] = chunk
+                chunk = padded
+            else:
+                chunk = chunk.astype(np.float32, copy=False)
+            # (frequency bins, time bins) -> (windows, frequency bins, window size)
+            chunk = np.ascontiguousarray(chunk)
+            freq_stride, time_stride = chunk.strides
+            windows = np.lib.stride_tricks.as_strided(
+                chunk,
+                shape=(n_windows, n_freqbins, self.window_size),
+                strides=(time_stride * self.hop_size, freq_stride, time_stride),
+                writeable=False,
+            )
+            # add channel dimension; windows are the batch
+            yield torch.from_numpy(np.array(windows, order='C')).unsqueeze(1)
+
+
+def window_weights(window_size, hop_size, window='hann'):
+    """get weights used to average outputs of a network
+    for overlapping windows, with ``OverlapAdd``.
+
+    Predictions near the edges of windows are less accurate, because the network
+    has less context. Weighting with a tapered window reduces
+    these edge artifacts. When windows do not overlap, weights are all ones.
+
+    Parameters
+    ----------
+    window_size : int
+        number of time bins in each window.
+    hop_size : int
+        number of time bins between the start of consecutive windows.
+    window : str
+        name of window, any accepted by ``scipy.signal.get_window``.
+        Default is 'hann'.
+
+    Returns
+    -------
+    weights : numpy.ndarray
+        vector of positive weights with length ``window_size``.
+    """
+    if hop_size >= window_size:
+        return np.ones(window_size, dtype=np.float32)
+    # drop the first and last points, that are zero for tapered windows,
+    # so every time bin has a positive weight
+    weights = scipy.signal.get_window(window, window_size + 2, fftbins=False)[1:-1]
+    return weights.astype(np.float32)
+
+
+class OverlapAdd:
+    """Combines the outputs of a network for overlapping windows
+    into one output per time bin, by taking a weighted average
+    of the outputs for all windows that contain each time bin.
+
+    Outputs are accumulated in a buffer that only spans the time bins
+    of the current batch of windows. Once all windows containing a time bin
+    have been added, the output for that time bin is final, and it is removed
+    from the buffer and returned, so memory does not grow with the length of recordings.
+
+    Parameters
+    ----------
+    n_timebins : int
+        number of time bins in spectrogram.
+    n_classes : int
+        number of classes, i.e. size of class dimension of network outputs.
+    window_size : int
+        number of time bins in each window.
+    hop_size : int
+        number of time bins between the start of consecutive windows.
+    weights : numpy.ndarray
+        weights for each time bin in a window. Default is None,
+        in which case ``window_weights(window_size, hop_size)`` is used.
+    """
+    def __init__(self, n_timebins, n_classes, window_size, hop_size, weights=None):
+        if weights is None:
+            weights = window_weights(window_size, hop_size)
+        self.n_timebins = n_timebins
+        self.window_size = window_size
+        self.hop_size = hop_size
+        self.weights = np.asarray(weights, dtype=np.float32)
+
+        self.buffer = np.zeros((n_classes, 0), dtype=np.float32)
+        self.weight_sums = np.zeros(0, dtype=np.float32)
+        self.buffer_start = 0  # index of time bin at start of buffer
+        self.next_window_start = 0
+
+    def add(self, y_pred_batch):
+        """add outputs for a batch of consecutive windows
+
+        Parameters
+        ----------
+        y_pred_batch : numpy.ndarray
+            network outputs with shape (windows, classes, time bins).
+
+        Returns
+        -------
+        output : numpy.ndarray
+            with shape (classes, time bins), outputs for time bins that are final,
+            i.e., that will not be in any windows after this batch.
+        """
+        n_windows = y_pred_batch.shape[0]
+        batch_start = self.next_window_start - self.buffer_start
+        batch_stop = batch_start + (n_windows - 1) * self.hop_size + self.window_size
+        if batch_stop > self.buffer.shape[-1]:
+            n_new = batch_stop - self.buffer.shape[-1]
+            self.buffer = np.concatenate(
+                (self.buffer, np.zeros((self.buffer.shape[0], n_new), dtype=np.float32)), axis=1
+            )
+            self.weight_sums = np.concatenate((self.weight_sums, np.zeros(n_new, dtype=np.float32)))
+
+        weighted = y_pred_batch * self.weights
+        for window_ind in range(n_windows):
+            start = batch_start + window_ind * self.hop_size
+            self.buffer[:, start:start + self.window_size] += weighted[window_ind]
+            self.weight_sums[start:start + self.window_size] += self.weights
+
+        self.next_window_start += n_windows * self.hop_size
+        return self._pop(self.next_window_start)
+
+    def finish(self):
+        """return outputs for all time bins still in buffer,
+        after outputs for all windows have been added"""
+        return self._pop(self.n_timebins)
+
+    def _pop(self, stop):
+        """remove time bins before ``stop`` from buffer and return their weighted average"""
+        n_final = min(stop, self.n_timebins) - self.buffer_start
+        n_final = max(min(n_final, self.buffer.shape[-1]), 0)
+        output = self.buffer[:, :n_final] / self.weight_sums[:n_final]
+        self.buffer = self.buffer[:, n_final:]
+        self.weight_sums = self.weight_sums[n_final:]
+        self.buffer_start += n_final
+        return output
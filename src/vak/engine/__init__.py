@@ -1 +1 @@
-from . import model
+from . import export, model
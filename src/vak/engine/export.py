@@ -0,0 +1,161 @@
+"""export trained networks to a single file, an "artifact",
+that can be used to make predictions without the model class that created the network.
+
+The network is traced with ``torch.jit.trace`` and saved with ``torch.jit.save``.
+Everything else needed to make predictions is saved in the same file,
+as "extra files": the labelmap, the parameters of the spectrogram scaler,
+and metadata such as the window size and the shape of inputs.
+Loading an exported network does not require finding installed models
+through entry points, building the network, or loading optimizer state.
+"""
+import json
+
+import numpy as np
+import torch
+
+from .model import Model
+from ..__about__ import __version__
+from ..device import get_default as get_default_device
+from ..transforms import StandardizeSpect
+
+# extension of files with exported networks
+EXPORT_EXT = '.export.pt'
+
+# names of "extra files" saved in exported files
+LABELMAP_FILE = 'labelmap.json'
+SPECT_SCALER_FILE = 'spect_scaler.json'
+METADATA_FILE = 'metadata.json'
+
+
+def export(model,
+           export_path,
+           input_shape,
+           labelmap,
+           window_size,
+           spect_standardizer=None,
+           model_name=None):
+    """export the network of a trained model to a single file
+
+    Parameters
+    ----------
+    model : vak.engine.model.Model
+        trained model, e.g. with weights loaded from a checkpoint.
+    export_path : str, Path
+        path to file where exported network is saved.
+        By convention has the extension '.export.pt'.
+    input_shape : tuple
+        shape of input to network, (channels, frequency bins, time bins),
+        without batch dimension. Used to make example input for tracing.
+    labelmap : dict
+        that maps labels to consecutive integers, i.e. classes output by the network.
+    window_size : int
+        size of windows taken from spectrograms, in number of time bins.
+    spect_standardizer : vak.transforms.StandardizeSpect
+        instance that has been fit to the training data. Default is None.
+    model_name : str
+        name of model, saved as metadata. Default is None.
+    """
+    network = model.network
+    network.to('cpu')
+    network.eval()
+    example_input = torch.zeros((1,) + tuple(input_shape))
+    with torch.no_grad():
+        traced = torch.jit.trace(network, example_input)
+
+    metadata = {
+        'model_name': model_name,
+        'input_shape': list(input_shape),
+        'window_size': window_size,
+        'vak_version': __version__,
+    }
+    extra_files = {
+        LABELMAP_FILE: json.dumps(labelmap),
+        METADATA_FILE: json.dumps(metadata),
+    }
+    if spect_standardizer is not None:
+        extra_files[SPECT_SCALER_FILE] = json.dumps({
+            'mean_freqs': spect_standardizer.mean_freqs.tolist(),
+            'std_freqs': spect_standardizer.std_freqs.tolist(),
+            'non_zero_std': spect_standardizer.non_zero_std.tolist(),
+        })
+    torch.jit.save(traced, str(export_path), _extra_files=extra_files)
+
+
+class ExportedModel(Model):
+    """model with a network loaded from a file saved by ``vak.engine.export.export``.
+
+    Used to make predictions with ``predict``, ``predict_batch``, and ``predict_iter``.
+    Has no loss or optimizer, so it cannot be trained.
+
+    Attributes
+    ----------
+    labelmap : dict
+        that maps labels to consecutive integers.
+    window_size : int
+        size of windows taken from spectrograms, in number of time bins.
+    input_shape : tuple
+        shape of input to network, (channels, frequency bins, time bins).
+    spect_standardizer : vak.transforms.StandardizeSpect
+        spectrogram scaler saved with the network, or None if there was not one.
+    model_name : str
+        name of model that network was exported from.
+    """
+    def __init__(self,
+                 network,
+                 labelmap,
+                 window_size,
+                 input_shape,
+                 spect_standardizer=None,
+                 model_name=None,
+                 logger=None):
+        super().__init__(network=network, loss=None, optimizer=None, metrics={}, logger=logger)
+        self.labelmap = labelmap
+        self.window_size = window_size
+        self.input_shape = input_shape
+        self.spect_standardizer = spect_standardizer
+        self.model_name = model_name
+
+    @classmethod
+    def from_file(cls, export_path, device=None, logger=None):
+        """load a network exported with ``vak.engine.export.export``
+
+        Parameters
+        ----------
+        export_path : str, Path
+            path to file saved by ``vak.engine.export.export``.
+        device : str
+            Device on which network is loaded. Tensors are mapped directly to this device.
+            Defaults to 'cuda' if torch.cuda.is_available is True.
+        logger : logging.Logger
+            instance created by vak.logging.get_logger. Default is None.
+
+        Returns
+        -------
+        exported_model : ExportedModel
+        """
+        if device is None:
+            device = get_default_device()
+        extra_files = {LABELMAP_FILE: '', SPECT_SCALER_FILE: '', METADATA_FILE: ''}
+        network = torch.jit.load(str(export_path), map_location=device, _extra_files=extra_files)
+
+        labelmap = json.loads(extra_files[LABELMAP_FILE])
+        metadata = json.loads(extra_files[METADATA_FILE])
+        if extra_files[SPECT_SCALER_FILE]:
+            spect_scaler_params = json.loads(extra_files[SPECT_SCALER_FILE])
+            spect_standardizer = StandardizeSpect(
+                mean_freqs=np.asarray(spect_scaler_params['mean_freqs']),
+                std_freqs=np.asarray(spect_scaler_params['std_freqs']),
+                non_zero_std=np.asarray(spect_scaler_params['non_zero_std']),
+            )
+        else:
+            spect_standardizer = None
+
+        exported_model = cls(network,
+                             labelmap,
+                             window_size=metadata['window_size'],
+                             input_shape=tuple(metadata['input_shape']),
+                             spect_standardizer=spect_standardizer,
+                             model_name=metadata['model_name'],
+                             logger=logger)
+        exported_model.device = device
+        return exported_model
@@ -1,4 +1,8 @@
-from collections import defaultdict
+from collections import defaultdict, deque
+import contextlib
+import inspect
+import itertools
+import time
 
 import torch
 import torch.nn.modules.loss
@@ -9,6 +13,17 @@ from ..device import get_default as get_default_device
 from ..labeled_timebins import lbl_tb2labels
 from ..logging import log_or_print
 
+# layers quantized by default by Model.quantize
+QUANTIZED_LAYER_TYPES = {torch.nn.Linear, torch.nn.LSTM, torch.nn.GRU}
+
+
+@contextlib.contextmanager
+def _no_autocast():
+    """context manager that does nothing, used by Model._autocast
+    when operations should run in float32.
+    Same as ``contextlib.nullcontext``, that requires Python 3.7"""
+    yield
+
 
 class Model:
     """lightweight model class that adds methods for training and evaluation
@@ -38,7 +53,10 @@ class Model:
     fit : fit a model by training it with supplied data for a specified number of epochs
     evaluate : evaluate a model by computing specified metrics on supplied data
     predict : return predictions of model, i.e. output when fed with supplied data
+    predict_iter : yield predictions of model for each batch of supplied data
+    predict_batch : return predictions of model for a single batch
     compile : returns instance of model with attributes set to specified arguments
+    quantize : apply dynamic int8 quantization to network, for inference on CPU
 
     Private Methods
     ---------------
@@ -81,6 +99,9 @@ class Model:
 
         # attributes set by fit / _train methods
         self.device = None
+        self.eval_batch_size = None  # also set by evaluate method
+        self.mixed_precision = False
+        self.grad_scaler = None
         self.ckpt_path = None
         self.max_val_acc = 0
         self.max_val_acc_ckpt_path = None
@@ -107,18 +128,29 @@ class Model:
 
         progress_bar = tqdm(train_data)
         for ind, batch in enumerate(progress_bar):
+            tic = time.perf_counter()
             x, y = batch[0].to(self.device), batch[1].to(self.device)
-            y_pred = self.network.forward(x)
+            with self._autocast():
+                y_pred = self.network.forward(x)
+                loss = self.loss(y_pred, y)
             self.optimizer.zero_grad()
-            loss = self.loss(y_pred, y)
-            loss.backward()
-            self.optimizer.step()
+            if self.grad_scaler is not None:
+                # scale loss so small float16 gradients do not underflow to zero
+                self.grad_scaler.scale(loss).backward()
+                self.grad_scaler.step(self.optimizer)
+                self.grad_scaler.update()
+            else:
+                loss.backward()
+                self.optimizer.step()
+            loss_val = loss.item()  # also waits for computation to finish, so elapsed time is accurate
+            throughput = x.shape[0] / (time.perf_counter() - tic)
             progress_bar.set_description(
-                f'Epoch {epoch}, batch {ind}. Loss: {loss.item():.4f}. Global step: {self.global_step}'
+                f'Epoch {epoch}, batch {ind}. Loss: {loss_val:.4f}. Global step: {self.global_step}'
             )
 
             if self.summary_writer is not None:
-                self.summary_writer.add_scalar('loss/train', loss.item(), self.global_step)
+                self.summary_writer.add_scalar('loss/train', loss_val, self.global_step)
+                self.summary_writer.add_scalar('throughput/train', throughput, self.global_step)
             self.global_step += 1
 
             if val_data is not None:
@@ -134,7 +166,7 @@ class Model:
 
                     if self.summary_writer is not None:
                         for metric_name, metric_value in metric_vals.items():
-                            if metric_name.startswith('avg_'):
+                            if metric_name.startswith('avg_') or metric_name == 'throughput':
                                 self.summary_writer.add_scalar(f'{metric_name}/val',
                                                                metric_value,
                                                                self.global_step)
@@ -192,22 +224,14 @@ class Model:
         metric_vals = defaultdict(list)
 
         n_batches = 0
+        n_windows = 0
+        tic = time.perf_counter()
 
         progress_bar = tqdm(eval_data)
         with torch.no_grad():
-            for ind, batch in enumerate(progress_bar):
-                x, y = batch['source'].to(self.device), batch['annot'].to(self.device)
-                # remove "batch" dimension added by collate_fn to x
-                # we keep for y because loss still expects the first dimension to be batch
-                if x.ndim == 5:
-                    if x.shape[0] == 1:
-                        x = torch.squeeze(x, dim=0)
-                else:
-                    raise ValueError(
-                        f'invalid shape for x: {x.shape}'
-                    )
-
-                out = self.network.forward(x)
+            for ind, (batch, out) in enumerate(self._forward_items(progress_bar, self.eval_batch_size)):
+                y = batch['annot'].to(self.device)
+                n_windows += out.shape[0]
                 # permute and flatten out
                 # so that it has shape (1, number classes, number of time bins)
                 # ** NOTICE ** just calling out.reshape(1, out.shape(1), -1) does not work, it will change the data
@@ -279,9 +303,103 @@ class Model:
                 raise NotImplementedError(
                     f'calculation of metric across batches not yet implemented for {metric_name}'
                 )
+        # number of windows evaluated per second
+        metric_vals['throughput'] = n_windows / (time.perf_counter() - tic)
 
         return metric_vals
 
+    def _forward_items(self, eval_data, batch_size=None):
+        """helper method, called by _eval. Yields each item from eval_data,
+        i.e. the windows from one file, along with the output of the network for them.
+
+        If ``batch_size`` is None, there is one forward pass for each item.
+        Otherwise, windows from consecutive items are packed into batches of
+        ``batch_size`` windows, so that files with few windows do not each
+        need a separate, small forward pass. Outputs are split up again,
+        and an item is yielded once outputs for all its windows have been computed,
+        so metrics are still computed for each file.
+
+        Parameters
+        ----------
+        eval_data : iterable
+            of dict, items from a torch.util.Dataloader with a batch size of 1,
+            where 'source' has shape (1, windows, channels, frequency bins, time bins).
+        batch_size : int
+            number of windows in each forward pass. Default is None.
+
+        Yields
+        ------
+        item : dict
+            from eval_data.
+        out : torch.Tensor
+            output of network for windows in item, with shape (windows, classes, time bins).
+        """
+        items = deque()  # items with windows that have been added, whose outputs have not been yielded
+        windows = []  # windows that have not been passed through the network yet
+        n_windows = 0
+        outputs = []  # outputs for windows of items in ``items``
+        n_outputs = 0
+
+        # ``None`` marks the end of eval_data, after which any remaining windows are passed through the network
+        for item in itertools.chain(eval_data, [None]):
+            if item is not None:
+                x = item['source']
+                # remove "batch" dimension added by collate_fn to x
+                if x.ndim == 5:
+                    if x.shape[0] == 1:
+                        x = torch.squeeze(x, dim=0)
+                else:
+                    raise ValueError(
+                        f'invalid shape for x: {x.shape}'
+                    )
+                if batch_size is None:
+                    yield item, self._forward_eval(x)
+                    continue
+                items.append((item, x.shape[0]))
+                windows.append(x)
+                n_windows += x.shape[0]
+                n_forward = n_windows // batch_size * batch_size  # only full batches
+            else:
+                n_forward = n_windows
+
+            if n_forward > 0:
+                x = torch.cat(windows)
+                for x_batch in torch.split(x[:n_forward], batch_size):
+                    outputs.append(self._forward_eval(x_batch))
+                windows = [x[n_forward:]]
+                n_windows -= n_forward
+                n_outputs += n_forward
+
+            if items and items[0][1] <= n_outputs:
+                out = torch.cat(outputs)
+                while items and items[0][1] <= n_outputs:
+                    item, item_windows = items.popleft()
+                    yield item, out[:item_windows]
+                    out = out[item_windows:]
+                    n_outputs -= item_windows
+                outputs = [out]
+
+    def _forward_eval(self, x):
+        """helper method, called by _forward_items. Passes windows x through the network,
+        with autocast if ``mixed_precision`` is True, returning outputs as float32"""
+        with self._autocast():
+            return self.network.forward(x.to(self.device)).float()
+
+    def _autocast(self):
+        """get context manager that runs operations in mixed precision
+        if the ``mixed_precision`` attribute is True: bfloat16 on CPU, float16 on GPU.
+        If ``mixed_precision`` is False, operations run in float32."""
+        if not self.mixed_precision:
+            return _no_autocast()
+        device_type = 'cuda' if str(self.device).startswith('cuda') else 'cpu'
+        if hasattr(torch, 'autocast'):
+            dtype = torch.float16 if device_type == 'cuda' else torch.bfloat16
+            return torch.autocast(device_type=device_type, dtype=dtype)
+        # torch < 1.10 only has autocast for GPU, in float16
+        if device_type == 'cuda':
+            return torch.cuda.amp.autocast()
+        return _no_autocast()
+
     def _predict(self, pred_data):
         """helper method, called by the predict method on each epoch.
         Uses the model to make predictions, by iterating through pred_data
@@ -298,27 +416,43 @@ class Model:
 
         progress_bar = tqdm(pred_data)
 
-        with torch.no_grad():
-            for ind, batch in enumerate(progress_bar):
-                x, spect_path = batch['source'].to(self.device), batch['spect_path']
-                if isinstance(spect_path, list) and len(spect_path) == 1:
-                    spect_path = spect_path[0]
-                if x.ndim == 5:
-                    if x.shape[0] == 1:
-                        x = torch.squeeze(x, dim=0)
-                y_pred = self.network.forward(x)
-                preds[spect_path] = y_pred
-                progress_bar.set_description(
-                    f'batch {ind} / {len(pred_data)}'
-                )
+        for ind, batch in enumerate(progress_bar):
+            spect_path = batch['spect_path']
+            if isinstance(spect_path, list) and len(spect_path) == 1:
+                spect_path = spect_path[0]
+            preds[spect_path] = self._predict_batch(batch['source'])
+            progress_bar.set_description(
+                f'batch {ind} / {len(pred_data)}'
+            )
 
         return preds
 
+    def _predict_batch(self, x):
+        """helper method that returns output of network for one batch,
+        in inference mode, i.e. without computing gradients.
+        Called by _predict, predict_batch, and predict_iter.
+
+        Parameters
+        ----------
+        x : torch.Tensor
+            input to network. If x has 5 dimensions and the first has size 1,
+            i.e. it is a spectrogram reshaped into a batch of windows
+            and then batched by a DataLoader with batch_size 1,
+            the first dimension is removed.
+        """
+        x = x.to(self.device)
+        if x.ndim == 5:
+            if x.shape[0] == 1:
+                x = torch.squeeze(x, dim=0)
+        with torch.no_grad():
+            return self.network.forward(x)
+
     def save(self, ckpt_path, **kwargs):
         """save model state to a checkpoint file.
 
-        Saves network state_dict, optimizer state_dict, and
-        any keyword arguments to a checkpoint file with the name
+        Saves network state_dict, optimizer state_dict,
+        the state_dict of the gradient scaler if training with mixed precision on GPU,
+        and any keyword arguments to a checkpoint file with the name
         specified by ckpt_path.
 
         Parameters
@@ -332,30 +466,92 @@ class Model:
             'network_state_dict': self.network.state_dict(),
             'optimizer_state_dict': self.optimizer.state_dict(),
         }
+        if self.grad_scaler is not None:
+            ckpt['grad_scaler_state_dict'] = self.grad_scaler.state_dict()
         ckpt.update(**kwargs)
         log_or_print(
             f'Saving checkpoint at:\n{ckpt_path} ',
             logger=self.logger, level='info')
         torch.save(ckpt, ckpt_path)
 
-    def load(self, ckpt_path):
+    def load(self, ckpt_path, device=None, inference=False, mmap=False):
         """load model state dict from a checkpoint file.
 
         Loads state_dicts into network and optimizer
         from a checkpoint file with the name
-        specified by ckpt_path.
+        specified by ckpt_path. If the checkpoint has the state
+        of a gradient scaler, i.e. it was saved while training with mixed precision
+        on GPU, that state is loaded too, so training can continue with the same loss scale.
 
         Parameters
         ----------
         ckpt_path : str, Path
             path including filename from which to load checkpoint
+        device : str
+            Device to which tensors in the checkpoint are mapped as they are loaded,
+            passed as ``map_location`` to ``torch.load``, e.g. so that
+            a checkpoint saved on a GPU can be loaded on a machine without one.
+            Default is None, in which case tensors are loaded onto
+            the device they were saved from.
+        inference : bool
+            if True, only load the state dict of the network, and skip the state
+            of the optimizer and gradient scaler, that are not needed to evaluate a model or make
+            predictions with it. Default is False.
+        mmap : bool
+            if True, memory-map the checkpoint file instead of reading all of it
+            into memory, so tensors are only read when they are copied into the network.
+            Requires a version of torch where ``torch.load`` accepts ``mmap`` (2.1 or later);
+            with earlier versions the checkpoint is loaded without memory-mapping,
+            and this is only logged at the debug level, so that callers can always
+            request memory-mapping. Default is False.
         """
         log_or_print(
             f'Loading checkpoint from:\n{ckpt_path} ',
             logger=self.logger, level='info')
-        ckpt = torch.load(ckpt_path)
+        load_kwargs = {}
+        if mmap:
+            if 'mmap' in inspect.signature(torch.load).parameters:
+                load_kwargs['mmap'] = True
+            elif self.logger is not None:
+                # expected with torch < 2.1, so only logged at debug level, and not printed without a logger
+                self.logger.debug(
+                    'version of torch does not support memory-mapping checkpoints, '
+                    'loading without memory-mapping'
+                )
+        ckpt = torch.load(ckpt_path, map_location=device, **load_kwargs)
         self.network.load_state_dict(ckpt['network_state_dict'])
-        self.optimizer.load_state_dict(ckpt['optimizer_state_dict'])
+        if not inference:
+            self.optimizer.load_state_dict(ckpt['optimizer_state_dict'])
+            if 'grad_scaler_state_dict' in ckpt:
+                if self.grad_scaler is None:
+                    self.grad_scaler = torch.cuda.amp.GradScaler()
+                self.grad_scaler.load_state_dict(ckpt['grad_scaler_state_dict'])
+
+    def quantize(self, layer_types=QUANTIZED_LAYER_TYPES):
+        """apply post-training dynamic quantization to the network,
+        for faster inference on CPU.
+
+        Weights of layers with types in ``layer_types`` are converted to 8-bit integers,
+        and activations are quantized on the fly during the forward pass,
+        with ``torch.quantization.quantize_dynamic``.
+        Other layers, e.g. convolutional layers, still run in float32.
+        Quantized layers only run on CPU, and the quantized network cannot be trained,
+        so this should be called after loading a checkpoint, only to make predictions
+        or evaluate the model.
+
+        Parameters
+        ----------
+        layer_types : set
+            of torch.nn.Module subclasses to quantize.
+            Default is ``{torch.nn.Linear, torch.nn.LSTM, torch.nn.GRU}``,
+            the layers of recurrent networks like TweetyNet.
+        """
+        log_or_print(
+            f'Applying dynamic int8 quantization to layers: {sorted(layer.__name__ for layer in layer_types)}',
+            logger=self.logger, level='info')
+        self.network.to('cpu')
+        self.network.eval()
+        self.network = torch.quantization.quantize_dynamic(self.network, set(layer_types), dtype=torch.qint8)
 
     def fit(self,
             train_data,
@@ -365,7 +561,9 @@ class Model:
             val_step=None,
             ckpt_step=None,
             patience=None,
-            device=None
+            device=None,
+            val_batch_size=None,
+            mixed_precision=False,
             ):
         # ---- pre-conditions ----------
         if val_data is None:
@@ -382,6 +580,19 @@ class Model:
         if device is None:
             device = get_default_device()
         self.device = device
+        self.eval_batch_size = val_batch_size
+        self.mixed_precision = mixed_precision
+        if mixed_precision and str(device).startswith('cuda'):
+            # float16 has a small range, so gradients are scaled; bfloat16 on CPU does not need scaling.
+            # keep scaler if its state was loaded from a checkpoint
+            if self.grad_scaler is None:
+                self.grad_scaler = torch.cuda.amp.GradScaler()
+        else:
+            self.grad_scaler = None
+            if mixed_precision and not hasattr(torch, 'autocast'):
+                log_or_print(
+                    'version of torch does not support mixed precision on CPU, training in float32',
+                    logger=self.logger, level='warning')
 
         # note there can be up to two checkpoint paths.
         # this first one is the "backup" checkpoint, saved intermittently (with frequency determined by ckpt_step)
@@ -418,10 +629,12 @@ class Model:
 
     def evaluate(self,
                  eval_data,
-                 device=None):
+                 device=None,
+                 batch_size=None):
         if device is None:
             device = get_default_device()
         self.device = device
+        self.eval_batch_size = batch_size
         self.network.to(self.device)
         return self._eval(eval_data)
 
@@ -434,6 +647,67 @@ class Model:
         self.network.to(self.device)
         return self._predict(pred_data)
 
+    def predict_iter(self,
+                     batches,
+                     device=None):
+        """make predictions one batch at a time, yielding the output of the network
+        for each batch, instead of returning outputs for a whole dataset at once.
+
+        Used to make predictions on long recordings with a constant amount of memory,
+        e.g. with batches of windows from a ``vak.datasets.WindowStream``.
+
+        Parameters
+        ----------
+        batches : iterable
+            of torch.Tensor, inputs to network.
+        device : str
+            Device on which to work with model + data.
+            Defaults to 'cuda' if torch.cuda.is_available is True.
+
+        Yields
+        ------
+        y_pred : torch.Tensor
+            output of network for each batch.
+        """
+        if device is None:
+            device = get_default_device()
+        self.device = device
+        self.network.to(self.device)
+        self.network.eval()
+
+        for x in batches:
+            yield self._predict_batch(x)
+
+    def predict_batch(self,
+                      x,
+                      device=None):
+        """make predictions for a single batch, returning the output of the network.
+
+        Used to make predictions one file at a time, converting each output
+        and then discarding it, instead of keeping outputs for a whole dataset
+        as ``predict`` does.
+
+        Parameters
+        ----------
+        x : torch.Tensor
+            input to network, e.g. the 'source' of an item returned by a
+            DataLoader over a VocalDataset with the 'predict' transform.
+        device : str
+            Device on which to work with model + data.
+            Defaults to 'cuda' if torch.cuda.is_available is True.
+
+        Returns
+        -------
+        y_pred : torch.Tensor
+            output of network.
+        """
+        if device is None:
+            device = get_default_device()
+        self.device = device
+        self.network.to(self.device)
+        self.network.eval()
+        return self._predict_batch(x)
+
     @classmethod
     def from_config(cls, config, logger=None):
         """any model that inherits from this class should do whatever it needs to
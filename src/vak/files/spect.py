@@ -1,6 +1,9 @@
 from pathlib import Path
+import struct
+import zipfile
 
 import numpy as np
+import scipy.io
 from dask import bag as db
 from dask.diagnostics import ProgressBar
 
@@ -89,6 +92,117 @@ def load(spect_path, spect_format=None):
     return spect_dict
 
 
+def _read_npy_header(fp):
+    """read header of .npy file from file object,
+    return (shape, fortran_order, dtype), or None if header version is not handled"""
+    version = np.lib.format.read_magic(fp)
+    if version == (1, 0):
+        return np.lib.format.read_array_header_1_0(fp)
+    elif version == (2, 0):
+        return np.lib.format.read_array_header_2_0(fp)
+    return None
+
+
+def memmap(spect_path, key='s', spect_format=None):
+    """get an array from a spectrogram file as a read-only memory-mapped array,
+    when possible, so that slices of it can be read without loading the whole array.
+
+    Arrays in .npz files saved with ``numpy.savez`` are stored in the zip archive
+    without compression, so they can be memory-mapped at their offset in the archive.
+    Arrays in compressed .npz files and in .mat files are loaded.
+
+    Parameters
+    ----------
+    spect_path : str, Path
+        to an array file.
+    key : str
+        key to access array in file. Default is 's', the spectrogram.
+    spect_format : str
+        Valid formats are defined in vak.io.spect.SPECT_FORMAT_LOAD_FUNCTION_MAP.
+        Default is None, in which case the extension of the file is used.
+
+    Returns
+    -------
+    arr : numpy.memmap, numpy.ndarray
+        memory-mapped array, or loaded array if it cannot be memory-mapped.
+    """
+    spect_path = Path(spect_path)
+    if spect_format is None:
+        spect_format = spect_path.suffix.replace('.', '')
+
+    if spect_format == 'npz':
+        with zipfile.ZipFile(spect_path) as zf:
+            try:
+                info = zf.getinfo(f'{key}.npy')
+            except KeyError:
+                info = None
+        if info is not None and info.compress_type == zipfile.ZIP_STORED:
+            with spect_path.open('rb') as fp:
+                # local file header is 30 bytes, followed by filename and "extra" field
+                fp.seek(info.header_offset)
+                local_header = fp.read(30)
+                fname_len, extra_len = struct.unpack('<2H', local_header[26:30])
+                fp.seek(info.header_offset + 30 + fname_len + extra_len)
+                header = _read_npy_header(fp)
+                offset = fp.tell()
+            if header is not None:
+                shape, fortran_order, dtype = header
+                if not dtype.hasobject:
+                    return np.memmap(spect_path, dtype=dtype, mode='r', offset=offset,
+                                     shape=shape, order='F' if fortran_order else 'C')
+
+    return load(spect_path, spect_format)[key]
+
+
+def n_timebins(spect_path, spect_key='s', spect_format=None):
+    """get number of time bins in a spectrogram,
+    without loading the spectrogram when possible.
+
+    For .npz files, the shape is read from the header of the .npy file
+    for the spectrogram inside the .npz archive. For .mat files,
+    the shape is read with ``scipy.io.whosmat``.
+    Other files are loaded.
+
+    Parameters
+    ----------
+    spect_path : str, Path
+        to an array file.
+    spect_key : str
+        key to access spectrogram in array file. Default is 's'.
+    spect_format : str
+        Valid formats are defined in vak.io.spect.SPECT_FORMAT_LOAD_FUNCTION_MAP.
+        Default is None, in which case the extension of the file is used.
+
+    Returns
+    -------
+    n_timebins : int
+        number of time bins, i.e. ``spect.shape[-1]``.
+        Assumes spectrogram is a 2-d matrix where rows are frequency bins,
+        and columns are time bins.
+    """
+    spect_path = Path(spect_path)
+    if spect_format is None:
+        spect_format = spect_path.suffix.replace('.', '')
+
+    if spect_format == 'npz':
+        with zipfile.ZipFile(spect_path) as zf:
+            if f'{spect_key}.npy' in zf.namelist():
+                with zf.open(f'{spect_key}.npy') as fp:
+                    header = _read_npy_header(fp)
+                    if header is not None:
+                        shape, _, _ = header
+                        return int(shape[-1])
+    elif spect_format == 'mat':
+        for name, shape, _ in scipy.io.whosmat(spect_path):
+            if name == spect_key:
+                # use shape after squeezing, like when loading with squeeze_me=True
+                shape = [dim for dim in shape if dim != 1] or [1]
+                return int(shape[-1])
+
+    # fall back to loading, e.g. for header versions not handled above
+    return load(spect_path, spect_format)[spect_key].shape[-1]
+
+
 def timebin_dur(spect_path, spect_format, timebins_key, n_decimals_trunc=5):
     """get duration of time bins from a spectrogram file
 
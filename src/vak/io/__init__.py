@@ -1,5 +1,8 @@
 """module that handles file input-output:
+- annotations predicted by models, saved in .csv files
 - audio files
 - spectrograms made from audio files of vocalizations
+- vectors of labeled timebins made from annotations for spectrograms
+- "stores", single array files that contain all spectrograms from a split of a dataset
 - .csv files that represent a dataset of vocalizations that combines all those files together"""
-from . import audio, dataframe, spect
+from . import annot, audio, dataframe, labeled_timebins, process_pool, spect, spect_manifest, spect_store
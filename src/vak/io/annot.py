@@ -0,0 +1,238 @@
+"""writer that saves predicted annotations to a .csv file incrementally,
+one file at a time, on a background thread.
+
+The .csv has the same format as files written by ``crowsetta.csv.annot2csv``,
+so it can be loaded with ``crowsetta.csv.csv2annot``.
+Rows for each annotation are written and flushed to disk as soon as
+the annotation is made, so results for files that were already predicted
+are kept if a run is interrupted, and the run can be resumed by
+skipping those files.
+"""
+import csv
+import os
+from pathlib import Path
+import queue
+import threading
+
+from crowsetta.generic import CSV_FIELDNAMES
+
+
+def _annot_to_rows(annot, annot_num):
+    """convert a crowsetta.Annotation into rows of a .csv file,
+    in the same way as ``crowsetta.csv.annot2csv``"""
+    rows = []
+    if hasattr(annot, 'stack'):
+        seq_list = annot.stack.seqs
+    else:
+        seq_list = [annot.seq]
+    for seq_num, seq in enumerate(seq_list):
+        for segment in seq.segments:
+            row = {
+                key: ('None' if val is None else val)
+                for key, val in segment.asdict().items()
+            }
+            row['annot_path'] = annot.annot_path
+            row['audio_path'] = annot.audio_path if annot.audio_path is not None else 'None'
+            row['sequence'] = seq_num
+            row['annotation'] = annot_num
+            rows.append(row)
+    return rows
+
+
+def _read_existing(csv_path):
+    """read rows of an existing .csv written by AnnotCsvWriter,
+    dropping rows for the last annotation, that may have been
+    only partly written if a run was interrupted.
+
+    Returns
+    -------
+    rows : list
+        of dict, rows to keep.
+    """
+    with csv_path.open('r', newline='') as csv_file:
+        lines = csv_file.readlines()
+    if len(lines) < 2:
+        return []
+    if not lines[-1].endswith('\n'):
+        # line was only partly written
+        lines = lines[:-1]
+    reader = csv.DictReader(lines)
+    if reader.fieldnames is None or set(reader.fieldnames) != set(CSV_FIELDNAMES):
+        raise ValueError(
+            f'cannot resume, columns of existing csv do not match annotation csv format: {csv_path}'
+        )
+    rows = [row for row in reader if None not in row.values()]
+    if rows:
+        last_annot = rows[-1]['annotation']
+        rows = [row for row in rows if row['annotation'] != last_annot]
+    return rows
+
+
+class AnnotCsvWriter:
+    """Writes annotations to a .csv file as they are made,
+    on a background thread, so that writing does not block predicting.
+
+    Annotations are put in a queue with ``write``, and a background thread
+    converts each one to rows, appends the rows to the .csv, and flushes the file.
+    Call ``close`` (or use the writer as a context manager) to wait
+    until all annotations in the queue have been written.
+
+    Parameters
+    ----------
+    csv_path : str, Path
+        path to .csv file where annotations are saved.
+    resume : bool
+        if True and ``csv_path`` exists, keep the annotations already
+        in the file and append to it, instead of overwriting it.
+        Rows for the last annotation in the file are dropped, because
+        they may be incomplete if the run that wrote them was interrupted.
+        Default is False.
+    max_queue_size : int
+        maximum number of annotations waiting to be written. If the queue is full,
+        ``write`` blocks until there is space, so memory used stays bounded.
+        Default is 64.
+
+    Attributes
+    ----------
+    done_audio_paths : set
+        of audio paths for annotations already in the .csv when the writer was created.
+        Used to skip files when resuming. Files with no predicted segments
+        do not have any rows in the .csv, so they are not in this set.
+
+    Examples
+    --------
+    >>> with vak.io.annot.AnnotCsvWriter(annot_csv_path) as writer:
+    ...     for annot in annots:
+    ...         writer.write(annot)
+    """
+    def __init__(self, csv_path, resume=False, max_queue_size=64):
+        self.csv_path = Path(csv_path)
+
+        if resume and self.csv_path.exists():
+            rows = _read_existing(self.csv_path)
+        else:
+            rows = []
+        self.done_audio_paths = set(row['audio_path'] for row in rows)
+        self._annot_num = max([int(row['annotation']) for row in rows], default=-1) + 1
+
+        # write rows that are kept to a temporary file and then replace the .csv,
+        # so the .csv ends with complete rows, and is not lost if interrupted here
+        tmp_path = self.csv_path.with_name(self.csv_path.name + '.tmp')
+        with tmp_path.open('w', newline='') as tmp_file:
+            writer = csv.DictWriter(tmp_file, fieldnames=CSV_FIELDNAMES)
+            writer.writeheader()
+            writer.writerows(rows)
+        os.replace(tmp_path, self.csv_path)
+
+        self._csv_file = self.csv_path.open('a', newline='')
+        self._writer = csv.DictWriter(self._csv_file, fieldnames=CSV_FIELDNAMES)
+
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._exception = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            annot, annot_num = item
+            try:
+                if self._exception is None:
+                    self._writer.writerows(_annot_to_rows(annot, annot_num))
+                    self._csv_file.flush()
+            except Exception as e:
+                self._exception = e
+
+    def _raise_if_failed(self):
+        if self._exception is not None:
+            raise RuntimeError(
+                f'error writing annotations to csv: {self.csv_path}'
+            ) from self._exception
+
+    def write(self, annot):
+        """add an annotation to the queue of annotations to be written
+
+        Parameters
+        ----------
+        annot : crowsetta.Annotation
+        """
+        self._raise_if_failed()
+        self._queue.put((annot, self._annot_num))
+        self._annot_num += 1
+
+    def close(self):
+        """wait for all annotations in the queue to be written, then close the .csv file"""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        if not self._csv_file.closed:
+            self._csv_file.close()
+        self._raise_if_failed()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def merge(csv_paths, csv_path, drop_last=False):
+    """merge .csv files of annotations into a single .csv file
+
+    Annotations are written in the order of ``csv_paths``,
+    and renumbered so that the 'annotation' column is consecutive
+    across files. The 'annot_path' column is set to the name of ``csv_path``.
+    Merged annotations are written to a temporary file that then replaces ``csv_path``,
+    so ``csv_path`` can also be one of ``csv_paths``.
+
+    Parameters
+    ----------
+    csv_paths : list
+        of str or pathlib.Path, paths to .csv files of annotations,
+        e.g. written by ``AnnotCsvWriter`` or ``crowsetta.csv.annot2csv``.
+    csv_path : str, pathlib.Path
+        path to .csv file where merged annotations are saved.
+    drop_last : bool
+        if True, drop rows for the last annotation in each file,
+        that may be incomplete if the run that wrote the file was interrupted,
+        as ``AnnotCsvWriter`` does when resuming. Default is False.
+    """
+    csv_path = Path(csv_path)
+    tmp_path = csv_path.with_name(csv_path.name + '.tmp')
+    annot_offset = 0
+    with tmp_path.open('w', newline='') as csv_file:
+        writer = csv.DictWriter(csv_file, fieldnames=CSV_FIELDNAMES)
+        writer.writeheader()
+        for shard_csv_path in csv_paths:
+            if drop_last:
+                rows = _read_existing(Path(shard_csv_path))
+            else:
+                with Path(shard_csv_path).open('r', newline='') as shard_csv_file:
+                    rows = list(csv.DictReader(shard_csv_file))
+            annot_nums = sorted(set(int(row['annotation']) for row in rows))
+            renumber = {annot_num: annot_offset + ind for ind, annot_num in enumerate(annot_nums)}
+            for row in rows:
+                row['annotation'] = renumber[int(row['annotation'])]
+                row['annot_path'] = csv_path.name
+            writer.writerows(rows)
+            annot_offset += len(annot_nums)
+    os.replace(tmp_path, csv_path)
+
+
+def audio_paths(csv_path):
+    """get audio paths of annotations in a .csv file of annotations
+
+    Parameters
+    ----------
+    csv_path : str, pathlib.Path
+        path to .csv file of annotations.
+
+    Returns
+    -------
+    audio_paths : set
+        of str, value of 'audio_path' column for all rows.
+    """
+    with Path(csv_path).open('r', newline='') as csv_file:
+        return set(row['audio_path'] for row in csv.DictReader(csv_file))
@@ -1,9 +1,12 @@
+from collections import defaultdict
+import functools
 import os
 from pathlib import Path
 
 import numpy as np
 import dask.bag as db
 from dask.diagnostics import ProgressBar
+from tqdm import tqdm
 
 from .. import constants
 from .. import files
@@ -11,7 +14,9 @@ from ..annotation import source_annot_map
 from ..converters import labelset_to_set
 from ..config.spect_params import SpectParamsConfig
 from ..logging import log_or_print
-from ..spect import spectrogram
+from ..spect import spectrogram_batch
+from ..timebins import timebin_dur_from_vec
+from . import process_pool, spect_manifest
 
 
 def files_from_dir(audio_dir, audio_format):
@@ -37,6 +42,64 @@ def files_from_dir(audio_dir, audio_format):
     return audio_files
 
 
+def _spect_fname(audio_file, output_dir):
+    """get name of .spect.npz file made from an audio file"""
+    basename = os.path.basename(audio_file)
+    return os.path.join(os.path.normpath(output_dir),
+                        basename + '.spect.npz')
+
+
+def _spect_files(audio_files, audio_format, spect_params, output_dir, batch_size=16):
+    """helper function that enables parallelized creation of array
+    files containing spectrograms.
+    Accepts list of paths to audio files, saves .npz file with spectrogram for each.
+
+    Files are loaded in batches of ``batch_size``, and files in a batch
+    with the same sampling frequency are made into spectrograms together
+    with ``vak.spect.spectrogram_batch``.
+
+    Defined at the top level of the module, instead of inside ``to_spect``,
+    so that it can be pickled and sent to worker processes.
+
+    Returns
+    -------
+    spect_records : list
+        of tuples ``(npz_fname, audio_file, n_timebins, timebin_dur)``, one for each
+        audio file, so that ``to_spect`` can add entries to a manifest
+        without loading the spectrogram files again.
+    """
+    audio_files = list(audio_files)
+    spect_records = []
+    for start in range(0, len(audio_files), batch_size):
+        batch_files = audio_files[start:start + batch_size]
+        dats_fss = [constants.AUDIO_FORMAT_FUNC_MAP[audio_format](audio_file) for audio_file in batch_files]
+        fs_inds_map = defaultdict(list)
+        for ind, (_, fs) in enumerate(dats_fss):
+            fs_inds_map[fs].append(ind)
+        spects_freqbins_timebins = [None] * len(batch_files)
+        for fs, inds in fs_inds_map.items():
+            batch_out = spectrogram_batch([dats_fss[ind][0] for ind in inds], fs,
+                                          spect_params.fft_size,
+                                          spect_params.step_size,
+                                          spect_params.thresh,
+                                          spect_params.transform_type,
+                                          spect_params.freq_cutoffs)
+            for ind, s_f_t in zip(inds, batch_out):
+                spects_freqbins_timebins[ind] = s_f_t
+
+        for audio_file, (s, f, t) in zip(batch_files, spects_freqbins_timebins):
+            spect_dict = {spect_params.spect_key: s,
+                          spect_params.freqbins_key: f,
+                          spect_params.timebins_key: t,
+                          spect_params.audio_path_key: audio_file}
+            npz_fname = _spect_fname(audio_file, output_dir)
+            np.savez(npz_fname, **spect_dict)
+            spect_records.append(
+                (npz_fname, audio_file, s.shape[-1], timebin_dur_from_vec(t, n_decimals_trunc=5))
+            )
+    return spect_records
+
+
 def to_spect(audio_format,
              spect_params,
              output_dir,
@@ -45,6 +108,12 @@ def to_spect(audio_format,
              annot_list=None,
              audio_annot_map=None,
              labelset=None,
+             backend='dask',
+             workers=None,
+             chunksize=1,
+             max_in_flight=None,
+             manifest=None,
+             batch_size=16,
              logger=None):
     """makes spectrograms from audio files and saves in array files
 
@@ -77,6 +146,33 @@ def to_spect(audio_format,
         If not None, skip files where the associated annotations contain labels not in ``labelset``.
         ``labelset`` is converted to a Python ``set`` using ``vak.converters.labelset_to_set``.
         See help for that function for details on how to specify labelset.
+    backend : str
+        used to make spectrograms from audio files in parallel.
+        One of {'dask', 'process'}. Default is 'dask'.
+        If 'process', files are processed by a pool of worker processes,
+        see ``vak.io.process_pool.imap_ordered``.
+    workers : int
+        number of worker processes, for the 'process' backend.
+        Default is None, in which case the number of CPUs is used.
+    chunksize : int
+        number of audio files sent to a worker at a time, for the 'process' backend.
+        Files in a chunk are made into spectrograms in batches of up to ``batch_size``.
+        Default is 1.
+    max_in_flight : int
+        maximum number of audio files being processed at a time,
+        for the 'process' backend, which bounds memory used.
+        Default is None, in which case it is ``2 * workers * chunksize``.
+    manifest : vak.io.spect_manifest.SpectManifest
+        manifest of spectrogram files made previously. If specified,
+        spectrograms are only made for audio files that are not in the manifest
+        with the same ``spect_params``, or that changed since their spectrogram was made.
+        The spectrogram files in the manifest are re-used for all other audio files,
+        and the manifest is updated with the new spectrogram files.
+        Default is None, in which case spectrograms are made for all audio files.
+    batch_size : int
+        maximum number of audio files with the same sampling frequency
+        that are made into spectrograms together, with ``vak.spect.spectrogram_batch``.
+        Default is 16.
 
     Other Parameters
     ----------------
@@ -127,6 +223,8 @@ def to_spect(audio_format,
             'received values for annot_list and array_annot_map, unclear which annotations to use'
         )
 
+    process_pool.validate_backend(backend)
+
     if labelset is not None:
         labelset = labelset_to_set(labelset)
 
@@ -191,31 +289,54 @@ def to_spect(audio_format,
                                  logger=logger, level='info')
         audio_files = sorted(list(audio_annot_map.keys()))
 
-    # this is defined here so all other arguments to 'to_spect' are in scope
-    def _spect_file(audio_file):
-        """helper function that enables parallelized creation of array
-        files containing spectrograms.
-        Accepts path to audio file, saves .npz file with spectrogram"""
-        dat, fs = constants.AUDIO_FORMAT_FUNC_MAP[audio_format](audio_file)
-        s, f, t = spectrogram(dat, fs,
-                              spect_params.fft_size,
-                              spect_params.step_size,
-                              spect_params.thresh,
-                              spect_params.transform_type,
-                              spect_params.freq_cutoffs)
-        spect_dict = {spect_params.spect_key: s,
-                      spect_params.freqbins_key: f,
-                      spect_params.timebins_key: t,
-                      spect_params.audio_path_key: audio_file}
-        basename = os.path.basename(audio_file)
-        npz_fname = os.path.join(os.path.normpath(output_dir),
-                                 basename + '.spect.npz')
-        np.savez(npz_fname, **spect_dict)
-        return npz_fname
-
-    bag = db.from_sequence(audio_files)
-    with ProgressBar():
-        spect_files = list(bag.map(_spect_file))
-    # sort because ordering from Dask not guaranteed
-    spect_files = sorted(spect_files)
+    if manifest is not None:
+        params_hash = spect_manifest.spect_params_hash(spect_params)
+        reused_spect_files = []
+        new_audio_files = []
+        for audio_file in audio_files:
+            entry = manifest.get(audio_file, params_hash)
+            if entry is not None:
+                reused_spect_files.append(entry['spect_path'])
+            else:
+                new_audio_files.append(audio_file)
+        log_or_print(f're-using {len(reused_spect_files)} spectrogram files from manifest, '
+                     f'making {len(new_audio_files)} new spectrogram files',
+                     logger=logger, level='info')
+        audio_files = new_audio_files
+
+    make_spect_files = functools.partial(_spect_files,
+                                         audio_format=audio_format,
+                                         spect_params=spect_params,
+                                         output_dir=output_dir,
+                                         batch_size=batch_size)
+    if len(audio_files) == 0:
+        spect_records = []
+    elif backend == 'dask':
+        bag = db.from_sequence(audio_files)
+        with ProgressBar():
+            spect_records = list(bag.map_partitions(make_spect_files))
+        # sort because ordering from Dask not guaranteed
+        spect_records = sorted(spect_records)
+    elif backend == 'process':
+        # sort audio files by name so spectrogram files are in the same order as with 'dask',
+        # then keep that order, instead of sorting after all files are made
+        audio_files = sorted(audio_files, key=os.path.basename)
+        # each worker gets a chunk of files, and makes spectrograms for them in batches
+        chunks = [audio_files[start:start + chunksize] for start in range(0, len(audio_files), chunksize)]
+        max_chunks_in_flight = max(max_in_flight // chunksize, 1) if max_in_flight is not None else None
+        spect_records = []
+        with tqdm(total=len(audio_files)) as progress_bar:
+            for chunk_spect_records in process_pool.imap_ordered(make_spect_files, chunks, workers,
+                                                                 1, max_chunks_in_flight):
+                spect_records.extend(chunk_spect_records)
+                progress_bar.update(len(chunk_spect_records))
+    spect_files = [spect_record[0] for spect_record in spect_records]
+
+    if manifest is not None:
+        for spect_path, audio_file, n_timebins, timebin_dur in spect_records:
+            manifest.add(audio_file, params_hash, spect_path, n_timebins, timebin_dur)
+        if reused_spect_files:
+            # files are in more than one directory, so sort by name
+            spect_files = sorted(spect_files + reused_spect_files, key=os.path.basename)
+
     return spect_files
@@ -1,10 +1,11 @@
+import copy
 from datetime import datetime
 import os
 
 from crowsetta import Transcriber
 import numpy as np
 
-from . import audio, spect
+from . import audio, process_pool, spect, spect_manifest
 from .. import annotation
 from ..converters import expanded_user_path, labelset_to_set
 from ..logging import log_or_print
@@ -18,6 +19,11 @@ def from_files(data_dir,
                spect_format=None,
                spect_params=None,
                spect_output_dir=None,
+               backend='dask',
+               workers=None,
+               chunksize=1,
+               max_in_flight=None,
+               reuse_spects=False,
                logger=None):
     """create a pandas DataFrame representing a dataset for machine learning
     from a set of files in a directory
@@ -66,6 +72,26 @@ def from_files(data_dir,
         Default is None, in which case it defaults to ``data_dir``.
         A new directory will be created in ``spect_output_dir`` with
         the name 'spectrograms_generated_{time stamp}'.
+    backend : str
+        used to process files in parallel. One of {'dask', 'process'}.
+        Default is 'dask'. See ``vak.io.audio.to_spect``.
+    workers : int
+        number of worker processes, for the 'process' backend.
+        Default is None, in which case the number of CPUs is used.
+    chunksize : int
+        number of files sent to a worker at a time, for the 'process' backend.
+        Default is 1.
+    max_in_flight : int
+        maximum number of files being processed at a time, for the 'process' backend.
+        Default is None, in which case it is ``2 * workers * chunksize``.
+    reuse_spects : bool
+        if True, keep a manifest of spectrogram files made from audio files,
+        in a file named 'spect_manifest.json' in ``spect_output_dir``,
+        and only make spectrograms for audio files that are new or changed since
+        the last time this function was called with the same ``spect_output_dir``
+        and ``spect_params``. Spectrogram files and rows of the dataset for all
+        other audio files are re-used. See ``vak.io.spect_manifest``.
+        Default is False.
 
     Other Parameters
     ----------------
@@ -81,6 +107,8 @@ def from_files(data_dir,
     if labelset is not None:
         labelset = labelset_to_set(labelset)
 
+    process_pool.validate_backend(backend)
+
     if audio_format is None and spect_format is None:
         raise ValueError("Must specify either audio_format or spect_format")
 
@@ -126,6 +154,14 @@ def from_files(data_dir,
 
         timenow = datetime.now().strftime('%y%m%d_%H%M%S')
         spect_dirname = f'spectrograms_generated_{timenow}'
+        if reuse_spects:
+            manifest_path = spect_output_dir.joinpath(spect_manifest.MANIFEST_FNAME)
+            manifest = spect_manifest.SpectManifest.from_file(manifest_path)
+            # entries as they were before making new spectrograms, used to re-use rows of dataset,
+            # so that new spectrogram files are validated
+            previous_manifest = copy.deepcopy(manifest)
+        else:
+            manifest = previous_manifest = None
         spect_output_dir = spect_output_dir.joinpath(spect_dirname)
         spect_output_dir.mkdir()
 
@@ -134,16 +170,32 @@ def from_files(data_dir,
                                      output_dir=spect_output_dir,
                                      audio_files=audio_files,
                                      annot_list=annot_list,
-                                     labelset=labelset)
+                                     labelset=labelset,
+                                     backend=backend,
+                                     workers=workers,
+                                     chunksize=chunksize,
+                                     max_in_flight=max_in_flight,
+                                     manifest=manifest,
+                                     logger=logger)
         spect_format = 'npz'
+        if reuse_spects:
+            manifest.to_file(manifest_path)
+            if not any(spect_output_dir.iterdir()):  # because no new spectrograms were made
+                spect_output_dir.rmdir()
     else:  # if audio format is None
         spect_files = None
+        previous_manifest = None
 
     to_dataframe_kwargs = {
         'spect_format': spect_format,
         'labelset': labelset,
         'annot_list': annot_list,
         'annot_format': annot_format,
+        'backend': backend,
+        'workers': workers,
+        'chunksize': chunksize,
+        'max_in_flight': max_in_flight,
+        'manifest': previous_manifest,
     }
 
     if spect_files:  # because we just made them, and put them in spect_output_dir
@@ -0,0 +1,142 @@
+"""functions that save vectors of labeled timebins
+for each spectrogram file in a dataset,
+so they do not have to be made from annotations every time they are needed.
+
+The path to each saved vector is added to the DataFrame
+that represents the dataset, in the column 'lbl_tb_path',
+and the labelmap used to encode the vectors is added
+in the column 'lbl_tb_labelmap', as JSON.
+"""
+import json
+from pathlib import Path
+
+import dask.bag as db
+from dask.diagnostics import ProgressBar
+import numpy as np
+
+from .. import annotation
+from .. import files
+from .. import labels
+from .. import labeled_timebins
+from ..converters import labelset_to_set
+from ..logging import log_or_print
+
+
+# constant, used for name of column in DataFrame
+LBL_TB_PATH_COL = 'lbl_tb_path'
+# constant, used for name of column in DataFrame with labelmap used to encode vectors, as JSON
+LBL_TB_LABELMAP_COL = 'lbl_tb_labelmap'
+# constant, extension for files that contain vectors of labeled timebins
+LBL_TB_EXT = '.lbl_tb.npy'
+
+
+def to_files(vak_df,
+             labelset,
+             output_dir=None,
+             timebins_key='t',
+             logger=None):
+    """make a vector of labeled timebins for each spectrogram file in a dataset,
+    save each vector in a .npy file, and add the paths to those files to the
+    DataFrame that represents the dataset.
+
+    Labels are mapped to integers with ``vak.labels.to_map(labelset, map_unlabeled=True)``,
+    so time bins that are not labeled have the value 0.
+    This labelmap is saved as JSON in the column 'lbl_tb_labelmap'.
+    Use ``vak.labeled_timebins.lookup_table`` with it to map saved vectors
+    to the integers in another labelmap.
+
+    Parameters
+    ----------
+    vak_df : pandas.DataFrame
+        that represents a dataset of vocalizations, with annotations.
+    labelset : str, list, set
+        of str or int, set of unique labels for vocalizations.
+        Converted to a Python ``set`` using ``vak.converters.labelset_to_set``.
+    output_dir : str, pathlib.Path
+        directory where files containing vectors of labeled timebins should be saved.
+        Default is None, in which case each vector is saved in the same directory
+        as the spectrogram file it was made from.
+    timebins_key : str
+        key used to access timebins vector in spectrogram files.
+        Default is 't'.
+
+    Other Parameters
+    ----------------
+    logger : logging.Logger
+        instance created by vak.logging.get_logger. Default is None.
+
+    Returns
+    -------
+    vak_df : pandas.DataFrame
+        with columns 'lbl_tb_path' and 'lbl_tb_labelmap' added.
+    """
+    labelset = labelset_to_set(labelset)
+    if output_dir is not None:
+        output_dir = Path(output_dir)
+        if not output_dir.is_dir():
+            raise NotADirectoryError(
+                f'output_dir not found: {output_dir}'
+            )
+
+    annots = annotation.from_df(vak_df)
+    if annots is None:
+        raise ValueError(
+            'unable to make vectors of labeled timebins, no annotations found for dataset'
+        )
+    labelmap = labels.to_map(labelset, map_unlabeled=True)
+    annot_table = annotation.to_table(annots, labelmap)
+
+    def _to_file(spect_path_ind_tuple):
+        """helper function that enables parallelized saving of labeled timebins"""
+        spect_path, ind = spect_path_ind_tuple
+        timebins = files.spect.load(spect_path)[timebins_key]
+        lbls_int, onsets_s, offsets_s = annot_table.segments(ind)
+        lbl_tb = labeled_timebins.label_timebins(lbls_int,
+                                                 onsets_s,
+                                                 offsets_s,
+                                                 timebins,
+                                                 unlabeled_label=labelmap['unlabeled'])
+        spect_path = Path(spect_path)
+        if output_dir is None:
+            lbl_tb_path = spect_path.parent.joinpath(spect_path.stem + LBL_TB_EXT)
+        else:
+            lbl_tb_path = output_dir.joinpath(spect_path.stem + LBL_TB_EXT)
+        np.save(lbl_tb_path, lbl_tb)
+        return str(lbl_tb_path)
+
+    spect_path_ind_tuples = db.from_sequence(zip(vak_df['spect_path'].values, range(len(annot_table))))
+    log_or_print('saving vectors of labeled timebins', logger=logger, level='info')
+    with ProgressBar():
+        lbl_tb_paths = list(spect_path_ind_tuples.map(_to_file))
+
+    vak_df = vak_df.copy()
+    vak_df[LBL_TB_PATH_COL] = lbl_tb_paths
+    vak_df[LBL_TB_LABELMAP_COL] = json.dumps(labelmap)
+    return vak_df
+
+
+def labelmap_from_df(vak_df):
+    """get the labelmap used to encode vectors of labeled timebins
+    saved by ``to_files``, from the DataFrame that represents a dataset.
+
+    Parameters
+    ----------
+    vak_df : pandas.DataFrame
+        that represents a dataset of vocalizations.
+
+    Returns
+    -------
+    lbl_tb_labelmap : dict
+        labelmap used to encode the vectors. None if the DataFrame
+        does not have a 'lbl_tb_labelmap' column, e.g. because it was made
+        by an older version of ``vak prep``.
+    """
+    if LBL_TB_LABELMAP_COL not in vak_df.columns:
+        return None
+    labelmap_jsons = vak_df[LBL_TB_LABELMAP_COL].unique()
+    if len(labelmap_jsons) > 1:
+        raise ValueError(
+            'found more than one labelmap used to encode vectors of labeled timebins in dataset: '
+            f'{labelmap_jsons}. Prepare the dataset again with one labelset.'
+        )
+    return json.loads(labelmap_jsons.item())
@@ -0,0 +1,84 @@
+"""map a function over many files with a pool of processes,
+in bounded memory, yielding results in the same order as the files.
+
+Used as the 'process' backend when making spectrograms from audio files,
+and making a dataframe from spectrogram files, instead of ``dask.bag``.
+"""
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import itertools
+import os
+
+BACKENDS = ('dask', 'process')
+
+
+def validate_backend(backend):
+    """check that ``backend`` is one of ``vak.io.process_pool.BACKENDS``"""
+    if backend not in BACKENDS:
+        raise ValueError(
+            f"backend must be one of {BACKENDS}, but was: '{backend}'"
+        )
+
+
+def _map_chunk(func, chunk):
+    """apply func to each item in a chunk, in a worker process"""
+    return [func(item) for item in chunk]
+
+
+def imap_ordered(func, iterable, workers=None, chunksize=1, max_in_flight=None):
+    """apply a function to each item in an iterable with a pool of processes,
+    and yield the results in the same order as the items.
+
+    Items are sent to workers in chunks of ``chunksize`` items.
+    At most ``max_in_flight`` items are submitted but not yet yielded at any time,
+    so results are passed on as soon as they are ready and in order,
+    and memory used does not grow with the number of items,
+    unlike ``concurrent.futures.Executor.map``, that submits all items at once.
+
+    Parameters
+    ----------
+    func : callable
+        function to apply. Must be picklable, e.g. a function defined at the
+        top level of a module, or a ``functools.partial`` of one.
+    iterable : iterable
+        of items. Items must be picklable.
+    workers : int
+        number of worker processes. Default is None, in which case
+        the number of CPUs is used.
+    chunksize : int
+        number of items sent to a worker at a time. Larger chunks mean less
+        overhead for communicating with workers when items are quick to process.
+        Default is 1.
+    max_in_flight : int
+        maximum number of items that have been submitted to workers
+        and whose results have not been yielded yet. Default is None,
+        in which case it is ``2 * workers * chunksize``, enough to keep all workers busy.
+
+    Yields
+    ------
+    result
+        of ``func`` applied to each item, in the order of items.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    for name, val in (('workers', workers), ('chunksize', chunksize)):
+        if not isinstance(val, int) or isinstance(val, bool) or val < 1:
+            raise ValueError(
+                f'{name} must be a positive integer but was: {val}'
+            )
+    if max_in_flight is None:
+        max_in_flight = 2 * workers * chunksize
+    max_chunks_in_flight = max(max_in_flight // chunksize, 1)
+
+    iterator = iter(iterable)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = deque()
+        while True:
+            chunk = list(itertools.islice(iterator, chunksize))
+            if not chunk:
+                break
+            futures.append(executor.submit(_map_chunk, func, chunk))
+            if len(futures) >= max_chunks_in_flight:
+                yield from futures.popleft().result()
+        while futures:
+            yield from futures.popleft().result()
@@ -3,6 +3,7 @@ into a pandas DataFrame that represents a dataset used by ``vak``
 
 the returned DataFrame has columns as specified by vak.io.spect.DF_COLUMNS
 """
+import functools
 from glob import glob
 import os
 from pathlib import Path
@@ -11,12 +12,14 @@ import dask.bag as db
 from dask.diagnostics import ProgressBar
 import numpy as np
 import pandas as pd
+from tqdm import tqdm
 
 from .. import constants
 from .. import files
 from ..annotation import source_annot_map
 from ..converters import labelset_to_set
 from ..logging import log_or_print
+from . import process_pool
 
 
 # constant, used for names of columns in DataFrame below
@@ -27,9 +30,74 @@ DF_COLUMNS = [
     'annot_format',
     'duration',
     'timebin_dur',
+    'n_timebins',
 ]
 
 
+def _abspath(a_path):
+    if a_path is None:
+        return
+    else:
+        return str(Path(a_path).absolute())
+
+
+def _to_record(spect_annot_tuple, spect_format, timebin_dur, spect_key, audio_path_key, annot_format):
+    """helper function that enables parallelized creation of "records",
+    i.e. rows for dataframe, from .
+    Accepts a two-element tuple containing (1) a dictionary that represents a spectrogram
+    and (2) annotation for that file.
+
+    Defined at the top level of the module, instead of inside ``to_dataframe``,
+    so that it can be pickled and sent to worker processes."""
+    spect_path, annot = spect_annot_tuple
+    spect_dict = files.spect.load(spect_path, spect_format)
+
+    n_timebins = spect_dict[spect_key].shape[-1]
+    spect_dur = n_timebins * timebin_dur
+    if audio_path_key in spect_dict:
+        audio_path = spect_dict[audio_path_key]
+        if type(audio_path) == np.ndarray:
+            # (because everything stored in .npz has to be in an ndarray)
+            audio_path = audio_path.tolist()
+    else:
+        # try to figure out audio filename programmatically
+        # if we can't, then we'll get back a None
+        # (or an error)
+        audio_path = files.spect.find_audio_fname(spect_path)
+
+    if annot is not None:
+        # TODO: change to annot.annot_path when changing dependency to crowsetta>=2.0
+        annot_path = annot.annot_path
+    else:
+        annot_path = None
+
+    record = tuple([
+        _abspath(audio_path),
+        _abspath(spect_path),
+        _abspath(annot_path),
+        annot_format if annot_format else constants.NO_ANNOTATION_FORMAT,
+        spect_dur,
+        timebin_dur,
+        n_timebins,
+    ])
+    return record
+
+
+def _to_record_from_manifest_entry(spect_path, annot, entry, timebin_dur, annot_format):
+    """make a "record", i.e. a row for dataframe, for a spectrogram file
+    in a ``vak.io.spect_manifest.SpectManifest``, without loading the file"""
+    annot_path = annot.annot_path if annot is not None else None
+    return tuple([
+        _abspath(entry['audio_path']),
+        _abspath(spect_path),
+        _abspath(annot_path),
+        annot_format if annot_format else constants.NO_ANNOTATION_FORMAT,
+        entry['n_timebins'] * timebin_dur,
+        timebin_dur,
+        entry['n_timebins'],
+    ])
+
+
 def to_dataframe(spect_format,
                  spect_dir=None,
                  spect_files=None,
@@ -42,6 +110,11 @@ def to_dataframe(spect_format,
                  timebins_key='t',
                  spect_key='s',
                  audio_path_key='audio_path',
+                 backend='dask',
+                 workers=None,
+                 chunksize=1,
+                 max_in_flight=None,
+                 manifest=None,
                  logger=None,
                  ):
     """convert spectrogram files into a dataset of vocalizations represented as a Pandas DataFrame.
@@ -86,6 +159,25 @@ def to_dataframe(spect_format,
     audio_path_key : str
         key for accessing path to source audio file for spectogram in files.
         Default is 'audio_path'.
+    backend : str
+        used to load spectrogram files in parallel to make rows of the dataframe.
+        One of {'dask', 'process'}. Default is 'dask'.
+        If 'process', files are loaded by a pool of worker processes,
+        see ``vak.io.process_pool.imap_ordered``.
+    workers : int
+        number of worker processes, for the 'process' backend.
+        Default is None, in which case the number of CPUs is used.
+    chunksize : int
+        number of files sent to a worker at a time, for the 'process' backend.
+        Default is 1.
+    max_in_flight : int
+        maximum number of files being loaded at a time, for the 'process' backend.
+        Default is None, in which case it is ``2 * workers * chunksize``.
+    manifest : vak.io.spect_manifest.SpectManifest
+        manifest of spectrogram files made from audio files, see ``vak.io.audio.to_spect``.
+        If specified, rows for spectrogram files in the manifest are made from
+        the number and duration of time bins saved in it, without loading those files.
+        Default is None.
 
     Other Parameters
     ----------------
@@ -133,6 +225,8 @@ def to_dataframe(spect_format,
             'received values for annot_list and spect_annot_map, unclear which annotations to use'
         )
 
+    process_pool.validate_backend(backend)
+
     if labelset is not None:
         labelset = labelset_to_set(labelset)
 
@@ -166,72 +260,81 @@ def to_dataframe(spect_format,
                 spect_annot_map.pop(spect_path)
                 continue
 
+    # ---- re-use rows for spectrogram files in manifest ---------------------------------------------------------------
+    manifest_entries = {}
+    if manifest is not None:
+        spect_path_map = manifest.spect_path_map()
+        for spect_path in spect_annot_map.keys():
+            abs_spect_path = str(Path(spect_path).absolute())
+            if abs_spect_path in spect_path_map:
+                manifest_entries[spect_path] = spect_path_map[abs_spect_path]
+
     # ---- validate set of spectrogram files ---------------------------------------------------------------------------
-    # regardless of whether we just made it or user supplied it
-    spect_paths = list(spect_annot_map.keys())
-    files.spect.is_valid_set_of_spect_files(spect_paths,
-                                            spect_format,
-                                            freqbins_key,
-                                            timebins_key,
-                                            spect_key,
-                                            n_decimals_trunc,
-                                            logger=logger)
-
-    # now that we have validated that duration of time bins is consistent across files, we can just open one file
-    # to get that time bin duration. This way validation function has no side effects, like returning time bin, and
-    # this is still relatively fast compared to looping through all files again
-    timebin_dur = files.spect.timebin_dur(spect_paths[0],
-                                          spect_format,
-                                          timebins_key,
-                                          n_decimals_trunc)
+    # regardless of whether we just made it or user supplied it.
+    # Files in the manifest were validated when they were added to a dataset,
+    # so we only validate one of them, along with all the other files
+    spect_paths = [spect_path for spect_path in spect_annot_map.keys() if spect_path not in manifest_entries]
+    if spect_paths:
+        files.spect.is_valid_set_of_spect_files(spect_paths + list(manifest_entries.keys())[:1],
+                                                spect_format,
+                                                freqbins_key,
+                                                timebins_key,
+                                                spect_key,
+                                                n_decimals_trunc,
+                                                logger=logger)
+
+        # now that we have validated that duration of time bins is consistent across files, we can just open one file
+        # to get that time bin duration. This way validation function has no side effects, like returning time bin,
+        # and this is still relatively fast compared to looping through all files again
+        timebin_dur = files.spect.timebin_dur(spect_paths[0],
+                                              spect_format,
+                                              timebins_key,
+                                              n_decimals_trunc)
+        timebin_durs = {timebin_dur}
+    else:
+        timebin_durs = set()
+    timebin_durs.update(entry['timebin_dur'] for entry in manifest_entries.values())
+    if len(timebin_durs) > 1:
+        raise ValueError(
+            'Found more than one duration for time bins across spectrogram files. '
+            f'Durations found were: {sorted(timebin_durs)}'
+        )
+    timebin_dur = timebin_durs.pop()
 
     # ---- actually make the dataframe ---------------------------------------------------------------------------------
-    # this is defined here so all other arguments to 'to_dataframe' are in scope
-    def _to_record(spect_annot_tuple):
-        """helper function that enables parallelized creation of "records",
-        i.e. rows for dataframe, from .
-        Accepts a two-element tuple containing (1) a dictionary that represents a spectrogram
-        and (2) annotation for that file"""
-        spect_path, annot = spect_annot_tuple
-        spect_dict = files.spect.load(spect_path, spect_format)
-
-        spect_dur = spect_dict[spect_key].shape[-1] * timebin_dur
-        if audio_path_key in spect_dict:
-            audio_path = spect_dict[audio_path_key]
-            if type(audio_path) == np.ndarray:
-                # (because everything stored in .npz has to be in an ndarray)
-                audio_path = audio_path.tolist()
-        else:
-            # try to figure out audio filename programmatically
-            # if we can't, then we'll get back a None
-            # (or an error)
-            audio_path = files.spect.find_audio_fname(spect_path)
-
-        if annot is not None:
-            # TODO: change to annot.annot_path when changing dependency to crowsetta>=2.0
-            annot_path = annot.annot_path
-        else:
-            annot_path = None
-
-        def abspath(a_path):
-            if a_path is None:
-                return
-            else:
-                return str(Path(a_path).absolute())
-
-        record = tuple([
-            abspath(audio_path),
-            abspath(spect_path),
-            abspath(annot_path),
-            annot_format if annot_format else constants.NO_ANNOTATION_FORMAT,
-            spect_dur,
-            timebin_dur,
-        ])
-        return record
-
-    spect_path_annot_tuples = db.from_sequence(spect_annot_map.items())
+    to_record = functools.partial(_to_record,
+                                  spect_format=spect_format,
+                                  timebin_dur=timebin_dur,
+                                  spect_key=spect_key,
+                                  audio_path_key=audio_path_key,
+                                  annot_format=annot_format)
     log_or_print('creating pandas.DataFrame representing dataset from spectrogram files', logger=logger, level='info')
-    with ProgressBar():
-        records = list(spect_path_annot_tuples.map(_to_record))
+    spect_path_annot_tuples = [(spect_path, spect_annot_map[spect_path]) for spect_path in spect_paths]
+    if len(spect_path_annot_tuples) == 0:
+        records = []
+    elif backend == 'dask':
+        spect_path_annot_tuples = db.from_sequence(spect_path_annot_tuples)
+        with ProgressBar():
+            records = list(spect_path_annot_tuples.map(to_record))
+    elif backend == 'process':
+        records = list(
+            tqdm(
+                process_pool.imap_ordered(to_record, spect_path_annot_tuples, workers, chunksize, max_in_flight),
+                total=len(spect_path_annot_tuples)
+            )
+        )
+
+    if manifest_entries:
+        # keep rows in the same order as spectrogram files
+        records = dict(zip(spect_paths, records))
+        records = [
+            records[spect_path] if spect_path not in manifest_entries
+            else _to_record_from_manifest_entry(spect_path,
+                                                spect_annot_map[spect_path],
+                                                manifest_entries[spect_path],
+                                                timebin_dur,
+                                                annot_format)
+            for spect_path in spect_annot_map.keys()
+        ]
 
     return pd.DataFrame.from_records(data=records, columns=DF_COLUMNS)
@@ -0,0 +1,137 @@
+"""manifest of spectrogram files made from audio files by ``vak prep``,
+so that running ``vak prep`` again only makes spectrograms for audio files
+that are new or have changed, and re-uses the rest.
+
+Each entry in the manifest is keyed by a hash of the parameters used to make
+spectrograms, and the absolute path to an audio file. It records the size and
+modification time of the audio file when the spectrogram was made, the path
+to the spectrogram file, and the number and duration of its time bins,
+that are used to make the row of the dataset for that file without loading it.
+"""
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import attr
+
+from ..config.spect_params import SpectParamsConfig
+
+MANIFEST_FNAME = 'spect_manifest.json'
+MANIFEST_VERSION = 1
+
+
+def spect_params_hash(spect_params):
+    """get a hash of the parameters used to make spectrograms
+
+    Parameters
+    ----------
+    spect_params : dict, vak.config.spect_params.SpectParamsConfig
+
+    Returns
+    -------
+    params_hash : str
+        hexadecimal SHA-256 digest of the parameters, serialized as JSON with sorted keys.
+    """
+    if isinstance(spect_params, SpectParamsConfig):
+        spect_params = attr.asdict(spect_params)
+    params_json = json.dumps(spect_params, sort_keys=True, default=str)
+    return hashlib.sha256(params_json.encode()).hexdigest()
+
+
+def _audio_key(audio_path):
+    return str(Path(audio_path).absolute())
+
+
+def _audio_stat(audio_path):
+    stat = os.stat(audio_path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+class SpectManifest:
+    """manifest of spectrogram files made from audio files.
+
+    Parameters
+    ----------
+    entries : dict
+        that maps hashes of spectrogram parameters to dicts,
+        that map absolute paths to audio files to entries.
+        Default is None, in which case the manifest is empty.
+
+    Examples
+    --------
+    >>> manifest = SpectManifest.from_file(spect_output_dir / MANIFEST_FNAME)
+    >>> params_hash = spect_params_hash(spect_params)
+    >>> manifest.get(audio_path, params_hash)  # None if audio file is new or changed
+    >>> manifest.add(audio_path, params_hash, spect_path, n_timebins, timebin_dur)
+    >>> manifest.to_file(spect_output_dir / MANIFEST_FNAME)
+    """
+    def __init__(self, entries=None):
+        if entries is None:
+            entries = {}
+        self.entries = entries
+
+    @classmethod
+    def from_file(cls, manifest_path):
+        """load manifest from a .json file.
+        If the file does not exist, returns an empty manifest."""
+        manifest_path = Path(manifest_path)
+        if not manifest_path.exists():
+            return cls()
+        with manifest_path.open('r') as fp:
+            manifest_dict = json.load(fp)
+        if manifest_dict.get('version') != MANIFEST_VERSION:
+            # written by a different version, safest to make all spectrograms again
+            return cls()
+        return cls(entries=manifest_dict['entries'])
+
+    def to_file(self, manifest_path):
+        """save manifest to a .json file.
+        Writes a temporary file first then replaces the manifest,
+        so that an interrupted run does not leave a partial manifest."""
+        manifest_path = Path(manifest_path)
+        tmp_path = manifest_path.with_name(manifest_path.name + '.tmp')
+        with tmp_path.open('w') as fp:
+            json.dump({'version': MANIFEST_VERSION, 'entries': self.entries}, fp)
+        os.replace(tmp_path, manifest_path)
+
+    def get(self, audio_path, params_hash):
+        """get entry for an audio file and spectrogram parameters.
+
+        Returns None if there is no entry, if the size or modification time
+        of the audio file changed, or if the spectrogram file no longer exists.
+
+        Returns
+        -------
+        entry : dict
+            with keys 'size', 'mtime_ns', 'spect_path', 'n_timebins', 'timebin_dur'.
+        """
+        entry = self.entries.get(params_hash, {}).get(_audio_key(audio_path))
+        if entry is None:
+            return None
+        if (entry['size'], entry['mtime_ns']) != _audio_stat(audio_path):
+            return None
+        if not Path(entry['spect_path']).exists():
+            return None
+        return entry
+
+    def add(self, audio_path, params_hash, spect_path, n_timebins, timebin_dur):
+        """add entry for a spectrogram file made from an audio file,
+        replacing any existing entry for that audio file and parameters"""
+        size, mtime_ns = _audio_stat(audio_path)
+        self.entries.setdefault(params_hash, {})[_audio_key(audio_path)] = {
+            'size': size,
+            'mtime_ns': mtime_ns,
+            'spect_path': str(Path(spect_path).absolute()),
+            'n_timebins': int(n_timebins),
+            'timebin_dur': float(timebin_dur),
+        }
+
+    def spect_path_map(self):
+        """get a dict that maps paths to spectrogram files to entries,
+        with the path to the audio file added to each entry as 'audio_path'"""
+        return {
+            entry['spect_path']: dict(entry, audio_path=audio_path)
+            for audio_entries in self.entries.values()
+            for audio_path, entry in audio_entries.items()
+        }
@@ -0,0 +1,136 @@
+"""functions that consolidate the spectrograms in one split of a dataset
+into a single array file, a "store", that can be memory-mapped.
+
+Loading thousands of small .npz files is slow, and .npz files cannot be
+memory-mapped because they are zip archives. Instead, all the spectrograms
+from a split are concatenated along the time axis and saved in one .npy file
+with shape (frequency bins, total time bins). The vectors of labeled timebins
+for the same split are concatenated and saved the same way.
+
+The paths to the stores, and the indices where each spectrogram
+starts and stops in them, are added to the DataFrame that represents the dataset,
+in the columns specified by the constants in this module.
+"""
+from pathlib import Path
+
+import numpy as np
+
+from . import dataframe
+from .labeled_timebins import LBL_TB_PATH_COL
+from .. import files
+from ..logging import log_or_print
+
+
+# constants, used for names of columns in DataFrame
+SPECT_STORE_PATH_COL = 'spect_store_path'
+LBL_TB_STORE_PATH_COL = 'lbl_tb_store_path'
+STORE_START_COL = 'store_start'
+STORE_STOP_COL = 'store_stop'
+# constants, extensions for store files
+SPECT_STORE_EXT = '.spect_store.npy'
+LBL_TB_STORE_EXT = '.lbl_tb_store.npy'
+
+
+def to_store(vak_df,
+             split,
+             output_dir,
+             fname_stem,
+             spect_key='s',
+             logger=None):
+    """concatenate all spectrograms and vectors of labeled timebins
+    from one split of a dataset into two .npy files that can be memory-mapped.
+
+    Parameters
+    ----------
+    vak_df : pandas.DataFrame
+        that represents a dataset of vocalizations, with columns 'split'
+        and 'lbl_tb_path', as created by ``vak.core.prep``.
+    split : str
+        name of split to consolidate, e.g. 'train'.
+    output_dir : str, pathlib.Path
+        directory where store files should be saved.
+    fname_stem : str
+        stem of filenames for store files. The name of the split
+        and an extension are appended to it, e.g. ``{fname_stem}.train.spect_store.npy``.
+    spect_key : str
+        key used to access spectrograms in array files. Default is 's'.
+
+    Other Parameters
+    ----------------
+    logger : logging.Logger
+        instance created by vak.logging.get_logger. Default is None.
+
+    Returns
+    -------
+    vak_df : pandas.DataFrame
+        with columns 'spect_store_path', 'lbl_tb_store_path', 'store_start',
+        and 'store_stop' added. These columns are empty for rows
+        not in ``split``.
+    """
+    output_dir = Path(output_dir)
+    if not output_dir.is_dir():
+        raise NotADirectoryError(
+            f'output_dir not found: {output_dir}'
+        )
+
+    if LBL_TB_PATH_COL not in vak_df.columns:
+        raise ValueError(
+            f"DataFrame does not have '{LBL_TB_PATH_COL}' column; "
+            'vectors of labeled timebins are required to make a store. '
+            'Please prepare dataset with annotations and a labelset.'
+        )
+
+    in_split = (vak_df['split'] == split).values
+    if not in_split.any():
+        raise ValueError(
+            f'split {split} not found in dataset'
+        )
+    split_df = vak_df[in_split]
+
+    # durations are number of time bins * time bin duration, so we get number of time bins back without loading
+    timebin_dur = dataframe.validate_and_get_timebin_dur(split_df)
+    n_timebins = np.round(split_df['duration'].values / timebin_dur).astype(np.int64)
+    store_stops = np.cumsum(n_timebins)
+    store_starts = store_stops - n_timebins
+
+    spect_paths = split_df['spect_path'].values
+    lbl_tb_paths = split_df[LBL_TB_PATH_COL].values
+
+    first_spect = files.spect.load(spect_paths[0])[spect_key]
+    first_lbl_tb = np.load(lbl_tb_paths[0])
+    spect_store_path = output_dir.joinpath(f'{fname_stem}.{split}{SPECT_STORE_EXT}')
+    lbl_tb_store_path = output_dir.joinpath(f'{fname_stem}.{split}{LBL_TB_STORE_EXT}')
+    total_timebins = int(store_stops[-1])
+    spect_store = np.lib.format.open_memmap(spect_store_path, mode='w+', dtype=first_spect.dtype,
+                                            shape=(first_spect.shape[0], total_timebins))
+    lbl_tb_store = np.lib.format.open_memmap(lbl_tb_store_path, mode='w+', dtype=first_lbl_tb.dtype,
+                                             shape=(total_timebins,))
+
+    log_or_print(
+        f"consolidating spectrograms from '{split}' split into: {spect_store_path}",
+        logger=logger, level='info'
+    )
+    for spect_path, lbl_tb_path, start, stop in zip(spect_paths, lbl_tb_paths, store_starts, store_stops):
+        spect = files.spect.load(spect_path)[spect_key]
+        if spect.shape != (spect_store.shape[0], stop - start):
+            raise ValueError(
+                f'shape of spectrogram in {spect_path}, {spect.shape}, does not match the expected shape, '
+                f'{(spect_store.shape[0], stop - start)}. All spectrograms must have the same number of '
+                'frequency bins, and a duration that equals the number of time bins * time bin duration.'
+            )
+        spect_store[:, start:stop] = spect
+        lbl_tb_store[start:stop] = np.load(lbl_tb_path)
+    spect_store.flush()
+    lbl_tb_store.flush()
+    del spect_store, lbl_tb_store
+
+    vak_df = vak_df.copy()
+    vak_df[SPECT_STORE_PATH_COL] = None
+    vak_df[LBL_TB_STORE_PATH_COL] = None
+    vak_df.loc[in_split, SPECT_STORE_PATH_COL] = str(spect_store_path)
+    vak_df.loc[in_split, LBL_TB_STORE_PATH_COL] = str(lbl_tb_store_path)
+    vak_df[STORE_START_COL] = np.nan
+    vak_df[STORE_STOP_COL] = np.nan
+    vak_df.loc[in_split, STORE_START_COL] = store_starts
+    vak_df.loc[in_split, STORE_STOP_COL] = store_stops
+    return vak_df
@@ -2,10 +2,53 @@
 import numpy as np
 import scipy.stats
 
+from . import labels
 from .timebins import timebin_dur_from_vec
 from .validators import row_or_1d, column_or_1d
 
 
+def _nearest_timebin_inds(time_bins, times_s):
+    """find index of time bin nearest to each time.
+
+    Equivalent to ``[np.argmin(np.abs(time_bins - t)) for t in times_s]``,
+    but uses ``np.searchsorted`` when ``time_bins`` is increasing,
+    which is true for any vector of time bins from a spectrogram.
+    As with ``np.argmin``, ties go to the lower index.
+    """
+    times_s = np.asarray(times_s)
+    if time_bins.shape[-1] < 2 or not np.all(time_bins[1:] > time_bins[:-1]):
+        return np.asarray([np.argmin(np.abs(time_bins - t)) for t in times_s], dtype=np.int64)
+
+    right = np.clip(np.searchsorted(time_bins, times_s), 1, time_bins.shape[-1] - 1)
+    left = right - 1
+    return np.where(np.abs(time_bins[left] - times_s) <= np.abs(time_bins[right] - times_s), left, right)
+
+
+def _fill_segments(label_vec, labels_int, onset_inds, offset_inds):
+    """assign label of each segment to time bins from its onset to its offset, inclusive,
+    in place. Where segments overlap, later segments overwrite earlier ones."""
+    labels_int = np.asarray(labels_int)
+    if (labels_int.shape[-1] > 0 and
+            np.all(np.diff(onset_inds) >= 0) and np.all(np.diff(offset_inds) >= 0)):
+        # when onsets and offsets are sorted, the last segment that started at or before a time bin
+        # is the last segment that covers it, if any segment does.
+        # So we find that segment for every time bin with a cumulative sum, instead of looping over segments
+        last_started = np.cumsum(np.bincount(onset_inds, minlength=label_vec.shape[-1])) - 1
+        covered = (last_started >= 0) & (offset_inds[np.maximum(last_started, 0)] >= np.arange(label_vec.shape[-1]))
+        label_vec[covered] = labels_int[last_started[covered]]
+    else:
+        for label, onset, offset in zip(labels_int, onset_inds, offset_inds):
+            # offset_inds[ind]+1 because offset time bin is still "part of" syllable
+            label_vec[onset:offset+1] = label
+    return label_vec
+
+
+def _validate_labels_int(labels_int):
+    if (type(labels_int) == list and not all([type(lbl) == int for lbl in labels_int]) or
+            (type(labels_int) == np.ndarray and labels_int.dtype not in [np.int8, np.int16, np.int32, np.int64])):
+        raise TypeError('labels_int must be a list or numpy.ndarray of integers')
+
+
 def has_unlabeled(labels_int,
                   onsets_s,
                   offsets_s,
@@ -31,24 +74,19 @@ def has_unlabeled(labels_int,
     has_unlabeled : bool
         if True, there are time bins that do not have labels associated with them
     """
-    if (type(labels_int) == list and not all([type(lbl) == int for lbl in labels_int]) or
-            (type(labels_int) == np.ndarray and labels_int.dtype not in [np.int8, np.int16, np.int32, np.int64])):
-        raise TypeError('labels_int must be a list or numpy.ndarray of integers')
+    _validate_labels_int(labels_int)
 
-    dummy_unlabeled_label = np.max(labels_int) + 1
-    label_vec = np.ones((time_bins.shape[-1], 1), dtype='int8') * dummy_unlabeled_label
-    onset_inds = [np.argmin(np.abs(time_bins - onset))
-                  for onset in onsets_s]
-    offset_inds = [np.argmin(np.abs(time_bins - offset))
-                   for offset in offsets_s]
-    for label, onset, offset in zip(labels_int, onset_inds, offset_inds):
-        # offset_inds[ind]+1 because offset time bin is still "part of" syllable
-        label_vec[onset:offset+1] = label
-
-    if dummy_unlabeled_label in label_vec:
-        return True
-    else:
-        return False
+    onset_inds = _nearest_timebin_inds(time_bins, onsets_s)
+    offset_inds = _nearest_timebin_inds(time_bins, offsets_s)
+    # count segments that cover each time bin, by adding 1 at each onset and subtracting 1 after each offset,
+    # then taking the cumulative sum. Segments where onset is after offset don't cover any time bins
+    valid = onset_inds <= offset_inds
+    n_covering = np.zeros((time_bins.shape[-1] + 1,), dtype=np.int64)
+    np.add.at(n_covering, onset_inds[valid], 1)
+    np.add.at(n_covering, offset_inds[valid] + 1, -1)
+    n_covering = np.cumsum(n_covering[:-1])
+
+    return bool(np.any(n_covering == 0))
 
 
 def label_timebins(labels_int,
@@ -79,20 +117,151 @@ def label_timebins(labels_int,
     lbl_tb : numpy.ndarray
         same length as time_bins, with each element a label for each time bin
     """
-    if (type(labels_int) == list and not all([type(lbl) == int for lbl in labels_int]) or
-            (type(labels_int) == np.ndarray and labels_int.dtype not in [np.int8, np.int16, np.int32, np.int64])):
-        raise TypeError('labels_int must be a list or numpy.ndarray of integers')
+    _validate_labels_int(labels_int)
 
     label_vec = np.ones((time_bins.shape[-1],), dtype='int8') * unlabeled_label
-    onset_inds = [np.argmin(np.abs(time_bins - onset))
-                  for onset in onsets_s]
-    offset_inds = [np.argmin(np.abs(time_bins - offset))
-                   for offset in offsets_s]
-    for label, onset, offset in zip(labels_int, onset_inds, offset_inds):
-        # offset_inds[ind]+1 because offset time bin is still "part of" syllable
-        label_vec[onset:offset+1] = label
+    onset_inds = _nearest_timebin_inds(time_bins, onsets_s)
+    offset_inds = _nearest_timebin_inds(time_bins, offsets_s)
+    return _fill_segments(label_vec, labels_int, onset_inds, offset_inds)
 
-    return label_vec
+
+def label_timebins_batch(labels_int_list,
+                         onsets_s_list,
+                         offsets_s_list,
+                         time_bins_list,
+                         unlabeled_label=0):
+    """makes vectors of labels for each time bin from many spectrograms in one call,
+    given labels, onsets, and offsets of vocalizations in each spectrogram.
+
+    Gives the same result as calling ``label_timebins`` on each spectrogram,
+    but labels time bins from all spectrograms at once.
+
+    Parameters
+    ----------
+    labels_int_list : list
+        of lists or numpy.ndarray, labels from the annotation for each spectrogram,
+        mapped to integers
+    onsets_s_list : list
+        of numpy.ndarray, segment onsets in seconds for each spectrogram
+    offsets_s_list : list
+        of numpy.ndarray, segment offsets in seconds for each spectrogram
+    time_bins_list : list
+        of numpy.ndarray, time in seconds for center of each time bin of each spectrogram
+    unlabeled_label : int
+        label assigned to time bins that do not have labels associated with them.
+        Default is 0
+
+    Returns
+    -------
+    lbl_tb_list : list
+        of numpy.ndarray, one for each spectrogram, the same length as
+        the corresponding vector in time_bins_list
+    """
+    lens = [len(a_list) for a_list in (labels_int_list, onsets_s_list, offsets_s_list, time_bins_list)]
+    if len(set(lens)) != 1:
+        raise ValueError(
+            'labels_int_list, onsets_s_list, offsets_s_list, and time_bins_list should all '
+            f'have the same length, but lengths were: {lens}'
+        )
+    if lens[0] == 0:
+        return []
+
+    for labels_int in labels_int_list:
+        _validate_labels_int(labels_int)
+
+    n_timebins = np.asarray([time_bins.shape[-1] for time_bins in time_bins_list], dtype=np.int64)
+    file_starts = np.concatenate(([0], np.cumsum(n_timebins)[:-1]))
+    # convert indices of time bins within each file to indices into one long vector for all files
+    onset_inds = np.concatenate(
+        [_nearest_timebin_inds(time_bins, onsets_s) + file_start
+         for time_bins, onsets_s, file_start in zip(time_bins_list, onsets_s_list, file_starts)]
+    ).astype(np.int64)
+    offset_inds = np.concatenate(
+        [_nearest_timebin_inds(time_bins, offsets_s) + file_start
+         for time_bins, offsets_s, file_start in zip(time_bins_list, offsets_s_list, file_starts)]
+    ).astype(np.int64)
+    labels_int = np.concatenate([np.asarray(labels_int, dtype=np.int64) for labels_int in labels_int_list])
+
+    label_vec = np.ones((n_timebins.sum(),), dtype='int8') * unlabeled_label
+    label_vec = _fill_segments(label_vec, labels_int, onset_inds, offset_inds)
+    return np.split(label_vec, np.cumsum(n_timebins)[:-1])
+
+
+def lookup_table(labelmap, unlabeled_label=0, lbl_tb_labelmap=None):
+    """make a lookup table that maps vectors of labeled timebins
+    saved by ``vak prep`` to the integers in ``labelmap``.
+
+    Vectors saved by ``vak.io.labeled_timebins.to_files`` are encoded with
+    ``vak.labels.to_map(labelset, map_unlabeled=True)``, where ``labelset``
+    is the labelset used to prepare the dataset. That labelmap is saved in the
+    dataset .csv, and should be passed as ``lbl_tb_labelmap``, because the labelset
+    used to prepare a dataset can be different from the one used to train a model.
+    To convert a saved vector ``lbl_tb``, index into the table: ``table[lbl_tb]``.
+
+    Parameters
+    ----------
+    labelmap : dict
+        that maps labels from dataset to a series of consecutive integers.
+    unlabeled_label : int
+        label assigned to time bins that do not have labels associated with them,
+        if 'unlabeled' is not a key in ``labelmap``. Default is 0.
+    lbl_tb_labelmap : dict
+        labelmap used to encode the saved vectors,
+        returned by ``vak.io.labeled_timebins.labelmap_from_df``.
+        Default is None, in which case it is assumed that the labelset
+        used to prepare the dataset is the set of labels in ``labelmap``,
+        i.e. all the keys except 'unlabeled', as for datasets prepared
+        before the labelmap was saved.
+
+    Returns
+    -------
+    table : numpy.ndarray
+        where the value at index i is the integer in ``labelmap``
+        for the label that the saved vectors represent with i.
+    """
+    if lbl_tb_labelmap is None:
+        labelset = set(labelmap.keys()) - {'unlabeled'}
+        lbl_tb_labelmap = labels.to_map(labelset, map_unlabeled=True)
+    missing_labels = set(lbl_tb_labelmap.keys()) - set(labelmap.keys()) - {'unlabeled'}
+    if missing_labels:
+        raise ValueError(
+            f'vectors of labeled timebins have labels that are not in labelmap: {missing_labels}. '
+            'Was the dataset prepared with a labelset that is not a subset of the labelset used for the model?'
+        )
+    table = np.zeros((max(lbl_tb_labelmap.values()) + 1,), dtype='int8')
+    for lbl, lbl_tb_int in lbl_tb_labelmap.items():
+        if lbl == 'unlabeled':
+            table[lbl_tb_int] = labelmap.get('unlabeled', unlabeled_label)
+        else:
+            table[lbl_tb_int] = labelmap[lbl]
+    return table
+
+
+def from_file(lbl_tb_path, table):
+    """load a vector of labeled timebins saved by ``vak prep``,
+    and map it to the integers in a labelmap.
+
+    Parameters
+    ----------
+    lbl_tb_path : str, pathlib.Path
+        path to .npy file containing vector of labeled timebins,
+        saved by ``vak.io.labeled_timebins.to_files``.
+    table : numpy.ndarray
+        lookup table returned by ``vak.labeled_timebins.lookup_table``.
+
+    Returns
+    -------
+    lbl_tb : numpy.ndarray
+        vector of labeled timebins, with labels from labelmap used to make ``table``.
+    """
+    lbl_tb = np.load(lbl_tb_path)
+    if lbl_tb.size > 0 and lbl_tb.max() >= table.shape[-1]:
+        raise ValueError(
+            f'vector of labeled timebins in {lbl_tb_path} has value {lbl_tb.max()}, '
+            f'but the labelmap only has {table.shape[-1]} classes. '
+            'Was the dataset prepared with a different labelset?'
+        )
+    return table[lbl_tb]
 
 
 def lbl_tb2labels(labeled_timebins,
@@ -5,10 +5,11 @@ https://scipy-cookbook.readthedocs.io/items/ButterworthBandpass.html
 spectrogram adapted from code by Kyle Kastner and Tim Sainburg
 https://github.com/timsainb/python_spectrograms_and_inversion
 """
-import numpy as np
+import functools
 
-from scipy.signal import butter, lfilter
-from matplotlib.mlab import specgram
+import numpy as np
+import scipy.fft
+from scipy.signal import butter, sosfilt, sosfiltfilt
 
 
 def butter_bandpass(lowcut, highcut, fs, order=5):
@@ -19,12 +20,237 @@ def butter_bandpass(lowcut, highcut, fs, order=5):
     return b, a
 
 
-def butter_bandpass_filter(data, lowcut, highcut, fs, order=5):
-    b, a = butter_bandpass(lowcut, highcut, fs, order=order)
-    y = lfilter(b, a, data)
+@functools.lru_cache(maxsize=32)
+def butter_bandpass_sos(lowcut, highcut, fs, order=5):
+    """design Butterworth bandpass filter as second-order sections.
+
+    Results are cached, so the filter is only designed once
+    for all files with the same sampling frequency.
+    The returned array is shared by all callers, and should not be modified."""
+    nyq = 0.5 * fs
+    low = lowcut / nyq
+    high = highcut / nyq
+    return butter(order, [low, high], btype='band', output='sos')
+
+
+def butter_bandpass_filter(data, lowcut, highcut, fs, order=5, zero_phase=False):
+    """filter data with a Butterworth bandpass filter
+
+    Uses second-order sections, that are numerically stable at higher orders,
+    unlike the transfer function (b, a) returned by ``butter_bandpass``.
+
+    Parameters
+    ----------
+    data : numpy.ndarray
+        audio signal
+    lowcut : float
+        lower cutoff frequency, in Hz
+    highcut : float
+        higher cutoff frequency, in Hz
+    fs : int
+        sampling frequency, in Hz
+    order : int
+        order of filter. Default is 5.
+    zero_phase : bool
+        if True, filter forward and backward with ``scipy.signal.sosfiltfilt``,
+        so the filtered signal is not shifted in time. Default is False,
+        in which case ``scipy.signal.sosfilt`` filters forward only,
+        giving the same result as ``scipy.signal.lfilter``.
+
+    Returns
+    -------
+    y : numpy.ndarray
+        filtered signal
+    """
+    sos = butter_bandpass_sos(lowcut, highcut, fs, order=order)
+    if zero_phase:
+        y = sosfiltfilt(sos, data)
+    else:
+        y = sosfilt(sos, data)
     return y
 
 
+class SpectrogramMaker:
+    """makes spectrograms from audio signals with the same sampling frequency.
+
+    Computes the same spectrogram as ``matplotlib.mlab.specgram``
+    with its default arguments, i.e., the power spectral density of
+    segments of the signal multiplied by a Hann window,
+    followed by the transforms applied by ``vak.spect.spectrogram``.
+
+    The window, the scaling of the power spectral density,
+    and the frequency bins kept for ``freq_cutoffs`` are computed once,
+    when the instance is created. Segments from one or many signals
+    are processed in blocks of at most ``max_frames`` segments,
+    with one call to ``scipy.fft.rfft`` per block,
+    and buffers for the segments and their power are re-used for every block.
+    Transforms are applied in place on the returned spectrogram.
+
+    Parameters
+    ----------
+    samp_freq : int
+        sampling frequency in Hz, of all signals.
+    fft_size : int
+        size of window for Fast Fourier transform, number of time bins.
+        Default is 512.
+    step_size : int
+        step size for Fast Fourier transform. Default is 64.
+    thresh : float
+        threshold minimum power for log spectrogram. Default is None.
+    transform_type : str
+        one of {'log_spect', 'log_spect_plus_one'}. Default is None.
+        See ``vak.spect.spectrogram``.
+    freq_cutoffs : tuple
+        of two elements, lower and higher frequencies. Default is None.
+    max_frames : int
+        maximum number of segments in a block. Default is 4096.
+
+    Examples
+    --------
+    >>> maker = SpectrogramMaker(samp_freq=32000, fft_size=512, step_size=64)
+    >>> spect, freqbins, timebins = maker(dat)
+    >>> spects_freqbins_timebins = maker.batch([dat1, dat2, dat3])
+    """
+    def __init__(self, samp_freq, fft_size=512, step_size=64, thresh=None, transform_type=None,
+                 freq_cutoffs=None, max_frames=4096):
+        self.samp_freq = samp_freq
+        self.fft_size = fft_size
+        self.step_size = step_size
+        self.thresh = thresh
+        self.transform_type = transform_type
+        self.freq_cutoffs = freq_cutoffs
+        self.max_frames = max_frames
+
+        self.window = np.hanning(fft_size)
+        n_freqs = fft_size // 2 + 1
+        # power spectral density is scaled by sampling frequency and power of window,
+        # and doubled for all frequencies except 0 and (for even fft_size) the Nyquist frequency,
+        # to account for the negative frequencies not included in a one-sided spectrum
+        self.scale = np.full(n_freqs, 2.0 / (samp_freq * (self.window ** 2).sum()))
+        self.scale[0] /= 2
+        if fft_size % 2 == 0:
+            self.scale[-1] /= 2
+
+        self.freqbins = np.abs(np.fft.fftfreq(fft_size, 1 / samp_freq)[:n_freqs])
+        if freq_cutoffs:
+            f_inds = np.nonzero((self.freqbins >= freq_cutoffs[0]) &
+                                (self.freqbins < freq_cutoffs[1]))[0]
+            self.freq_slice = slice(f_inds[0], f_inds[-1] + 1) if len(f_inds) else slice(0, 0)
+        else:
+            self.freq_slice = slice(None)
+
+    def _n_frames(self, n_samples):
+        return (max(n_samples, self.fft_size) - self.fft_size) // self.step_size + 1
+
+    def _timebins(self, n_samples):
+        n_samples = max(n_samples, self.fft_size)
+        return np.arange(self.fft_size / 2,
+                         n_samples - self.fft_size / 2 + 1,
+                         self.step_size) / self.samp_freq
+
+    def _frames(self, dat):
+        """segments of a signal, as a view into it"""
+        if dat.shape[-1] < self.fft_size:
+            dat = np.concatenate([dat, np.zeros(self.fft_size - dat.shape[-1], dtype=dat.dtype)])
+        dat = np.ascontiguousarray(dat)
+        n_frames = self._n_frames(dat.shape[-1])
+        # a view with one segment per row. Uses ``as_strided`` instead of
+        # ``sliding_window_view``, that requires numpy>=1.20
+        return np.lib.stride_tricks.as_strided(dat,
+                                               shape=(n_frames, self.fft_size),
+                                               strides=(dat.strides[0] * self.step_size, dat.strides[0]),
+                                               writeable=False)
+
+    def _transform(self, spect, spect_max):
+        """apply transform and threshold to spectrogram, in place"""
+        thresh = self.thresh
+        if self.transform_type == 'log_spect':
+            spect /= spect_max  # volume normalize to max 1
+            np.log10(spect, out=spect)
+            if thresh:
+                # I know this is weird, maintaining 'legacy' behavior
+                spect[spect < -thresh] = -thresh
+        elif self.transform_type == 'log_spect_plus_one':
+            spect += 1
+            np.log10(spect, out=spect)
+            if thresh:
+                spect[spect < thresh] = thresh
+        else:
+            if thresh:
+                spect[spect < thresh] = thresh
+
+    def batch(self, dats):
+        """make spectrograms from a list of signals
+
+        Parameters
+        ----------
+        dats : list
+            of numpy.ndarray, audio signals, that can have different lengths.
+
+        Returns
+        -------
+        spects_freqbins_timebins : list
+            of tuples (spect, freqbins, timebins), one for each signal,
+            as returned by ``vak.spect.spectrogram``.
+        """
+        if self.freq_cutoffs:
+            dats = [butter_bandpass_filter(dat, self.freq_cutoffs[0], self.freq_cutoffs[1], self.samp_freq)
+                    for dat in dats]
+        n_frames = [self._n_frames(dat.shape[-1]) for dat in dats]
+        freqbins = self.freqbins[self.freq_slice]
+        spects = [np.empty((len(freqbins), n), dtype=np.float64) for n in n_frames]
+        spect_maxes = np.full(len(dats), -np.inf)
+
+        block_size = min(self.max_frames, sum(n_frames))
+        frames_buf = np.empty((block_size, self.fft_size), dtype=np.float64)
+        power_buf = np.empty((block_size, len(self.scale)), dtype=np.float64)
+
+        def _process_block(pieces, n_block):
+            """compute power spectral density of segments in block,
+            and copy into spectrograms. ``pieces`` are (dat index, first frame, last frame, offset into block)"""
+            fft = scipy.fft.rfft(frames_buf[:n_block], axis=1, overwrite_x=True)
+            power = power_buf[:n_block]
+            np.multiply(fft.real, fft.real, out=power)
+            power += fft.imag ** 2
+            power *= self.scale
+            for dat_ind, start, stop, offset in pieces:
+                piece_power = power[offset:offset + stop - start]
+                spect_maxes[dat_ind] = max(spect_maxes[dat_ind], piece_power.max())
+                spects[dat_ind][:, start:stop] = piece_power[:, self.freq_slice].T
+
+        pieces, n_block = [], 0
+        for dat_ind, dat in enumerate(dats):
+            frames = self._frames(dat)
+            start = 0
+            while start < n_frames[dat_ind]:
+                stop = min(n_frames[dat_ind], start + block_size - n_block)
+                np.multiply(frames[start:stop], self.window, out=frames_buf[n_block:n_block + stop - start])
+                pieces.append((dat_ind, start, stop, n_block))
+                n_block += stop - start
+                start = stop
+                if n_block == block_size:
+                    _process_block(pieces, n_block)
+                    pieces, n_block = [], 0
+        if n_block > 0:
+            _process_block(pieces, n_block)
+
+        out = []
+        for dat, spect, spect_max in zip(dats, spects, spect_maxes):
+            self._transform(spect, spect_max)
+            out.append((spect, freqbins.copy(), self._timebins(dat.shape[-1])))
+        return out
+
+    def __call__(self, dat):
+        """make spectrogram from one signal.
+        Returns spect, freqbins, timebins; see ``vak.spect.spectrogram``."""
+        return self.batch([dat])[0]
+
+
+@functools.lru_cache(maxsize=8)
+def _spectrogram_maker(samp_freq, fft_size, step_size, thresh, transform_type, freq_cutoffs):
+    return SpectrogramMaker(samp_freq, fft_size, step_size, thresh, transform_type, freq_cutoffs)
+
+
 def spectrogram(dat, samp_freq, fft_size=512, step_size=64, thresh=None, transform_type=None,
                 freq_cutoffs=None):
     """creates a spectrogram
@@ -58,36 +284,27 @@ def spectrogram(dat, samp_freq, fft_size=512, step_size=64, thresh=None, transfo
     timebins : numpy.ndarray
         vector of centers of time bins from spectrogram
     """
-    noverlap = fft_size - step_size
+    if freq_cutoffs is not None:
+        freq_cutoffs = tuple(freq_cutoffs)  # so it can be hashed
+    # makers are cached so window and frequency bins are computed once for many files
+    maker = _spectrogram_maker(samp_freq, fft_size, step_size, thresh, transform_type, freq_cutoffs)
+    return maker(dat)
 
-    if freq_cutoffs:
-        dat = butter_bandpass_filter(dat,
-                                     freq_cutoffs[0],
-                                     freq_cutoffs[1],
-                                     samp_freq)
 
-    # below only take [:3] from return of specgram because we don't need the image
-    spect, freqbins, timebins = specgram(dat, fft_size, samp_freq, noverlap=noverlap)[:3]
+def spectrogram_batch(dats, samp_freq, fft_size=512, step_size=64, thresh=None, transform_type=None,
+                      freq_cutoffs=None):
+    """creates spectrograms for a batch of audio signals
+    with the same sampling frequency, using ``vak.spect.SpectrogramMaker.batch``.
 
-    if transform_type:
-        if transform_type == 'log_spect':
-            spect /= spect.max()  # volume normalize to max 1
-            spect = np.log10(spect)  # take log
-            if thresh:
-                # I know this is weird, maintaining 'legacy' behavior
-                spect[spect < -thresh] = -thresh
-        elif transform_type == 'log_spect_plus_one':
-            spect = np.log10(spect + 1)
-            if thresh:
-                spect[spect < thresh] = thresh
-    else:
-        if thresh:
-            spect[spect < thresh] = thresh  # set anything less than the threshold as the threshold
-
-    if freq_cutoffs:
-        f_inds = np.nonzero((freqbins >= freq_cutoffs[0]) &
-                            (freqbins < freq_cutoffs[1]))[0]  # returns tuple
-        spect = spect[f_inds, :]
-        freqbins = freqbins[f_inds]
+    Parameters are the same as for ``vak.spect.spectrogram``,
+    except that ``dats`` is a list of audio signals.
 
-    return spect, freqbins, timebins
+    Returns
+    -------
+    spects_freqbins_timebins : list
+        of tuples (spect, freqbins, timebins), one for each signal in ``dats``.
+    """
+    if freq_cutoffs is not None:
+        freq_cutoffs = tuple(freq_cutoffs)
+    maker = _spectrogram_maker(samp_freq, fft_size, step_size, thresh, transform_type, freq_cutoffs)
+    return maker.batch(dats)
@@ -0,0 +1,42 @@
+import crowsetta
+import numpy as np
+import pytest
+
+import vak.annotation
+import vak.labels
+
+
+def make_annot(labels, onsets_s, offsets_s, audio_path):
+    seq = crowsetta.Sequence.from_keyword(labels=np.array(labels),
+                                          onsets_s=np.array(onsets_s),
+                                          offsets_s=np.array(offsets_s))
+    return crowsetta.Annotation(seq=seq, annot_path='annot.csv', audio_path=audio_path)
+
+
+@pytest.fixture
+def annots():
+    return [
+        make_annot(['a', 'b', 'c'], [0.1, 0.5, 1.0], [0.3, 0.8, 1.2], 'bird0.wav'),
+        make_annot(['c'], [0.2], [0.4], 'bird1.wav'),
+        make_annot(['b', 'a'], [0.0, 0.6], [0.5, 0.9], 'bird2.wav'),
+    ]
+
+
+def test_to_table(annots):
+    labelmap = vak.labels.to_map(set('abc'), map_unlabeled=True)
+
+    annot_table = vak.annotation.to_table(annots, labelmap)
+
+    assert len(annot_table) == len(annots)
+    assert annot_table.labels_int.shape[-1] == sum(len(annot.seq.labels) for annot in annots)
+    for ind, annot in enumerate(annots):
+        labels_int, onsets_s, offsets_s = annot_table.segments(ind)
+        assert np.array_equal(labels_int, [labelmap[lbl] for lbl in annot.seq.labels])
+        assert np.array_equal(onsets_s, annot.seq.onsets_s)
+        assert np.array_equal(offsets_s, annot.seq.offsets_s)
+
+
+def test_to_table_raises(annots):
+    labelmap = vak.labels.to_map(set('ab'), map_unlabeled=True)
+    with pytest.raises(ValueError):
+        vak.annotation.to_table(annots, labelmap)
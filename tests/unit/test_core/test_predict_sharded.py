@@ -0,0 +1,70 @@
+"""tests for making predictions with more than one process, i.e. ``vak.core.predict`` with ``jobs`` > 1"""
+import numpy as np
+import pandas as pd
+import pytest
+import torch
+
+from vak.core.predict import _shard_inds, predict
+import vak.engine.export
+from vak.engine.model import Model
+
+
+@pytest.mark.parametrize(
+    'durations, jobs',
+    [
+        ([1.] * 10, 3),
+        ([1., 1., 1., 10., 1., 1.], 3),
+        (np.random.default_rng(0).uniform(1., 30., 101), 8),
+        ([5., 1.], 4),
+        ([2.], 3),
+    ]
+)
+def test_shard_inds(durations, jobs):
+    durations = np.asarray(durations)
+    shard_inds = _shard_inds(durations, jobs)
+
+    # every file is in exactly one shard, and shards are contiguous and in order
+    assert np.array_equal(np.concatenate(shard_inds), np.arange(len(durations)))
+    # no more shards than jobs or files, and no empty shards
+    assert len(shard_inds) <= min(jobs, len(durations))
+    assert all(len(inds) > 0 for inds in shard_inds)
+    # total duration of each shard differs from the mean by at most the duration of one file
+    mean_dur = durations.sum() / len(shard_inds)
+    for inds in shard_inds:
+        assert abs(durations[inds].sum() - mean_dur) <= durations.max()
+
+
+def test_predict_jobs(tmp_path):
+    rng = np.random.default_rng(0)
+    rows = []
+    for file_num, n_timebins in enumerate(rng.integers(50, 300, 7)):
+        spect_path = tmp_path / f'{file_num}.wav.spect.npz'
+        np.savez(spect_path, s=rng.random((16, n_timebins)).astype(np.float32), t=np.arange(n_timebins) * 0.002)
+        rows.append(dict(spect_path=str(spect_path), audio_path=str(tmp_path / f'{file_num}.wav'),
+                         annot_path=None, annot_format='none', split='predict',
+                         duration=n_timebins * 0.002, timebin_dur=0.002))
+    csv_path = tmp_path / 'dataset.csv'
+    pd.DataFrame(rows).to_csv(csv_path, index=False)
+
+    torch.manual_seed(0)
+    network = torch.nn.Sequential(
+        torch.nn.Conv2d(1, 3, kernel_size=(16, 3), padding=(0, 1)),
+        torch.nn.Flatten(start_dim=1, end_dim=2),
+    )
+    model = Model(network, loss=None, optimizer=None, metrics={})
+    export_path = tmp_path.joinpath(f'Net{vak.engine.export.EXPORT_EXT}')
+    vak.engine.export.export(model, export_path, (1, 16, 20), {'unlabeled': 0, 'a': 1, 'b': 2},
+                             window_size=20, model_name='Net')
+
+    for jobs in (1, 3):
+        predict(csv_path, checkpoint_path=None, labelmap_path=None, model_config_map=None,
+                window_size=20, num_workers=0, device='cpu', output_dir=tmp_path,
+                annot_csv_filename=f'jobs{jobs}.annot.csv', jobs=jobs,
+                exported_model_path=export_path)
+
+    annots_one_job = pd.read_csv(tmp_path / 'jobs1.annot.csv').drop(columns='annot_path')
+    annots_jobs = pd.read_csv(tmp_path / 'jobs3.annot.csv').drop(columns='annot_path')
+    assert len(annots_one_job) > 0
+    pd.testing.assert_frame_equal(annots_jobs, annots_one_job)
+    # .csv files for each shard are removed after merging
+    assert sorted(path.name for path in tmp_path.glob('*.csv')) == ['dataset.csv', 'jobs1.annot.csv', 'jobs3.annot.csv']
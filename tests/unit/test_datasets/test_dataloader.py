@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+import torch
+
+import vak.datasets.dataloader
+
+
+class RandomDataset(torch.utils.data.Dataset):
+    """returns a number drawn with numpy's global random state, and the number of torch threads"""
+    def __len__(self):
+        return 4
+
+    def __getitem__(self, idx):
+        return np.random.randint(2 ** 31), torch.get_num_threads()
+
+
+@pytest.mark.parametrize(
+    'num_workers, persistent_workers, prefetch_factor',
+    [
+        (0, True, 4),
+        (2, False, None),
+        (2, True, 4),
+    ]
+)
+def test_get_dataloader(num_workers, persistent_workers, prefetch_factor):
+    dataloader = vak.datasets.dataloader.get_dataloader(RandomDataset(),
+                                                        batch_size=1,
+                                                        num_workers=num_workers,
+                                                        persistent_workers=persistent_workers,
+                                                        prefetch_factor=prefetch_factor)
+    assert isinstance(dataloader, torch.utils.data.DataLoader)
+    if num_workers > 0:
+        assert dataloader.persistent_workers is persistent_workers
+        draws_per_run = []
+        for _ in range(2):
+            torch.manual_seed(0)
+            # new DataLoader each time, so persistent workers are started again
+            dataloader = vak.datasets.dataloader.get_dataloader(RandomDataset(),
+                                                                batch_size=1,
+                                                                num_workers=num_workers,
+                                                                persistent_workers=persistent_workers,
+                                                                prefetch_factor=prefetch_factor)
+            draws, num_threads = zip(*[(draw.item(), threads.item()) for draw, threads in dataloader])
+            draws_per_run.append(draws)
+            assert set(num_threads) == {1}
+        # workers are seeded from the torch seed, so draws are reproducible
+        assert draws_per_run[0] == draws_per_run[1]
+
+
+def test_worker_init():
+    num_threads = torch.get_num_threads()
+    try:
+        draws = []
+        for torch_seed in (0, 0, 1):
+            # workers started by forking all have copies of the same numpy random state
+            np.random.seed(42)
+            # torch seeds each worker differently, as with manual_seed here
+            torch.manual_seed(torch_seed)
+            vak.datasets.dataloader.WorkerInit(num_threads=1)(worker_id=0)
+            draws.append(np.random.randint(2 ** 31))
+            assert torch.get_num_threads() == 1
+        assert draws[0] == draws[1]
+        assert draws[0] != draws[2]
+    finally:
+        torch.set_num_threads(num_threads)
@@ -0,0 +1,73 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+import torch
+
+import vak.datasets.sampler
+import vak.datasets.window_index
+
+
+def make_data_source(n_windows_per_file):
+    window_index = vak.datasets.window_index.WindowIndex(np.arange(len(n_windows_per_file)),
+                                                         np.zeros(len(n_windows_per_file)),
+                                                         n_windows_per_file)
+    return SimpleNamespace(window_index=window_index)
+
+
+@pytest.mark.parametrize(
+    'n_windows_per_file, chunk_size',
+    [
+        ([10, 10, 10], 4),
+        ([1, 25, 7, 13], 5),
+        ([100], 8),
+        ([3, 3, 3, 3], 1),
+    ]
+)
+def test_file_chunk_sampler(n_windows_per_file, chunk_size):
+    data_source = make_data_source(n_windows_per_file)
+    sampler = vak.datasets.sampler.FileChunkSampler(data_source, chunk_size=chunk_size,
+                                                    generator=torch.Generator().manual_seed(42))
+    inds = list(sampler)
+
+    assert len(sampler) == len(inds) == len(data_source.window_index)
+    assert sorted(inds) == list(range(len(inds)))
+
+    # windows come in runs from the same file, and counting chunks in each run
+    # gives the total number of chunks, so no chunk was split up
+    spect_ids = data_source.window_index.window_spect_ids()[np.asarray(inds)]
+    n_chunks = 0
+    run_start = 0
+    for ind in range(1, len(inds) + 1):
+        if ind == len(inds) or spect_ids[ind] != spect_ids[run_start]:
+            n_chunks += -(-(ind - run_start) // chunk_size)
+            run_start = ind
+    assert n_chunks == sum(-(-n // chunk_size) for n in n_windows_per_file)
+
+
+def test_file_chunk_sampler_no_shuffle():
+    data_source = make_data_source([10, 5, 7])
+    sampler = vak.datasets.sampler.FileChunkSampler(data_source, chunk_size=4, shuffle=False)
+    assert list(sampler) == list(range(22))
+
+
+def test_file_chunk_sampler_epochs_differ():
+    data_source = make_data_source([50, 50, 50])
+    sampler = vak.datasets.sampler.FileChunkSampler(data_source, chunk_size=4,
+                                                    generator=torch.Generator().manual_seed(0))
+    assert list(sampler) != list(sampler)
+
+
+@pytest.mark.parametrize(
+    'chunk_size, expected_exception',
+    [
+        (0, ValueError),
+        (-1, ValueError),
+        (4.0, TypeError),
+        (True, TypeError),
+    ]
+)
+def test_file_chunk_sampler_raises(chunk_size, expected_exception):
+    data_source = make_data_source([10])
+    with pytest.raises(expected_exception):
+        vak.datasets.sampler.FileChunkSampler(data_source, chunk_size=chunk_size)
@@ -0,0 +1,47 @@
+import pickle
+
+import numpy as np
+
+import vak.datasets.shared_memory
+import vak.datasets.window_index
+
+
+class HasArrays(vak.datasets.shared_memory.SharedArraysMixin):
+    _shared_array_attrs = ('ints', 'floats', 'paths', 'missing')
+
+    def __init__(self):
+        self.ints = np.arange(10)
+        self.floats = np.random.rand(3, 4)
+        self.paths = np.array(['a.wav.spect.npz', 'bb.wav.spect.npz'], dtype=object)
+        self.missing = None
+
+
+def test_share_memory():
+    has_arrays = HasArrays()
+    expected = {name: getattr(has_arrays, name).copy() for name in ('ints', 'floats', 'paths')}
+    assert not has_arrays.is_shared()
+
+    has_arrays.share_memory()
+    assert has_arrays.is_shared()
+    assert has_arrays.missing is None
+    for name, expected_arr in expected.items():
+        assert np.array_equal(getattr(has_arrays, name), expected_arr)
+    assert has_arrays.paths.dtype.kind == 'U'
+
+    unpickled = pickle.loads(pickle.dumps(has_arrays))
+    assert unpickled.is_shared()
+    for name, expected_arr in expected.items():
+        assert np.array_equal(getattr(unpickled, name), expected_arr)
+
+
+def test_window_index_share_memory():
+    window_index = vak.datasets.window_index.WindowIndex.from_n_time_bins([100, 200, 50], 10)
+    inds = np.arange(len(window_index))
+    expected = window_index.lookup(inds)
+
+    window_index.share_memory()
+    unpickled = pickle.loads(pickle.dumps(window_index))
+    for a_window_index in (window_index, unpickled):
+        spect_ids, window_start_inds = a_window_index.lookup(inds)
+        assert np.array_equal(spect_ids, expected[0])
+        assert np.array_equal(window_start_inds, expected[1])
@@ -0,0 +1,56 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from vak.datasets.spect_cache import SpectCache
+
+
+def _load_func(key):
+    # 100 bytes per value
+    return np.zeros(10, dtype=np.float64), np.zeros(20, dtype=np.int8)
+
+
+def test_spect_cache_hits_misses():
+    cache = SpectCache(max_bytes=1000)
+    for key in [0, 0, 1, 0, 1]:
+        cache.get(key, _load_func)
+    info = cache.info()
+    assert info.hits == 3
+    assert info.misses == 2
+    assert info.curr_size == 2
+    assert info.curr_bytes == 200
+
+
+def test_spect_cache_evicts_least_recently_used():
+    cache = SpectCache(max_bytes=250)
+    cache.get(0, _load_func)
+    cache.get(1, _load_func)
+    cache.get(0, _load_func)  # now 1 is least recently used
+    cache.get(2, _load_func)
+    assert 0 in cache
+    assert 1 not in cache
+    assert 2 in cache
+    assert cache.info().curr_bytes <= 250
+
+
+def test_spect_cache_value_larger_than_max_bytes_not_cached():
+    cache = SpectCache(max_bytes=50)
+    value = cache.get(0, _load_func)
+    assert len(value) == 2
+    assert len(cache) == 0
+
+
+def test_spect_cache_pickle_is_empty():
+    cache = SpectCache(max_bytes=1000)
+    cache.get(0, _load_func)
+    unpickled = pickle.loads(pickle.dumps(cache))
+    assert unpickled.max_bytes == 1000
+    assert len(unpickled) == 0
+    assert unpickled.info().misses == 0
+
+
+@pytest.mark.parametrize('max_bytes', [0, -1, 1.5, '100', None])
+def test_spect_cache_invalid_max_bytes_raises(max_bytes):
+    with pytest.raises(ValueError):
+        SpectCache(max_bytes)
@@ -0,0 +1,264 @@
+import random
+
+import numpy as np
+import pytest
+import torch
+
+import vak.datasets.dataloader
+import vak.datasets.sampler
+from vak.datasets.window_dataset import WindowDataset
+from vak.datasets.window_index import WindowIndex
+
+WINDOW_SIZE = 8
+
+
+@pytest.fixture
+def window_dataset(tmp_path):
+    rng = np.random.default_rng(0)
+    labelmap = {'unlabeled': 0, 'a': 1, 'b': 2}
+    n_tb_spects = [20, 35, 12]
+    spect_paths, lbl_tb_paths = [], []
+    for spect_num, n_timebins in enumerate(n_tb_spects):
+        spect_path = tmp_path / f'{spect_num}.wav.spect.npz'
+        np.savez(spect_path, s=rng.random((4, n_timebins)).astype(np.float32), t=np.arange(n_timebins) * 0.002)
+        spect_paths.append(str(spect_path))
+        lbl_tb_path = tmp_path / f'{spect_num}.wav.lbl_tb.npy'
+        np.save(lbl_tb_path, rng.integers(0, len(labelmap), n_timebins))
+        lbl_tb_paths.append(str(lbl_tb_path))
+    return WindowDataset(root=str(tmp_path),
+                         x_inds=None,
+                         spect_id_vector=None,
+                         spect_inds_vector=None,
+                         spect_paths=np.array(spect_paths),
+                         annots=None,
+                         labelmap=labelmap,
+                         timebin_dur=0.002,
+                         window_size=WINDOW_SIZE,
+                         lbl_tb_paths=np.array(lbl_tb_paths),
+                         window_index=WindowIndex.from_n_time_bins(n_tb_spects, WINDOW_SIZE))
+
+
+def test_getitems(window_dataset):
+    indices = [30, 0, 13, 29, 14, 45, 1]
+    items = window_dataset.__getitems__(indices)
+    expected = [window_dataset[idx] for idx in indices]
+    assert len(items) == len(expected)
+    for (window, labelvec), (expected_window, expected_labelvec) in zip(items, expected):
+        assert np.array_equal(window, expected_window)
+        assert np.array_equal(labelvec, expected_labelvec)
+
+
+def test_get_dataloader_batch_sampler(window_dataset, monkeypatch):
+    n_loads = []
+    load_spect_lbl_tb = window_dataset._load_spect_lbl_tb
+
+    def counting_load(spect_id):
+        n_loads.append(spect_id)
+        return load_spect_lbl_tb(spect_id)
+
+    monkeypatch.setattr(window_dataset, '_load_spect_lbl_tb', counting_load)
+
+    def get_batch_sampler():
+        sampler = vak.datasets.sampler.FileChunkSampler(window_dataset, chunk_size=4,
+                                                        generator=torch.Generator().manual_seed(0))
+        return torch.utils.data.BatchSampler(sampler, batch_size=8, drop_last=False)
+
+    dataloader = vak.datasets.dataloader.get_dataloader(window_dataset, batch_sampler=get_batch_sampler())
+    assert len(dataloader) == len(get_batch_sampler())
+
+    n_windows = 0
+    for batch_inds, (x, y) in zip(get_batch_sampler(), dataloader):
+        # each file is loaded once per batch
+        spect_ids = window_dataset.window_index.lookup(np.asarray(batch_inds))[0]
+        assert sorted(n_loads) == sorted(np.unique(spect_ids).tolist())
+        n_loads.clear()
+        assert x.shape == (len(batch_inds), 4, WINDOW_SIZE)
+        expected_x = np.stack([window_dataset[idx][0] for idx in batch_inds])
+        assert np.array_equal(x.numpy(), expected_x)
+        n_loads.clear()  # loads by indexing dataset above
+        n_windows += len(batch_inds)
+    assert n_windows == len(window_dataset)
+
+
+def make_crop_vectors(files_segments, window_size):
+    """make labeled timebins and vectors for ``crop_spect_vectors_keep_classes``
+    from a list of files, each a list of (label, number of time bins) segments"""
+    lbl_tb = np.concatenate([np.repeat([label for label, _ in segments], [dur for _, dur in segments])
+                             for segments in files_segments])
+    n_tb_spects = [sum(dur for _, dur in segments) for segments in files_segments]
+    spect_id_vector, spect_inds_vector, x_inds = WindowDataset.spect_vectors_from_n_time_bins(n_tb_spects,
+                                                                                              window_size)
+    return lbl_tb, spect_id_vector, spect_inds_vector, x_inds
+
+
+def crop_silences_reference(lbl_tb, x_inds, cropped_length, labelmap, window_size, n_pad_bins=2):
+    """reference implementation of cropping silences in ``crop_spect_vectors_keep_classes``,
+    with a loop over silent segments. Uses ``random`` in the same way, so results
+    are the same given the same seed"""
+    invalid = WindowDataset.INVALID_WINDOW_VAL
+    n_bins = lbl_tb.shape[-1]
+    valid = x_inds != invalid
+    is_silent = np.append((lbl_tb == labelmap['unlabeled']) & valid, False)
+
+    # (onset, offset, is at start of file, is at end of file) for silences long enough to crop
+    segments = []
+    onset = None
+    for ind in range(n_bins + 1):
+        if is_silent[ind] and onset is None:
+            onset = ind
+        elif not is_silent[ind] and onset is not None:
+            if ind - onset >= window_size + n_pad_bins:
+                at_start = onset == 0 or not valid[onset - 1]
+                at_end = ind + 1 >= n_bins or not valid[ind + 1]
+                segments.append([onset, ind, at_start, at_end])
+            onset = None
+
+    n_bins_to_crop = n_bins - cropped_length
+    n_croppable = [offset - onset - (window_size + n_pad_bins) + window_size * at_start
+                   for onset, offset, at_start, _ in segments]
+    if sum(n_croppable) < n_bins_to_crop:
+        # also crop silences at end of files
+        n_croppable = [offset - onset - (window_size - n_pad_bins) + window_size * (at_start + at_end)
+                       for onset, offset, at_start, at_end in segments]
+    else:
+        for segment in segments:
+            segment[3] = False
+    crop_more = 0
+    if sum(n_croppable) < n_bins_to_crop:
+        crop_more = n_bins_to_crop - sum(n_croppable) + 1
+        n_bins_to_crop = sum(n_croppable) - 1
+
+    ignore = np.zeros(n_bins, dtype=bool)
+    order = np.arange(len(segments))
+    random.shuffle(order)
+    n_cropped = 0
+    for segment_ind in order:
+        onset, offset, at_start, at_end = segments[segment_ind]
+        if n_cropped + n_croppable[segment_ind] < n_bins_to_crop:
+            # crop whole segment, except for one bin on each side that is not at a file border
+            start = onset if at_start else onset + 1
+            stop = offset if at_end and not at_start else offset - 1
+            n_cropped += n_croppable[segment_ind]
+        else:
+            # crop just enough of last segment
+            left_to_crop = n_bins_to_crop - n_cropped - at_start * window_size
+            start = onset if at_start else onset + 1
+            stop = onset + left_to_crop
+            if at_end and not at_start and left_to_crop >= n_croppable[segment_ind] - window_size:
+                stop -= window_size
+            if stop > start:
+                ignore[start:stop] = True
+            break
+        if stop > start:
+            ignore[start:stop] = True
+    x_inds[ignore] = invalid
+
+    if crop_more > 0:
+        valid_x_inds = x_inds[x_inds != invalid]
+        if crop_more > valid_x_inds.shape[-1]:
+            raise ValueError('could not crop')
+        ignore[valid_x_inds[:crop_more]] = True
+        x_inds[valid_x_inds[:crop_more]] = invalid
+
+    if not np.array_equal(np.unique(lbl_tb[~ignore]), sorted(labelmap.values())):
+        raise ValueError('could not crop')
+    return x_inds
+
+
+CROP_WINDOW_SIZE = 4
+CROP_LABELMAP = {'unlabeled': 0, 'a': 1, 'b': 2, 'c': 3}
+
+
+def test_crop_from_end():
+    files_segments = [[(0, 10), (1, 5), (2, 5), (3, 5), (0, 10)], [(1, 20), (0, 20)]]
+    lbl_tb, spect_id_vector, spect_inds_vector, x_inds = make_crop_vectors(files_segments, CROP_WINDOW_SIZE)
+    expected_x_inds = x_inds.copy()
+    expected_x_inds[40:] = WindowDataset.INVALID_WINDOW_VAL
+
+    spect_id_cropped, spect_inds_cropped, x_inds_cropped = WindowDataset.crop_spect_vectors_keep_classes(
+        lbl_tb, spect_id_vector, spect_inds_vector, x_inds, crop_dur=0.4, timebin_dur=0.01,
+        labelmap=CROP_LABELMAP, window_size=CROP_WINDOW_SIZE,
+    )
+    assert np.array_equal(spect_id_cropped, spect_id_vector[:40])
+    assert np.array_equal(spect_inds_cropped, spect_inds_vector[:40])
+    assert np.array_equal(x_inds_cropped, expected_x_inds)
+
+
+def test_crop_class_only_at_end():
+    # class 3 is only in the last file, so cropping the end would remove it
+    files_segments = [[(0, 10), (1, 5), (2, 5), (0, 10)], [(0, 10), (1, 5), (2, 5), (3, 5), (0, 15)]]
+    lbl_tb, spect_id_vector, spect_inds_vector, x_inds = make_crop_vectors(files_segments, CROP_WINDOW_SIZE)
+    # windows before the last 40 bins are invalid, and window indices start at 0
+    expected_x_inds = x_inds.copy()
+    expected_x_inds[:-40] = WindowDataset.INVALID_WINDOW_VAL
+    expected_x_inds[-40:][x_inds[-40:] != WindowDataset.INVALID_WINDOW_VAL] -= 30
+
+    spect_id_cropped, spect_inds_cropped, x_inds_cropped = WindowDataset.crop_spect_vectors_keep_classes(
+        lbl_tb, spect_id_vector, spect_inds_vector, x_inds, crop_dur=0.4, timebin_dur=0.01,
+        labelmap=CROP_LABELMAP, window_size=CROP_WINDOW_SIZE,
+    )
+    assert np.array_equal(spect_id_cropped, spect_id_vector[-40:])
+    assert np.array_equal(spect_inds_cropped, spect_inds_vector[-40:])
+    assert np.array_equal(x_inds_cropped, expected_x_inds)
+
+
+def make_silence_crop_vectors(seed, n_files=6):
+    """make vectors where class 'a' is only at the start, and class 'c' only at the end,
+    so silences must be cropped. Silences have random durations, some shorter than windows,
+    and some files start or end with long silences, so that crops reach file borders"""
+    rng = np.random.default_rng(seed)
+    files_segments = []
+    for file_num in range(n_files):
+        segments = [(0, int(rng.integers(1, 30)))]
+        for _ in range(int(rng.integers(2, 6))):
+            # label runs can be shorter than windows
+            segments.append((2, int(rng.integers(1, 10))))
+            segments.append((0, int(rng.integers(1, 30))))
+        files_segments.append(segments)
+    files_segments[0][0] = (0, 2)
+    files_segments[0][1] = (1, 5)
+    files_segments[-1][-1] = (0, 2)
+    files_segments[-1][-2] = (3, 5)
+    return make_crop_vectors(files_segments, CROP_WINDOW_SIZE)
+
+
+@pytest.mark.parametrize('seed', range(8))
+# smaller fractions crop silences at the start and then at the end of files,
+# and the smallest have to crop windows with classes as well, and raise
+@pytest.mark.parametrize('crop_fraction', [0.9, 0.6, 0.4, 0.3, 0.2])
+def test_crop_silences(seed, crop_fraction):
+    lbl_tb, spect_id_vector, spect_inds_vector, x_inds = make_silence_crop_vectors(seed)
+    crop_dur = round(lbl_tb.shape[-1] * crop_fraction) * 0.01
+
+    random.seed(seed)
+    try:
+        expected_x_inds = crop_silences_reference(lbl_tb, x_inds.copy(), round(crop_dur / 0.01),
+                                                  CROP_LABELMAP, CROP_WINDOW_SIZE)
+    except ValueError:
+        expected_x_inds = None
+
+    random.seed(seed)
+    if expected_x_inds is None:
+        with pytest.raises(ValueError):
+            WindowDataset.crop_spect_vectors_keep_classes(
+                lbl_tb, spect_id_vector, spect_inds_vector, x_inds.copy(), crop_dur=crop_dur, timebin_dur=0.01,
+                labelmap=CROP_LABELMAP, window_size=CROP_WINDOW_SIZE,
+            )
+    else:
+        spect_id_cropped, spect_inds_cropped, x_inds_cropped = WindowDataset.crop_spect_vectors_keep_classes(
+            lbl_tb, spect_id_vector, spect_inds_vector, x_inds.copy(), crop_dur=crop_dur, timebin_dur=0.01,
+            labelmap=CROP_LABELMAP, window_size=CROP_WINDOW_SIZE,
+        )
+        # when cropping silences, vectors are not cropped, windows are made invalid
+        assert np.array_equal(spect_id_cropped, spect_id_vector)
+        assert np.array_equal(spect_inds_cropped, spect_inds_vector)
+        assert np.array_equal(x_inds_cropped, expected_x_inds)
+
+
+def test_crop_below_minimum_raises():
+    lbl_tb, spect_id_vector, spect_inds_vector, x_inds = make_silence_crop_vectors(seed=0)
+    with pytest.raises(ValueError):
+        WindowDataset.crop_spect_vectors_keep_classes(
+            lbl_tb, spect_id_vector, spect_inds_vector, x_inds, crop_dur=0.05, timebin_dur=0.01,
+            labelmap=CROP_LABELMAP, window_size=CROP_WINDOW_SIZE,
+        )
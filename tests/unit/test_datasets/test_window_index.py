@@ -0,0 +1,76 @@
+import pickle
+
+import numpy as np
+import pytest
+
+import vak.datasets.window_dataset
+import vak.datasets.window_index
+
+
+INVALID_WINDOW_VAL = vak.datasets.window_dataset.WindowDataset.INVALID_WINDOW_VAL
+
+
+@pytest.mark.parametrize(
+    'n_tb_spects, window_size',
+    [
+        ([100, 150, 75, 120], 20),
+        ([100, 10, 75, 20], 20),
+        ([50], 50),
+    ]
+)
+def test_from_n_time_bins(n_tb_spects, window_size):
+    (spect_id_vector,
+     spect_inds_vector,
+     x_inds) = vak.datasets.window_dataset.WindowDataset.spect_vectors_from_n_time_bins(n_tb_spects, window_size)
+    x_inds = x_inds[x_inds != INVALID_WINDOW_VAL]
+
+    window_index = vak.datasets.window_index.WindowIndex.from_n_time_bins(n_tb_spects, window_size)
+
+    assert len(window_index) == x_inds.shape[-1]
+    assert window_index.n_timebins == sum(n_tb_spects)
+    spect_ids, window_start_inds = window_index.lookup(np.arange(len(window_index)))
+    assert np.array_equal(spect_ids, spect_id_vector[x_inds])
+    assert np.array_equal(window_start_inds, spect_inds_vector[x_inds])
+    assert window_index.spect_ids.shape[-1] == sum([n_tb >= window_size for n_tb in n_tb_spects])
+
+
+def test_from_vectors_with_invalid_windows():
+    rng = np.random.default_rng(42)
+    (spect_id_vector,
+     spect_inds_vector,
+     x_inds) = vak.datasets.window_dataset.WindowDataset.spect_vectors_from_n_time_bins([300, 500, 400], 30)
+    # mark random windows invalid, like cropping does
+    x_inds[rng.random(x_inds.shape[-1]) < 0.1] = INVALID_WINDOW_VAL
+    expected_x_inds = x_inds[x_inds != INVALID_WINDOW_VAL]
+
+    window_index = vak.datasets.window_index.WindowIndex.from_vectors(spect_id_vector, spect_inds_vector, x_inds)
+
+    assert len(window_index) == expected_x_inds.shape[-1]
+    assert window_index.n_timebins == spect_id_vector.shape[-1]
+    for idx in rng.integers(0, len(window_index), 50):
+        assert window_index.lookup(idx) == (spect_id_vector[expected_x_inds[idx]],
+                                            spect_inds_vector[expected_x_inds[idx]])
+    assert window_index.lookup(-1) == (spect_id_vector[expected_x_inds[-1]],
+                                       spect_inds_vector[expected_x_inds[-1]])
+
+    # converting back to vectors gives the same windows
+    new_spect_id_vector, new_spect_inds_vector, new_x_inds = window_index.to_vectors()
+    assert np.array_equal(new_spect_id_vector[new_x_inds], spect_id_vector[expected_x_inds])
+    assert np.array_equal(new_spect_inds_vector[new_x_inds], spect_inds_vector[expected_x_inds])
+
+    assert window_index.nbytes < spect_id_vector.nbytes
+    assert len(pickle.dumps(window_index)) < spect_id_vector.nbytes
+
+
+@pytest.mark.parametrize(
+    'idx',
+    [
+        10 ** 6,
+        -(10 ** 6),
+        np.array([0, 10 ** 6]),
+    ]
+)
+def test_lookup_raises(idx):
+    window_index = vak.datasets.window_index.WindowIndex.from_n_time_bins([100, 200], 10)
+    with pytest.raises(IndexError):
+        window_index.lookup(idx)
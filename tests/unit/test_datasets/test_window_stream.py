@@ -0,0 +1,113 @@
+import numpy as np
+import pytest
+import torch
+
+import vak.datasets.window_stream
+
+
+@pytest.mark.parametrize(
+    'n_timebins, window_size, batch_size',
+    [
+        (1000, 88, 4),
+        (88, 88, 1),
+        (89, 88, 1),
+        (5, 88, 32),
+    ]
+)
+def test_window_stream(n_timebins, window_size, batch_size, tmp_path):
+    spect = np.random.rand(16, n_timebins).astype(np.float32)
+    spect_path = tmp_path / 'spect.npz'
+    np.savez(spect_path, s=spect)
+
+    window_stream = vak.datasets.window_stream.WindowStream(spect_path, window_size, batch_size)
+    assert isinstance(window_stream.spect, np.memmap)
+    assert window_stream.shape == (1, 16, window_size)
+
+    batches = list(window_stream)
+    assert len(batches) == len(window_stream)
+    for batch in batches:
+        assert batch.ndim == 4
+        assert batch.shape[0] <= batch_size
+        assert batch.shape[1:] == window_stream.shape
+
+    # concatenating windows recovers spectrogram, plus padding
+    windows = torch.cat(batches).squeeze(1).numpy()
+    stitched = np.concatenate(list(windows), axis=1)
+    assert np.array_equal(stitched[:, :n_timebins], spect)
+    assert np.all(stitched[:, n_timebins:] == 0.)
+
+
+@pytest.mark.parametrize(
+    'window_size, batch_size, expected_exception',
+    [
+        (0, 4, ValueError),
+        (88, -1, ValueError),
+        (88.0, 4, TypeError),
+        (88, True, TypeError),
+    ]
+)
+def test_window_stream_raises(window_size, batch_size, expected_exception, tmp_path):
+    spect_path = tmp_path / 'spect.npz'
+    np.savez(spect_path, s=np.random.rand(16, 100))
+    with pytest.raises(expected_exception):
+        vak.datasets.window_stream.WindowStream(spect_path, window_size, batch_size)
+
+
+@pytest.mark.parametrize(
+    'n_timebins, window_size, hop_size, batch_size',
+    [
+        (1000, 88, 22, 4),
+        (1000, 88, 1, 64),
+        (50, 88, 44, 2),
+        (300, 88, 30, None),
+    ]
+)
+def test_window_stream_overlapping(n_timebins, window_size, hop_size, batch_size, tmp_path):
+    spect = np.random.rand(16, n_timebins).astype(np.float32)
+    spect_path = tmp_path / 'spect.npz'
+    np.savez(spect_path, s=spect)
+
+    window_stream = vak.datasets.window_stream.WindowStream(spect_path, window_size, batch_size,
+                                                            hop_size=hop_size)
+    windows = torch.cat(list(window_stream)).squeeze(1).numpy()
+    assert windows.shape[0] == window_stream.n_windows
+    # last window ends at or after last time bin
+    assert (window_stream.n_windows - 1) * hop_size + window_size >= n_timebins
+    for window_ind, window in enumerate(windows):
+        start = window_ind * hop_size
+        expected = spect[:, start:start + window_size]
+        assert np.array_equal(window[:, :expected.shape[-1]], expected)
+        assert np.all(window[:, expected.shape[-1]:] == 0.)
+
+
+@pytest.mark.parametrize(
+    'n_timebins, window_size, hop_size, batch_size',
+    [
+        (1000, 88, 22, 4),
+        (1000, 88, 88, 4),
+        (50, 88, 44, 2),
+        (301, 20, 7, 1),
+    ]
+)
+def test_overlap_add(n_timebins, window_size, hop_size, batch_size):
+    n_classes = 3
+    n_windows = max(-(-(n_timebins - window_size) // hop_size), 0) + 1
+    y_pred = np.random.rand(n_windows, n_classes, window_size).astype(np.float32)
+
+    # compute weighted average for all time bins at once
+    weights = vak.datasets.window_stream.window_weights(window_size, hop_size)
+    padded_len = (n_windows - 1) * hop_size + window_size
+    summed = np.zeros((n_classes, padded_len))
+    weight_sums = np.zeros(padded_len)
+    for window_ind in range(n_windows):
+        start = window_ind * hop_size
+        summed[:, start:start + window_size] += y_pred[window_ind] * weights
+        weight_sums[start:start + window_size] += weights
+    expected = (summed / weight_sums)[:, :n_timebins]
+
+    overlap_add = vak.datasets.window_stream.OverlapAdd(n_timebins, n_classes, window_size, hop_size)
+    outputs = [overlap_add.add(y_pred[start:start + batch_size])
+               for start in range(0, n_windows, batch_size)]
+    outputs.append(overlap_add.finish())
+    output = np.concatenate(outputs, axis=1)
+    np.testing.assert_allclose(output, expected, rtol=1e-5)
@@ -0,0 +1,34 @@
+"""tests for vak.engine.export module"""
+import numpy as np
+import torch
+
+import vak.engine.export
+from vak.engine.model import Model
+from vak.transforms import StandardizeSpect
+
+
+def test_export_round_trip(tmp_path):
+    torch.manual_seed(0)
+    network = torch.nn.Sequential(
+        torch.nn.Conv2d(1, 3, kernel_size=(16, 3), padding=(0, 1)),
+        torch.nn.Flatten(start_dim=1, end_dim=2),
+    )
+    model = Model(network, loss=None, optimizer=None, metrics={})
+    labelmap = {'unlabeled': 0, 'a': 1, 'b': 2}
+    spect_standardizer = StandardizeSpect.fit(np.random.default_rng(0).random((16, 100)))
+    export_path = tmp_path.joinpath(f'Net{vak.engine.export.EXPORT_EXT}')
+
+    vak.engine.export.export(model, export_path, (1, 16, 20), labelmap, window_size=20,
+                             spect_standardizer=spect_standardizer, model_name='Net')
+    exported_model = vak.engine.export.ExportedModel.from_file(export_path, device='cpu')
+
+    assert exported_model.labelmap == labelmap
+    assert exported_model.window_size == 20
+    assert exported_model.input_shape == (1, 16, 20)
+    assert exported_model.model_name == 'Net'
+    np.testing.assert_allclose(exported_model.spect_standardizer.mean_freqs, spect_standardizer.mean_freqs)
+    np.testing.assert_allclose(exported_model.spect_standardizer.std_freqs, spect_standardizer.std_freqs)
+
+    x = torch.rand(4, 1, 16, 20)
+    torch.testing.assert_close(exported_model.predict_batch(x, device='cpu'),
+                               model.predict_batch(x, device='cpu'))
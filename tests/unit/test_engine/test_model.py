@@ -0,0 +1,122 @@
+"""tests for vak.engine.model module"""
+import logging
+
+import torch
+
+from vak.engine.model import Model
+
+
+def test_quantize():
+    torch.manual_seed(0)
+    network = torch.nn.Sequential(
+        torch.nn.Flatten(start_dim=1),
+        torch.nn.Linear(16, 8),
+        torch.nn.ReLU(),
+        torch.nn.Linear(8, 3),
+    )
+    model = Model(network, loss=None, optimizer=None, metrics={})
+    x = torch.rand(4, 16)
+    y_pred = model.predict_batch(x, device='cpu')
+
+    model.quantize()
+    assert not any(type(module) is torch.nn.Linear for module in model.network.modules())
+    y_pred_quantized = model.predict_batch(x, device='cpu')
+    assert y_pred_quantized.shape == y_pred.shape
+    torch.testing.assert_close(y_pred_quantized, y_pred, atol=0.05, rtol=0)
+
+
+def test_load_inference(tmp_path):
+    torch.manual_seed(0)
+    network = torch.nn.Linear(16, 3)
+    model = Model(network, loss=None, optimizer=torch.optim.Adam(network.parameters()), metrics={})
+    ckpt_path = tmp_path.joinpath('checkpoint.pt')
+    model.save(ckpt_path)
+
+    # no optimizer, since optimizer state is not loaded
+    loaded = Model(torch.nn.Linear(16, 3), loss=None, optimizer=None, metrics={})
+    loaded.load(ckpt_path, device='cpu', inference=True, mmap=True)
+    for param, loaded_param in zip(network.parameters(), loaded.network.parameters()):
+        torch.testing.assert_close(loaded_param, param)
+
+
+def test_forward_items_packed():
+    torch.manual_seed(0)
+    network = torch.nn.Conv2d(1, 3, kernel_size=(16, 1)).eval()
+    model = Model(network, loss=None, optimizer=None, metrics={})
+    model.device = 'cpu'
+    # items as returned by a DataLoader with batch size 1, with different numbers of windows
+    items = [{'source': torch.rand(1, n_windows, 1, 16, 10), 'item_num': item_num}
+             for item_num, n_windows in enumerate([1, 5, 2, 8, 3])]
+
+    with torch.no_grad():
+        expected = [out for _, out in model._forward_items(items, batch_size=None)]
+        for batch_size in (1, 4, 32):
+            forwarded = list(model._forward_items(items, batch_size=batch_size))
+            assert [item['item_num'] for item, _ in forwarded] == list(range(len(items)))
+            for (_, out), expected_out in zip(forwarded, expected):
+                torch.testing.assert_close(out, expected_out)
+
+
+def test_autocast_cpu():
+    network = torch.nn.Linear(16, 3)
+    model = Model(network, loss=None, optimizer=None, metrics={})
+    model.device = 'cpu'
+    x = torch.rand(4, 16)
+
+    model.mixed_precision = True
+    with model._autocast():
+        assert network(x).dtype == torch.bfloat16
+    assert model._forward_eval(x).dtype == torch.float32
+
+    model.mixed_precision = False
+    with model._autocast():
+        assert network(x).dtype == torch.float32
+
+
+class FakeGradScaler:
+    """stand-in for ``torch.cuda.amp.GradScaler``, that is disabled without a GPU"""
+    def __init__(self, scale=65536.):
+        self.scale = scale
+
+    def state_dict(self):
+        return {'scale': self.scale}
+
+    def load_state_dict(self, state_dict):
+        self.scale = state_dict['scale']
+
+
+def test_save_load_grad_scaler(tmp_path):
+    network = torch.nn.Linear(16, 3)
+    model = Model(network, loss=None, optimizer=torch.optim.Adam(network.parameters()), metrics={})
+    model.grad_scaler = FakeGradScaler(scale=1024.)
+    ckpt_path = tmp_path.joinpath('checkpoint.pt')
+    model.save(ckpt_path)
+
+    loaded_network = torch.nn.Linear(16, 3)
+    loaded = Model(loaded_network, loss=None, optimizer=torch.optim.Adam(loaded_network.parameters()), metrics={})
+    loaded.grad_scaler = FakeGradScaler()
+    loaded.load(ckpt_path)
+    assert loaded.grad_scaler.scale == 1024.
+
+
+def test_load_mmap_unsupported(tmp_path, monkeypatch, capsys, caplog):
+    network = torch.nn.Linear(16, 3)
+    model = Model(network, loss=None, optimizer=None, metrics={})
+    ckpt_path = tmp_path.joinpath('checkpoint.pt')
+    torch.save({'network_state_dict': network.state_dict()}, ckpt_path)
+
+    torch_load = torch.load
+
+    def load_without_mmap(f, map_location=None):
+        # signature of torch.load before torch 2.1, that has no mmap parameter
+        return torch_load(f, map_location=map_location)
+
+    monkeypatch.setattr(torch, 'load', load_without_mmap)
+    model.load(ckpt_path, device='cpu', inference=True, mmap=True)
+    # fallback is not printed or logged as a warning
+    assert 'memory-mapping' not in capsys.readouterr().out
+
+    model.logger = logging.getLogger('test_load_mmap_unsupported')
+    with caplog.at_level(logging.DEBUG, logger=model.logger.name):
+        model.load(ckpt_path, device='cpu', inference=True, mmap=True)
+    assert [record.levelno for record in caplog.records if 'memory-mapping' in record.message] == [logging.DEBUG]
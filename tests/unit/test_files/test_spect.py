@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+import scipy.io
+
+import vak.files.spect
+
+
+@pytest.mark.parametrize(
+    'ext, save_func',
+    [
+        ('npz', np.savez),
+        ('npz', np.savez_compressed),
+        ('mat', lambda path, **arrays: scipy.io.savemat(path, arrays)),
+    ]
+)
+def test_n_timebins(ext, save_func, tmp_path):
+    spect_path = tmp_path / f'spect.{ext}'
+    save_func(spect_path, s=np.random.rand(64, 123), t=np.arange(123) * 0.002)
+    assert vak.files.spect.n_timebins(spect_path) == 123
+    assert vak.files.spect.n_timebins(spect_path) == vak.files.spect.load(spect_path)['s'].shape[-1]
+
+
+@pytest.mark.parametrize(
+    'ext, save_func, expected_memmap',
+    [
+        ('npz', np.savez, True),
+        ('npz', np.savez_compressed, False),
+        ('mat', lambda path, **arrays: scipy.io.savemat(path, arrays), False),
+    ]
+)
+def test_memmap(ext, save_func, expected_memmap, tmp_path):
+    spect_path = tmp_path / f'spect.{ext}'
+    spect = np.random.rand(64, 123)
+    save_func(spect_path, s=spect, t=np.arange(123) * 0.002)
+    arr = vak.files.spect.memmap(spect_path)
+    assert isinstance(arr, np.memmap) is expected_memmap
+    assert np.array_equal(arr, spect)
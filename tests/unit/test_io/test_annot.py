@@ -4,8 +4,10 @@ import unittest
 from glob import glob
 
 import crowsetta
+import numpy as np
 
 import vak.annotation
+import vak.io.annot
 import vak.io.audio
 
 HERE = Path(__file__).parent
@@ -88,5 +90,82 @@ class TestAnnot(unittest.TestCase):
         )
 
 
+def make_annots(n_annots, n_segments=5):
+    annots = []
+    for annot_num in range(n_annots):
+        onsets_s = np.arange(n_segments) * 0.5
+        seq = crowsetta.Sequence.from_keyword(labels=np.array(list('abcde'[:n_segments])),
+                                              onsets_s=onsets_s,
+                                              offsets_s=onsets_s + 0.25)
+        annots.append(crowsetta.Annotation(seq=seq, audio_path=f'{annot_num}.wav', annot_path='annot.csv'))
+    return annots
+
+
+def test_annot_csv_writer(tmp_path):
+    csv_path = tmp_path / 'annot.csv'
+    annots = make_annots(10)
+    with vak.io.annot.AnnotCsvWriter(csv_path, max_queue_size=2) as writer:
+        for annot in annots:
+            writer.write(annot)
+
+    expected_path = tmp_path / 'expected.csv'
+    crowsetta.csv.annot2csv(annots, str(expected_path))
+    assert csv_path.read_text() == expected_path.read_text()
+
+
+def test_annot_csv_writer_resume(tmp_path):
+    csv_path = tmp_path / 'annot.csv'
+    annots = make_annots(6)
+    with vak.io.annot.AnnotCsvWriter(csv_path) as writer:
+        for annot in annots[:4]:
+            writer.write(annot)
+    # simulate run interrupted while writing a row
+    with csv_path.open('a') as fp:
+        fp.write('a,0.0,0.2')
+
+    writer = vak.io.annot.AnnotCsvWriter(csv_path, resume=True)
+    # rows for last annotation are dropped, since they may be incomplete
+    assert writer.done_audio_paths == {'0.wav', '1.wav', '2.wav'}
+    for annot in annots[3:]:
+        writer.write(annot)
+    writer.close()
+
+    annots_loaded = crowsetta.csv.csv2annot(str(csv_path))
+    assert [str(annot.audio_path) for annot in annots_loaded] == [f'{ind}.wav' for ind in range(6)]
+
+
+def test_merge(tmp_path):
+    annots = make_annots(7)
+    csv_paths = []
+    for shard_num, (start, stop) in enumerate([(0, 3), (3, 4), (4, 7)]):
+        csv_path = tmp_path / f'shard{shard_num}.csv'
+        crowsetta.csv.annot2csv(annots[start:stop], str(csv_path))
+        csv_paths.append(csv_path)
+
+    merged_path = tmp_path / 'merged.csv'
+    vak.io.annot.merge(csv_paths, merged_path)
+
+    expected_path = tmp_path / 'expected.csv'
+    for annot in annots:
+        annot.annot_path = merged_path.name
+    crowsetta.csv.annot2csv(annots, str(expected_path))
+    assert merged_path.read_text() == expected_path.read_text()
+
+
+def test_merge_resume(tmp_path):
+    annots = make_annots(6)
+    merged_path = tmp_path / 'merged.csv'
+    crowsetta.csv.annot2csv(annots[:3], str(merged_path))
+    shard_path = tmp_path / 'shard.csv'
+    crowsetta.csv.annot2csv(annots[3:], str(shard_path))
+
+    # merged .csv is also one of the files that are merged
+    vak.io.annot.merge([merged_path, shard_path], merged_path, drop_last=True)
+    # last annotation in each file is dropped
+    assert vak.io.annot.audio_paths(merged_path) == {'0.wav', '1.wav', '3.wav', '4.wav'}
+    annots_loaded = crowsetta.csv.csv2annot(str(merged_path))
+    assert [str(annot.audio_path) for annot in annots_loaded] == ['0.wav', '1.wav', '3.wav', '4.wav']
+
+
 if __name__ == '__main__':
     unittest.main()
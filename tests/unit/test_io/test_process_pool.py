@@ -0,0 +1,36 @@
+import pytest
+
+import vak.io.process_pool
+
+
+@pytest.mark.parametrize(
+    'workers, chunksize, max_in_flight',
+    [
+        (1, 1, None),
+        (2, 1, 1),
+        (2, 3, 4),
+        (2, 20, None),
+    ]
+)
+def test_imap_ordered(workers, chunksize, max_in_flight):
+    items = list(range(-10, 10))
+    results = vak.io.process_pool.imap_ordered(abs, items, workers, chunksize, max_in_flight)
+    assert list(results) == [abs(item) for item in items]
+
+
+@pytest.mark.parametrize(
+    'workers, chunksize',
+    [
+        (0, 1),
+        (1, 0),
+        (1.5, 1),
+    ]
+)
+def test_imap_ordered_raises(workers, chunksize):
+    with pytest.raises(ValueError):
+        list(vak.io.process_pool.imap_ordered(abs, range(5), workers, chunksize))
+
+
+def test_validate_backend_raises():
+    with pytest.raises(ValueError):
+        vak.io.process_pool.validate_backend('threads')
@@ -0,0 +1,85 @@
+import os
+
+import numpy as np
+import pytest
+import soundfile
+
+import vak.files.spect
+import vak.io.audio
+import vak.io.spect_manifest
+from vak.config.spect_params import SpectParamsConfig
+
+
+@pytest.fixture
+def audio_path(tmp_path):
+    audio_path = tmp_path / 'bird.wav'
+    audio_path.write_bytes(b'\x00' * 100)
+    return audio_path
+
+
+@pytest.fixture
+def spect_path(tmp_path):
+    spect_path = tmp_path / 'bird.wav.spect.npz'
+    np.savez(spect_path, s=np.zeros((4, 10)))
+    return spect_path
+
+
+def test_spect_params_hash():
+    params_hash = vak.io.spect_manifest.spect_params_hash(SpectParamsConfig())
+    assert params_hash == vak.io.spect_manifest.spect_params_hash(SpectParamsConfig())
+    assert params_hash != vak.io.spect_manifest.spect_params_hash(SpectParamsConfig(fft_size=256))
+
+
+def test_manifest(audio_path, spect_path, tmp_path):
+    params_hash = vak.io.spect_manifest.spect_params_hash(SpectParamsConfig())
+    manifest = vak.io.spect_manifest.SpectManifest()
+    assert manifest.get(audio_path, params_hash) is None
+
+    manifest.add(audio_path, params_hash, spect_path, n_timebins=10, timebin_dur=0.002)
+    manifest_path = tmp_path / vak.io.spect_manifest.MANIFEST_FNAME
+    manifest.to_file(manifest_path)
+
+    manifest = vak.io.spect_manifest.SpectManifest.from_file(manifest_path)
+    entry = manifest.get(audio_path, params_hash)
+    assert entry['spect_path'] == str(spect_path)
+    assert entry['n_timebins'] == 10
+    assert manifest.get(audio_path, 'other-params') is None
+    assert manifest.spect_path_map()[str(spect_path)]['audio_path'] == str(audio_path)
+
+    # changing audio file invalidates entry
+    stat = os.stat(audio_path)
+    os.utime(audio_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert manifest.get(audio_path, params_hash) is None
+
+
+def test_manifest_missing_spect_file(audio_path, spect_path):
+    params_hash = vak.io.spect_manifest.spect_params_hash(SpectParamsConfig())
+    manifest = vak.io.spect_manifest.SpectManifest()
+    manifest.add(audio_path, params_hash, spect_path, n_timebins=10, timebin_dur=0.002)
+    spect_path.unlink()
+    assert manifest.get(audio_path, params_hash) is None
+
+
+def test_to_spect_adds_entries(tmp_path):
+    rng = np.random.default_rng(0)
+    audio_paths = []
+    for audio_num, dur in enumerate((0.5, 1.0)):
+        audio_path = tmp_path / f'bird{audio_num}.wav'
+        soundfile.write(audio_path, rng.standard_normal(int(dur * 32000)) * 0.1, 32000)
+        audio_paths.append(str(audio_path))
+    spect_params = SpectParamsConfig(fft_size=512, step_size=64)
+    manifest = vak.io.spect_manifest.SpectManifest()
+    spect_files = vak.io.audio.to_spect(audio_format='wav',
+                                        spect_params=spect_params,
+                                        output_dir=tmp_path,
+                                        audio_files=audio_paths,
+                                        backend='process',
+                                        workers=1,
+                                        manifest=manifest)
+
+    params_hash = vak.io.spect_manifest.spect_params_hash(spect_params)
+    for audio_path, spect_path in zip(audio_paths, spect_files):
+        entry = manifest.get(audio_path, params_hash)
+        assert entry['spect_path'] == str(spect_path)
+        assert entry['n_timebins'] == vak.files.spect.n_timebins(spect_path)
+        assert entry['timebin_dur'] == vak.files.spect.timebin_dur(spect_path, 'npz', 't')
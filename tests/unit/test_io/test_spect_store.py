@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import vak.io.spect_store
+
+
+@pytest.fixture
+def dataset_df(tmp_path):
+    rng = np.random.default_rng(42)
+    timebin_dur = 0.002
+    records = []
+    for ind, n_timebins in enumerate([100, 150, 75, 120]):
+        spect_path = tmp_path / f'{ind}.wav.spect.npz'
+        np.savez(spect_path, s=rng.random((16, n_timebins)), t=np.arange(n_timebins) * timebin_dur)
+        lbl_tb_path = tmp_path / f'{ind}.wav.spect.lbl_tb.npy'
+        np.save(lbl_tb_path, rng.integers(0, 4, n_timebins).astype('int8'))
+        records.append(
+            (str(spect_path), str(lbl_tb_path), n_timebins * timebin_dur, timebin_dur,
+             'train' if ind < 3 else 'test')
+        )
+    return pd.DataFrame.from_records(records,
+                                     columns=['spect_path', 'lbl_tb_path', 'duration', 'timebin_dur', 'split'])
+
+
+def test_to_store(dataset_df, tmp_path):
+    vak_df = vak.io.spect_store.to_store(dataset_df, 'train', tmp_path, 'test')
+
+    train_df = vak_df[vak_df['split'] == 'train']
+    assert train_df[vak.io.spect_store.SPECT_STORE_PATH_COL].notna().all()
+    assert vak_df[vak_df['split'] == 'test'][vak.io.spect_store.SPECT_STORE_PATH_COL].isna().all()
+
+    spect_store = np.load(train_df[vak.io.spect_store.SPECT_STORE_PATH_COL].iloc[0], mmap_mode='r')
+    lbl_tb_store = np.load(train_df[vak.io.spect_store.LBL_TB_STORE_PATH_COL].iloc[0], mmap_mode='r')
+    for row in train_df.itertuples():
+        start, stop = int(row.store_start), int(row.store_stop)
+        assert np.array_equal(spect_store[:, start:stop], np.load(row.spect_path)['s'])
+        assert np.array_equal(lbl_tb_store[start:stop], np.load(row.lbl_tb_path))
+    assert spect_store.shape[-1] == int(train_df['store_stop'].max())
+
+
+def test_to_store_without_lbl_tb_raises(dataset_df, tmp_path):
+    with pytest.raises(ValueError):
+        vak.io.spect_store.to_store(dataset_df.drop(columns='lbl_tb_path'), 'train', tmp_path, 'test')
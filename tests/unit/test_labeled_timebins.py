@@ -0,0 +1,113 @@
+import numpy as np
+import pytest
+
+import vak.labeled_timebins
+import vak.labels
+
+
+@pytest.mark.parametrize(
+    'map_unlabeled',
+    [True, False]
+)
+def test_lookup_table(map_unlabeled):
+    labelset = {'a', 'b', 'c'}
+    labelmap = vak.labels.to_map(labelset, map_unlabeled=map_unlabeled)
+    # vectors saved by prep are always encoded with map_unlabeled=True
+    prep_labelmap = vak.labels.to_map(labelset, map_unlabeled=True)
+    table = vak.labeled_timebins.lookup_table(labelmap)
+    for lbl in labelset:
+        assert table[prep_labelmap[lbl]] == labelmap[lbl]
+    if map_unlabeled:
+        assert table[prep_labelmap['unlabeled']] == labelmap['unlabeled']
+
+
+def test_from_file(tmp_path):
+    labelset = {'a', 'b', 'c'}
+    prep_labelmap = vak.labels.to_map(labelset, map_unlabeled=True)
+    lbl_tb = np.array([0, 1, 1, 0, 2, 3, 3], dtype='int8')
+    lbl_tb_path = tmp_path / 'test.lbl_tb.npy'
+    np.save(lbl_tb_path, lbl_tb)
+
+    table = vak.labeled_timebins.lookup_table(prep_labelmap)
+    assert np.array_equal(vak.labeled_timebins.from_file(lbl_tb_path, table), lbl_tb)
+
+    # labelmap with fewer classes than vectors were encoded with
+    table = vak.labeled_timebins.lookup_table(vak.labels.to_map({'a', 'b'}))
+    with pytest.raises(ValueError):
+        vak.labeled_timebins.from_file(lbl_tb_path, table)
+
+
+def test_lookup_table_lbl_tb_labelmap():
+    # dataset prepared with a subset of the labelset used to train model
+    labelmap = vak.labels.to_map({'a', 'b', 'c'}, map_unlabeled=True)
+    lbl_tb_labelmap = vak.labels.to_map({'a', 'c'}, map_unlabeled=True)
+    table = vak.labeled_timebins.lookup_table(labelmap, lbl_tb_labelmap=lbl_tb_labelmap)
+    for lbl, lbl_tb_int in lbl_tb_labelmap.items():
+        assert table[lbl_tb_int] == labelmap[lbl]
+
+    # dataset prepared with a label that is not in labelmap
+    with pytest.raises(ValueError):
+        vak.labeled_timebins.lookup_table(labelmap,
+                                          lbl_tb_labelmap=vak.labels.to_map({'a', 'd'}, map_unlabeled=True))
+
+
+def _label_timebins_argmin(labels_int, onsets_s, offsets_s, time_bins, unlabeled_label=0):
+    """reference implementation, that finds onset and offset indices with argmin"""
+    label_vec = np.ones((time_bins.shape[-1],), dtype='int8') * unlabeled_label
+    onset_inds = [np.argmin(np.abs(time_bins - onset)) for onset in onsets_s]
+    offset_inds = [np.argmin(np.abs(time_bins - offset)) for offset in offsets_s]
+    for label, onset, offset in zip(labels_int, onset_inds, offset_inds):
+        label_vec[onset:offset + 1] = label
+    return label_vec
+
+
+def _random_segments(rng, time_bins, n_segments, sort=True):
+    dur = time_bins[-1] - time_bins[0]
+    onsets_s = rng.uniform(time_bins[0] - 0.01, time_bins[-1] + 0.01, n_segments)
+    if sort:
+        onsets_s = np.sort(onsets_s)
+    offsets_s = onsets_s + rng.uniform(-0.01, dur / max(n_segments, 1), n_segments)
+    labels_int = [int(lbl) for lbl in rng.integers(1, 5, n_segments)]
+    return labels_int, onsets_s, offsets_s
+
+
+@pytest.mark.parametrize(
+    'n_timebins, timebin_dur, n_segments, sort',
+    [
+        (1000, 0.002, 10, True),
+        (1000, 0.002, 10, False),
+        (555, 0.0029025, 25, True),
+        (2, 0.001, 1, True),
+        (300, 0.001, 0, True),
+    ]
+)
+def test_label_timebins(n_timebins, timebin_dur, n_segments, sort):
+    rng = np.random.default_rng(n_timebins + n_segments)
+    time_bins = np.arange(n_timebins) * timebin_dur + timebin_dur / 2
+    labels_int, onsets_s, offsets_s = _random_segments(rng, time_bins, n_segments, sort)
+    # also put some onsets exactly between time bins, where argmin has to break ties
+    onsets_s[::3] = time_bins[rng.integers(0, n_timebins, onsets_s[::3].shape[-1])] + timebin_dur / 2
+
+    lbl_tb = vak.labeled_timebins.label_timebins(labels_int, onsets_s, offsets_s, time_bins, unlabeled_label=0)
+    expected = _label_timebins_argmin(labels_int, onsets_s, offsets_s, time_bins, unlabeled_label=0)
+    assert lbl_tb.dtype == expected.dtype
+    assert np.array_equal(lbl_tb, expected)
+    if n_segments > 0:
+        assert vak.labeled_timebins.has_unlabeled(labels_int, onsets_s, offsets_s, time_bins) == np.any(expected == 0)
+
+
+def test_label_timebins_batch():
+    rng = np.random.default_rng(0)
+    args = [[], [], [], []]
+    for n_timebins in rng.integers(100, 1000, 20):
+        time_bins = np.arange(n_timebins) * 0.002
+        labels_int, onsets_s, offsets_s = _random_segments(rng, time_bins, int(rng.integers(1, 10)))
+        for a_list, arg in zip(args, (labels_int, onsets_s, offsets_s, time_bins)):
+            a_list.append(arg)
+
+    lbl_tb_list = vak.labeled_timebins.label_timebins_batch(*args, unlabeled_label=0)
+    assert len(lbl_tb_list) == len(args[0])
+    for lbl_tb, labels_int, onsets_s, offsets_s, time_bins in zip(lbl_tb_list, *args):
+        assert np.array_equal(
+            lbl_tb, _label_timebins_argmin(labels_int, onsets_s, offsets_s, time_bins, unlabeled_label=0)
+        )
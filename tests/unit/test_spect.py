@@ -0,0 +1,59 @@
+from matplotlib.mlab import specgram
+import numpy as np
+from scipy.signal import lfilter
+import pytest
+
+import vak.spect
+
+
+@pytest.mark.parametrize(
+    'n_samples, fft_size, step_size',
+    [
+        (32000, 512, 64),
+        (5000, 511, 100),
+        (300, 512, 64),
+    ]
+)
+def test_spectrogram_matches_specgram(n_samples, fft_size, step_size):
+    rng = np.random.default_rng(42)
+    dat = (rng.standard_normal(n_samples) * 1000).astype(np.int16)
+    samp_freq = 32000
+
+    spect, freqbins, timebins = vak.spect.spectrogram(dat, samp_freq, fft_size, step_size)
+
+    expected_spect, expected_freqbins, expected_timebins = specgram(
+        dat, fft_size, samp_freq, noverlap=fft_size - step_size
+    )[:3]
+    assert np.allclose(spect, expected_spect)
+    assert np.allclose(freqbins, expected_freqbins)
+    assert np.allclose(timebins, expected_timebins)
+
+
+def test_spectrogram_maker_batch():
+    rng = np.random.default_rng(42)
+    dats = [(rng.standard_normal(n_samples) * 1000).astype(np.int16) for n_samples in (5000, 300, 12345)]
+    spect_params = dict(fft_size=512, step_size=64, thresh=6.25, transform_type='log_spect',
+                        freq_cutoffs=(500, 10000))
+    # small max_frames so that blocks contain segments from more than one signal
+    maker = vak.spect.SpectrogramMaker(32000, max_frames=7, **spect_params)
+
+    for dat, (spect, freqbins, timebins) in zip(dats, maker.batch(dats)):
+        expected_spect, expected_freqbins, expected_timebins = vak.spect.spectrogram(dat, 32000, **spect_params)
+        assert np.allclose(spect, expected_spect)
+        assert np.array_equal(freqbins, expected_freqbins)
+        assert np.array_equal(timebins, expected_timebins)
+
+
+def test_butter_bandpass_filter():
+    rng = np.random.default_rng(42)
+    dat = (rng.standard_normal(32000) * 1000).astype(np.int16)
+
+    filtered = vak.spect.butter_bandpass_filter(dat, 500, 10000, 32000)
+
+    b, a = vak.spect.butter_bandpass(500, 10000, 32000)
+    assert np.allclose(filtered, lfilter(b, a, dat))
+    assert vak.spect.butter_bandpass_sos(500, 10000, 32000) is vak.spect.butter_bandpass_sos(500, 10000, 32000)
+
+    filtered_zero_phase = vak.spect.butter_bandpass_filter(dat, 500, 10000, 32000, zero_phase=True)
+    assert filtered_zero_phase.shape == dat.shape
+    assert not np.allclose(filtered_zero_phase, filtered)